@@ -0,0 +1,251 @@
+import os
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.answer_cache_config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTLS,
+    ANSWER_CACHE_MAX_ENTRIES,
+)
+from salary_schema import normalize_name
+
+# Queries leaning on earlier turns ("what about his salary?") can't be answered from the cache
+FOLLOW_UP_PATTERN = re.compile(
+    r"\b(he|him|his|she|her|they|them|their|that player|this player|same|previous|above|also|too)\b"
+)
+
+# "Curry's" names Curry; normalizing alone would leave the token "currys"
+POSSESSIVE_PATTERN = re.compile(r"['’]s\b", re.IGNORECASE)
+
+
+def is_standalone_query(query):
+    """
+    True if the query does not refer back to earlier turns of the conversation.
+    """
+    return FOLLOW_UP_PATTERN.search(normalize_name(query)) is None
+
+
+def query_signature(query, name_tokens=()):
+    """
+    The player name tokens and numbers (seasons, budgets) a query mentions.
+
+    Embeddings of "LeBron salary" and "Curry salary" are close, so two queries
+    only share an answer when their signatures are compatible as well.
+    """
+    tokens = normalize_name(POSSESSIVE_PATTERN.sub("", query)).split()
+    names = frozenset(token for token in tokens if token in name_tokens)
+    numbers = frozenset(re.findall(r"\d+", query))
+    return names, numbers
+
+
+def signatures_compatible(a, b):
+    names_a, numbers_a = a
+    names_b, numbers_b = b
+    if numbers_a != numbers_b or bool(names_a) != bool(names_b):
+        return False
+    # "LeBron salary" and "LeBron James salary" name the same player
+    return names_a <= names_b or names_b <= names_a
+
+
+class SemanticAnswerCache:
+    """
+    Cache of final answers keyed by response option and query embedding.
+
+    A lookup embeds the query and compares it with every live answer of the
+    same response option in one matrix product; the most similar one is
+    reused if its cosine similarity reaches `threshold` and the two queries
+    mention the same players and numbers. Answers expire after the TTL of
+    their response option and are dropped when the data behind them is
+    reloaded (see invalidate).
+    """
+
+    def __init__(self, embedding, threshold=ANSWER_CACHE_THRESHOLD, ttls=None,
+                 max_entries=ANSWER_CACHE_MAX_ENTRIES, name_tokens=None):
+        self.embedding = embedding
+        self.threshold = threshold
+        self.ttls = dict(ANSWER_CACHE_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.name_tokens = name_tokens or (lambda: ())
+        self.lookups = 0
+        self.hits = 0
+        self.invalidations = 0
+        self.latency_saved_ms = 0.0
+        self._freshness_checks = {}
+        self._vectors = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add_freshness_check(self, response_option, check):
+        """
+        Register a callable run before each lookup of a response option, e.g.
+        one that reloads the underlying data (and so invalidates the cache) if
+        it changed.
+        """
+        self._freshness_checks.setdefault(response_option, []).append(check)
+
+    def embed(self, query):
+        vector = np.asarray(self.embedding.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, response_option, query, vector=None):
+        """
+        Find a cached answer for a query.
+
+        Args:
+            response_option: The response option the answer was produced for
+            query: The user's query
+            vector: The normalized query embedding, computed if not given
+
+        Returns:
+            tuple: (answer or None, query embedding), the embedding can be passed to store()
+        """
+        if response_option not in self.ttls:
+            return None, vector
+        for check in self._freshness_checks.get(response_option, []):
+            check()
+
+        if vector is None:
+            vector = self.embed(query)
+        signature = query_signature(query, self.name_tokens())
+        now = time.time()
+        with self._lock:
+            self.lookups += 1
+            self._drop_expired(response_option, now)
+            matrix = self._vectors.get(response_option)
+            if matrix is None or not len(matrix):
+                return None, vector
+
+            similarities = matrix @ vector
+            for position in np.argsort(-similarities):
+                if similarities[position] < self.threshold:
+                    break
+                entry = self._entries[response_option][position]
+                if signatures_compatible(signature, entry["signature"]):
+                    self.hits += 1
+                    self.latency_saved_ms += entry["latency_ms"]
+                    entry["hits"] += 1
+                    return entry["answer"], vector
+        return None, vector
+
+    def store(self, response_option, query, answer, latency_ms, vector=None):
+        """
+        Cache the answer to a query, with the time it took to produce it.
+        """
+        if response_option not in self.ttls or not answer:
+            return
+        if vector is None:
+            vector = self.embed(query)
+        entry = {
+            "query": query,
+            "answer": answer,
+            "signature": query_signature(query, self.name_tokens()),
+            "expires_at": time.time() + self.ttls[response_option],
+            "latency_ms": latency_ms,
+            "hits": 0,
+        }
+        with self._lock:
+            entries = self._entries.setdefault(response_option, [])
+            matrix = self._vectors.get(response_option)
+            entries.append(entry)
+            matrix = vector[None, :] if matrix is None or not len(matrix) else np.vstack([matrix, vector])
+            if len(entries) > self.max_entries:
+                del entries[0]
+                matrix = matrix[1:]
+            self._vectors[response_option] = matrix
+
+    def _drop_expired(self, response_option, now):
+        # Entries are appended in expiry order, so expired ones are at the front
+        entries = self._entries.get(response_option, [])
+        expired = 0
+        while expired < len(entries) and entries[expired]["expires_at"] <= now:
+            expired += 1
+        if expired:
+            del entries[:expired]
+            self._vectors[response_option] = self._vectors[response_option][expired:]
+
+    def invalidate(self, *response_options):
+        """
+        Drop every cached answer of the given response options (all if none given).
+        """
+        with self._lock:
+            for response_option in response_options or list(self._entries):
+                if self._entries.get(response_option):
+                    self.invalidations += 1
+                self._entries.pop(response_option, None)
+                self._vectors.pop(response_option, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "latency_saved_ms": round(self.latency_saved_ms, 1),
+                "invalidations": self.invalidations,
+                "entries": {option: len(entries) for option, entries in self._entries.items()},
+            }
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def _news_freshness_check(cache):
+    """
+    Freshness check of the news answers. The news retriever is built by the
+    first news query, not by the cache: its reload hook is attached once it
+    exists.
+    """
+    attached = []
+    lock = threading.Lock()
+
+    def check():
+        from query import get_news_retriever
+
+        retriever = get_news_retriever(create=False)
+        if retriever is None:
+            return
+        with lock:
+            if not attached:
+                retriever.add_reload_hook(lambda retriever: cache.invalidate("news"))
+                attached.append(retriever)
+        retriever.reload_if_changed()
+
+    return check
+
+
+def get_answer_cache(create=True):
+    """
+    Return the shared answer cache, or None if ANSWER_CACHE_ENABLED is off.
+
+    Player answers are invalidated when the salary table reloads and news
+    answers when the news corpus reloads.
+
+    Args:
+        create: If False, return None instead of building it
+    """
+    global _answer_cache
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    if _answer_cache is None and create:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                from query import get_shared_embedding
+                from user_budget import salary_table
+                from player_repository import player_name_tokens
+
+                cache = SemanticAnswerCache(get_shared_embedding(), name_tokens=player_name_tokens)
+                salary_table.add_reload_hook(lambda table: cache.invalidate("player_details", "recommendation"))
+                cache.add_freshness_check("player_details", salary_table.refresh)
+                cache.add_freshness_check("recommendation", salary_table.refresh)
+                cache.add_freshness_check("news", _news_freshness_check(cache))
+                _answer_cache = cache
+    return _answer_cache
@@ -1,28 +1,97 @@
-from flask import Flask, request, jsonify
-from pymongo import MongoClient
-from llm import main_model, clear_conversation
-from query import query_pinecone_and_get_response
+# The record/replay harness (REPLAY_MODE) and the Mongo command listener must
+# be in place before any client is created
+import replay
+import tracing
+tracing.configure_logging()
+replay.install()
+tracing.install_mongo_listener()
+
+import importlib
+import logging
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
-from team_agent import agent_function_calling as team_agent_function_calling
 import json
-from user_budget import get_five_players_within_budget, get_top_5_players_from_rank
+from config.budget_config import DEFAULT_BUDGET
+from config.startup_config import WARMUP_ENABLED
+from registry import register, registry, warm_up_when_listening
+import mongo
+from http_cache import cached_by_data_version, response_cache
+from user_budget import get_five_players_within_budget, get_top_5_players_from_rank, optimize_team, salary_table
+from player_repository import find_players_by_name
+from rapidapi_client import get_rapidapi_client
+from answer_cache import get_answer_cache
+from intent_router import get_intent_router
+from session_store import get_session_store, is_valid_session_id, new_session_id, SessionLockTimeout
+import time
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# MongoDB connection
-client = MongoClient("mongodb://localhost:27017/")
-db = client["nba_salaries"]
-collection = db["players"]
-
 # Get API key from environment variables
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
+# The LLM stack (langchain, openai, pinecone) is imported on first use or by the
+# warm-up, so importing the app and starting a worker stay fast
+get_llm = register("module:llm", lambda: importlib.import_module("llm"))
+get_team_agent = register("module:team_agent", lambda: importlib.import_module("team_agent"))
+get_query = register("module:query", lambda: importlib.import_module("query"))
+register("news_retriever", lambda: get_query().get_news_retriever())
+
+def _load_salary_table():
+    salary_table.refresh()
+    return salary_table
+
+register("salary_table", _load_salary_table)
+
+# Responses of the salary endpoints are cached until the salary data changes;
+# entries of older data versions are never hit again, drop them on reload
+salary_table.add_reload_hook(lambda table: response_cache.clear())
+
+@app.before_request
+def start_route_span():
+    # One span per request, the parent of every span the request opens. Span
+    # names are metric labels: unmatched URLs share one name, the path is only logged
+    if request.endpoint is None:
+        g.route_span = tracing.start_span("route", "unmatched", method=request.method, path=request.path)
+    else:
+        g.route_span = tracing.start_span("route", request.endpoint, method=request.method)
+
+@app.after_request
+def add_trace_header(response):
+    route_span, _ = g.get("route_span", (None, None))
+    if route_span is not None and route_span.trace_id:
+        route_span.set(status=response.status_code)
+        if response.status_code >= 500:
+            route_span.error = f"http_{response.status_code}"
+        response.headers["X-Trace-ID"] = route_span.trace_id
+    return response
+
+@app.teardown_request
+def end_route_span(error=None):
+    route_span = g.pop("route_span", None)
+    if route_span is not None:
+        tracing.end_span(*route_span, error=error)
+
+@app.errorhandler(mongo.MongoUnavailable)
+def mongo_unavailable(e):
+    # Fail fast instead of holding the request while MongoDB is down
+    return jsonify({"error": "Player database unavailable, please retry shortly"}), 503
+
+def get_session_id(data=None):
+    """
+    Return the client's session ID from the JSON body or the X-Session-ID header,
+    or a new one if the client did not send a valid ID.
+    """
+    session_id = (data or {}).get("session_id") or request.headers.get("X-Session-ID")
+    return session_id if is_valid_session_id(session_id) else new_session_id()
+
 @app.route('/')
 def index():
     return "Flask server is running!"
@@ -35,7 +104,7 @@ def handle_ask():
         response = app.make_response('')
         response.headers['Access-Control-Allow-Origin'] = '*'
         response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Session-ID'
         return response
     try:
         data = request.json
@@ -49,12 +118,52 @@ def handle_ask():
         if not OPENAI_API_KEY:
             return jsonify({"error": "OpenAI API key not configured"}), 500
 
-        response = main_model(user_query, response_options = response_option)
-        return jsonify({"message": response}), 200
+        session_id = get_session_id(data)
+        usage = {}
+        response = get_llm().main_model(user_query, response_options = response_option, session_id = session_id, usage = usage)
+        return jsonify({"message": response, "session_id": session_id, "usage": usage}), 200
 
+    except SessionLockTimeout as e:
+        return jsonify({"error": str(e)}), 409
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# 👉 Streaming endpoint for LLM response (Server-Sent Events)
+@app.route('/api/ask/stream', methods=['POST', 'OPTIONS'])
+def handle_ask_stream():
+    if request.method == 'OPTIONS':
+        response = app.make_response('')
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Session-ID'
+        return response
+    data = request.json or {}
+    user_query = data.get("prompt")
+    model = data.get("model")
+    response_option = data.get("response_option")
+
+    if not all([user_query, model]):
+        return jsonify({"error": "Missing prompt or model"}), 400
+
+    if not OPENAI_API_KEY:
+        return jsonify({"error": "OpenAI API key not configured"}), 500
+
+    session_id = get_session_id(data)
+
+    def generate():
+        # Each event is sent as "event: <type>" plus its JSON payload as data
+        try:
+            for event in get_llm().main_model_stream(user_query, response_options = response_option, session_id = session_id):
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'event': 'error', 'message': str(e)})}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+        'X-Session-ID': session_id,
+    })
+
 # 👉 Endpoint for team recommendations with buttons
 @app.route('/api/team/recommendations', methods=['POST', 'OPTIONS'])
 def team_recommendations():
@@ -62,7 +171,7 @@ def team_recommendations():
         response = app.make_response('')
         response.headers['Access-Control-Allow-Origin'] = '*'
         response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Session-ID'
         return response
     try:
         data = request.json
@@ -71,52 +180,64 @@ def team_recommendations():
         if not user_query:
             return jsonify({"error": "Missing prompt"}), 400
 
-        # Get response from team agent
-        response_text = team_agent_function_calling(user_query)
+        # Get response from team agent, with this session's chat history
+        session_id = get_session_id(data)
+        usage = {}
+        with get_session_store().session(session_id) as session:
+            response_text = get_team_agent().agent_function_calling(user_query, session=session, usage=usage)
         
         # Return the text response directly without trying to extract buttons
         return jsonify({
             "message": response_text,
-            "buttons": []  # Empty array for backward compatibility
+            "buttons": [],  # Empty array for backward compatibility
+            "session_id": session_id,
+            "usage": usage
         }), 200
 
+    except SessionLockTimeout as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 👉 Endpoint for the budget-constrained roster optimizer
+@app.route('/api/team/optimize', methods=['POST', 'OPTIONS'])
+def team_optimize():
+    if request.method == 'OPTIONS':
+        response = app.make_response('')
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-Session-ID'
+        return response
+    try:
+        data = request.get_json(silent=True) if request.get_data() else {}
+        if not isinstance(data, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        start = time.perf_counter()
+        result = optimize_team(
+            budget=data.get("budget", DEFAULT_BUDGET),
+            roster_size=data.get("roster_size", 8),
+            locked_players=data.get("locked_players", []),
+            value=data.get("value", "rank")
+        )
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return jsonify(result), 200
+
+    except mongo.MongoUnavailable:
+        raise
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 # 👉 Endpoint for getting players by last name (MongoDB)
 @app.route('/api/players', methods=['GET'])
+@cached_by_data_version(salary_table.data_version)
 def get_players_by_last_name():
     last_name = request.args.get('name')
     if not last_name:
         return jsonify({"error": "Please provide a last name"}), 400
 
-    last_name = last_name.lower()
-
-    # Modified query to be more flexible with name matching
-    players = collection.find({
-        "$or": [
-            # Match by last name (case insensitive)
-            {"$expr": {
-                "$eq": [
-                    {"$toLower": {"$arrayElemAt": [{"$split": ["$name", " "]}, -1]}},
-                    last_name
-                ]
-            }},
-            # Match by full name containing the search term (case insensitive)
-            {"name": {"$regex": last_name, "$options": "i"}}
-        ]
-    })
-
-    players_list = [{key: value for key, value in player.items() if key != "_id"} for player in players]
-    
-    # Remove potential duplicates based on player name
-    unique_players = {}
-    for player in players_list:
-        if player.get('name') not in unique_players:
-            unique_players[player.get('name')] = player
-    
-    # Convert back to list
-    final_players_list = list(unique_players.values())
+    final_players_list = find_players_by_name(last_name)
 
     if final_players_list:
         return jsonify(final_players_list), 200
@@ -126,8 +247,10 @@ def get_players_by_last_name():
 # 👉 Endpoint for clearing chat history
 @app.route('/api/clear', methods=['POST'])
 def clear_history():
-    clear_conversation()
-    return jsonify({"message": "History cleared successfully"})
+    # Only the caller's session is cleared
+    session_id = get_session_id(request.get_json(silent=True))
+    get_llm().clear_conversation(session_id)
+    return jsonify({"message": "History cleared successfully", "session_id": session_id})
 
 # 👉 Endpoint for getting NBA news
 @app.route('/api/news', methods=['POST'])
@@ -139,7 +262,7 @@ def get_news():
         limit = int(data.get('limit', 5))
         
         # Get news using the query function
-        news_content = query_pinecone_and_get_response(query=query, k=limit)
+        news_content = get_query().query_pinecone_and_get_response(query=query, k=limit)
         
         return jsonify({
             "status": "success",
@@ -154,7 +277,38 @@ def get_news():
             "message": str(e)
         }), 500
 
+def _news_stats():
+    # Statistics must not build the news stack as a side effect
+    if not registry.is_built("module:query"):
+        return None
+    news_retriever = get_query().get_news_retriever(create=False)
+    return news_retriever.stats() if news_retriever else None
+
+# 👉 Endpoint for backend statistics
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    try:
+        return jsonify({
+            "news": _news_stats(),
+            "rapidapi": get_rapidapi_client().stats(),
+            "sessions": get_session_store().stats(),
+            "answer_cache": get_answer_cache(create=False).stats() if get_answer_cache(create=False) else None,
+            "router": get_intent_router().stats() if get_intent_router() else None,
+            "replay": replay.stats() if replay.is_active() else None,
+            "startup": registry.stats(),
+            "mongo": mongo.stats(),
+            "http_cache": response_cache.stats(),
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 👉 Prometheus metrics: span latency histograms, error and token counters
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(tracing.render_metrics(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/available-players', methods=['GET'])
+@cached_by_data_version(salary_table.data_version)
 def available_players():
     """
     Returns the top 5 players based on rank or budget constraints.
@@ -164,8 +318,7 @@ def available_players():
         budget_param = request.args.get('budget')
         rank_param = request.args.get('rank')
         
-        # Debug logging
-        print(f"DEBUG: available-players endpoint called with params - rank: {rank_param}, budget: {budget_param}")
+        logger.debug("available-players endpoint called with params - rank: %s, budget: %s", rank_param, budget_param)
         
         players = []
         
@@ -173,20 +326,20 @@ def available_players():
         if rank_param and rank_param.isdigit():
             # Get players by specific rank
             rank = int(rank_param)
-            print(f"DEBUG: Using rank-based search with rank={rank}")
+            logger.debug("Using rank-based search with rank=%s", rank)
             players = get_top_5_players_from_rank(rank)
-            print(f"DEBUG: Found {len(players)} players from rank {rank}")
+            logger.debug("Found %d players from rank %s", len(players), rank)
         else:
             # Use budget-based logic (existing functionality)
             current_budget = int(budget_param) if budget_param else None
-            print(f"DEBUG: Using budget-based search with budget={current_budget}")
+            logger.debug("Using budget-based search with budget=%s", current_budget)
             
             # Get five players using the function with the current budget
             if current_budget is not None:
                 players = get_five_players_within_budget(initial_budget=current_budget, picked_budget=0, start_rank=1)
             else:
                 players = get_five_players_within_budget()
-            print(f"DEBUG: Found {len(players)} players using budget search")
+            logger.debug("Found %d players using budget search", len(players))
         
         # Format the player data for frontend
         player_data = []
@@ -197,17 +350,23 @@ def available_players():
                 'salary': player.get('2024/25', '$0')
             })
         
-        print(f"DEBUG: Returning {len(player_data)} players to frontend")
+        logger.debug("Returning %d players to frontend", len(player_data))
         return jsonify(player_data)
     except Exception as e:
-        print(f"ERROR: Exception in available-players: {str(e)}")
-        return jsonify([
+        logger.exception("Exception in available-players: %s", e)
+        # Placeholder players, never cached
+        response = jsonify([
             {"name": "LeBron James", "rank": "1.", "salary": "$47,600,000"},
             {"name": "Stephen Curry", "rank": "2.", "salary": "$55,760,000"},
             {"name": "Kevin Durant", "rank": "3.", "salary": "$51,200,000"},
             {"name": "Giannis Antetokounmpo", "rank": "4.", "salary": "$48,800,000"},
             {"name": "Nikola Jokic", "rank": "5.", "salary": "$50,200,000"}
-        ]), 200
+        ])
+        response.headers['Cache-Control'] = 'no-store'
+        return response, 200
 
 if __name__ == '__main__':
+    # With the reloader, only the child process serving requests warms up
+    if WARMUP_ENABLED and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up_when_listening("127.0.0.1", 5000)
     app.run(debug=True, port=5000)
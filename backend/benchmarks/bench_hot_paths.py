@@ -0,0 +1,133 @@
+"""
+Micro-benchmarks of the backend hot paths.
+
+Usage (from the backend directory):
+    python benchmarks/bench_hot_paths.py [--iterations 2000] [--output benchmarks/results/hot_paths.json]
+                                         [--compare previous.json]
+
+Measured:
+    next_available_rank        user_budget.get_next_available_rank
+    five_players_within_budget user_budget.get_five_players_within_budget
+    player_stat                nba_apis.get_player_stat on a cached 82-game season
+    players_name_query         the /api/players lookup (player_repository.find_players_by_name)
+    news_context               query.build_news_context on 5 retrieved chunks
+
+Runs offline: the record/replay harness serves the salary data from its
+MongoDB stand-in and external calls are never made (REPLAY_MODE defaults to
+"replay" with no injected latency).
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("REPLAY_MODE", "replay")
+os.environ.setdefault("REPLAY_LATENCY_SCALE", "0")
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import replay
+replay.install()
+
+from bench_results import summarize, load_results, write_results, print_report
+from config.budget_config import DEFAULT_BUDGET, MIN_BUDGET
+from nba_apis import get_player_stat
+from player_repository import find_players_by_name
+from query import build_news_context
+from rapidapi_client import get_rapidapi_client
+from user_budget import get_next_available_rank, get_five_players_within_budget, salary_table
+
+NAMES = ["James", "Curry", "Durant", "Jokic", "Antetokounmpo", "Tatum", "Embiid", "Doncic", "Booker", "Harden",
+         "lebron james", "stephen curry", "Jokić", "curr", "Giannis Antetokounpo"]
+
+
+def measure(function, arguments, iterations):
+    samples = []
+    for i in range(iterations):
+        args = arguments[i % len(arguments)]
+        start = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def synthetic_games(count, seed=0):
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        fga, fta, tpa = rng.randint(8, 25), rng.randint(0, 12), rng.randint(0, 12)
+        fgm, ftm, tpm = rng.randint(0, fga), rng.randint(0, fta), rng.randint(0, tpa)
+        games.append({
+            "min": f"{rng.randint(20, 42)}:{rng.randint(0, 59):02d}",
+            "points": 2 * fgm + tpm + ftm, "fgm": fgm, "fga": fga, "fgp": f"{fgm / fga * 100:.1f}",
+            "ftm": ftm, "fta": fta, "ftp": f"{ftm / fta * 100:.1f}" if fta else "0",
+            "tpm": tpm, "tpa": tpa, "tpp": f"{tpm / tpa * 100:.1f}" if tpa else "0",
+            "offReb": rng.randint(0, 4), "defReb": rng.randint(0, 10), "totReb": rng.randint(0, 14),
+            "assists": rng.randint(0, 12), "pFouls": rng.randint(0, 5), "steals": rng.randint(0, 3),
+            "turnovers": rng.randint(0, 6), "blocks": rng.randint(0, 3), "plusMinus": str(rng.randint(-20, 20)),
+        })
+    return games
+
+
+def seed_player_stat(player_id, season, games):
+    # Put a season in the client's memory tier, so get_player_stat runs its cache lookup and aggregation only
+    client = get_rapidapi_client()
+    key = client._cache_key("/players/statistics", {"id": str(player_id), "season": str(season)})
+    client._set_memory(key, {"response": games, "results": len(games), "errors": []}, 24 * 60 * 60)
+
+
+def synthetic_news(count, seed=0):
+    rng = random.Random(seed)
+    words = "lebron curry trade injury playoffs contract rookie draft points rebounds assists season".split()
+
+    class Chunk:
+        def __init__(self, i):
+            self.page_content = " ".join(rng.choice(words) for _ in range(120))
+            self.metadata = {"news_id": f"news-{i // 2}", "title": f"Article {i // 2}", "date": "2025-01-01",
+                             "url": f"https://example.com/{i // 2}"}
+
+    chunks = [Chunk(i) for i in range(count)]
+    articles = {chunk.metadata["news_id"]: chunk.page_content * 8 for chunk in chunks}
+    return chunks, articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", default="benchmarks/results/hot_paths.json")
+    parser.add_argument("--compare", help="earlier result file to compare with")
+    args = parser.parse_args()
+    previous = load_results(args.compare)
+
+    rng = random.Random(1)
+    salary_table.refresh(force=True)
+    budget_args = [(rng.randint(MIN_BUDGET, DEFAULT_BUDGET // 4), rng.randint(1, 400)) for _ in range(200)]
+    seasons = [(str(player_id), "2022") for player_id in range(1, 21)]
+    for player_id, season in seasons:
+        seed_player_stat(player_id, season, synthetic_games(82, seed=int(player_id)))
+    chunks, articles = synthetic_news(10)
+
+    results = {
+        "next_available_rank": measure(get_next_available_rank, budget_args, args.iterations),
+        "five_players_within_budget": measure(
+            lambda budget, rank: get_five_players_within_budget(DEFAULT_BUDGET, DEFAULT_BUDGET - budget, rank),
+            budget_args, args.iterations
+        ),
+        "player_stat": measure(get_player_stat, seasons, args.iterations),
+        "players_name_query": measure(find_players_by_name, [(name,) for name in NAMES], args.iterations),
+        "news_context": measure(
+            lambda: build_news_context(chunks[:5], articles.get), [()], args.iterations
+        ),
+    }
+    report = write_results(args.output, "hot_paths", results, {
+        "iterations": args.iterations,
+        "players": len(salary_table.players),
+    })
+    print_report(report, previous)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Shared helpers of the benchmark scripts: latency summaries and result files.
+
+Result files are JSON, one per benchmark run, tagged with the git commit and
+the time of the run so two runs can be compared with compare_results.
+"""
+
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples):
+    """
+    Mean and p50/p95/p99 of latency samples in seconds, in milliseconds.
+    """
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, benchmark, results, settings=None):
+    """
+    Write benchmark results to a JSON file, with the commit and environment they were measured on.
+    """
+    report = {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": settings or {},
+        "results": results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare_results(previous, current, metrics=("p50_ms", "p95_ms", "p99_ms", "rps")):
+    """
+    Relative change of every metric found in both reports, e.g.
+    {"players_name_query": {"p95_ms": "+12.5%"}}.
+    """
+    changes = {}
+    for name, result in current["results"].items():
+        before = previous.get("results", {}).get(name)
+        if not isinstance(result, dict) or not isinstance(before, dict):
+            continue
+        for metric in metrics:
+            if before.get(metric) and metric in result:
+                change = (result[metric] - before[metric]) / before[metric] * 100
+                changes.setdefault(name, {})[metric] = f"{change:+.1f}%"
+    return changes
+
+
+def load_results(path):
+    """
+    Read an earlier result file, None if no path is given. Call it before
+    write_results when comparing with the file about to be overwritten.
+    """
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_report(report, previous=None):
+    print(json.dumps(report["results"], indent=2))
+    if previous:
+        print(f"Change since {previous.get('commit')} ({previous.get('timestamp')}):")
+        print(json.dumps(compare_results(previous, report), indent=2))
@@ -0,0 +1,94 @@
+"""
+Benchmark a salary lookup through the HTTP loopback against the in-process call.
+
+Usage (from the backend directory):
+    python benchmarks/bench_salary_lookup.py [--iterations 500]
+
+Both paths serve the same PlayerNameIndex built from web_scrape/salary_data.json,
+so no MongoDB is needed. The loopback path runs the /api/players route on a
+local werkzeug server and calls it with requests, the way
+nba_apis.get_player_salary used to; the in-process path calls the index
+directly, the way player_repository.find_players_by_name does now.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+import requests
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from player_name_index import PlayerNameIndex
+from salary_schema import to_typed_document
+
+NAMES = ["James", "Curry", "Durant", "Jokic", "Antetokounmpo", "Tatum", "Embiid", "Doncic", "Booker", "Harden"]
+
+
+def build_index():
+    with open("web_scrape/salary_data.json", "r", encoding="utf-8") as f:
+        players = [to_typed_document(player) for player in json.load(f)]
+    index = PlayerNameIndex()
+    index.build(players)
+    return index
+
+
+def serve(index):
+    app = Flask(__name__)
+
+    @app.route('/api/players', methods=['GET'])
+    def get_players_by_last_name():
+        return jsonify(index.search(request.args.get('name'))), 200
+
+    # Keep werkzeug's per-request access log out of the timings and the output
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(lookup, iterations):
+    samples = []
+    for i in range(iterations):
+        name = NAMES[i % len(NAMES)]
+        start = time.perf_counter()
+        lookup(name)
+        samples.append(time.perf_counter() - start)
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    index = build_index()
+    server = serve(index)
+    url = f"http://127.0.0.1:{server.server_port}/api/players"
+
+    # Mirror the old get_player_salary, which used a bare requests.get per call
+    loopback = measure(lambda name: requests.get(url, params={"name": name}).json(), args.iterations)
+    in_process = measure(index.search, args.iterations)
+    server.shutdown()
+
+    print(json.dumps({
+        "http_loopback": loopback,
+        "in_process": in_process,
+        "saved_per_lookup_ms": round(loopback["mean_ms"] - in_process["mean_ms"], 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark the local vector index against the remote Pinecone retrieval path.
+
+Usage (from the backend directory):
+    python benchmarks/bench_vector_backends.py [--chunks 3000] [--queries 200] [--remote]
+
+The local backend is always measured with the deterministic HashingEmbeddings
+stand-in on a synthetic corpus, so it runs offline. With --remote, the same
+queries are also sent through the Pinecone MMR retriever (needs OPENAI_API_KEY
+and PINECONE_API_KEY).
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from local_vector_index import HashingEmbeddings, LocalVectorIndex
+
+WORDS = (
+    "lebron james curry durant jokic embiid giannis lakers warriors celtics nuggets bucks "
+    "trade injury playoffs contract extension rookie draft points rebounds assists season "
+    "coach defense offense three pointer buzzer beater win loss streak free agent salary"
+).split()
+
+
+def synthetic_chunks(count, seed=0):
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(60, 160)))
+        chunks.append((f"chunk-{i}", text, {"news_id": f"news-{i // 4}", "title": f"Article {i // 4}"}))
+    return chunks
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples):
+    return {
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+    }
+
+
+def bench_local(chunk_count, queries, k):
+    embedding = HashingEmbeddings()
+    chunks = synthetic_chunks(chunk_count)
+
+    start = time.perf_counter()
+    index = LocalVectorIndex(embedding)
+    texts = [text for _, text, _ in chunks]
+    index.add_embeddings([chunk_id for chunk_id, _, _ in chunks], embedding.embed_documents(texts), texts,
+                         [metadata for _, _, metadata in chunks])
+    build_time = time.perf_counter() - start
+
+    query_vectors = embedding.embed_documents(queries)
+
+    start = time.perf_counter()
+    index.search_by_vectors(query_vectors, k=k)
+    batched_time = time.perf_counter() - start
+
+    mmr_samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.max_marginal_relevance_search(query, k=k)
+        mmr_samples.append(time.perf_counter() - start)
+
+    return {
+        "chunks": len(index),
+        "build_s": round(build_time, 3),
+        "batched_topk_per_query_ms": round(batched_time / len(queries) * 1000, 4),
+        "mmr_query": summarize(mmr_samples),
+    }
+
+
+def bench_remote(queries, k):
+    from query import get_vectorstore
+
+    vectorstore = get_vectorstore("pinecone")
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        vectorstore.max_marginal_relevance_search(query, k=k)
+        samples.append(time.perf_counter() - start)
+    return {"mmr_query": summarize(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--remote", action="store_true", help="also benchmark the Pinecone backend")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))) for _ in range(args.queries)]
+
+    results = {"local": bench_local(args.chunks, queries, args.k)}
+    if args.remote:
+        results["pinecone"] = bench_remote(queries, args.k)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
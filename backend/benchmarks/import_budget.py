@@ -0,0 +1,120 @@
+"""
+Import-time budget of the backend modules.
+
+Usage (from the backend directory):
+    python benchmarks/import_budget.py [--repeat 5] [--output benchmarks/results/import_time.json]
+                                       [--compare previous.json]
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+`--repeat` times, and the fastest run is compared with its budget. The
+heavy LLM stack must not be imported by modules that only need the salary
+data or the web app itself: it is built on first use or by the startup
+warm-up (see registry.py).
+
+Exits with status 1 if a module is over its budget or imports a forbidden
+package, so it can run in CI.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_results import load_results, write_results, print_report
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Slow to import, only the agents and the news retrieval need them
+LLM_STACK = ("langchain", "langchain_core", "langchain_openai", "langchain_pinecone", "openai", "pinecone")
+
+# module: (import time budget in milliseconds, packages it must not import)
+BUDGETS = {
+    "user_budget": (300, LLM_STACK),
+    "player_repository": (300, LLM_STACK),
+    "session_store": (150, LLM_STACK),
+    "app": (800, LLM_STACK),
+    "llm": (4000, ()),
+}
+
+
+def measure_import(module):
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        tuple: (import time in milliseconds, {package: cumulative milliseconds of its direct import
+        by the module, 0 for packages imported further down})
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, env=dict(os.environ, WARMUP_ENABLED="0"),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {completed.stderr.strip().splitlines()[-1]}")
+
+    # Imports are listed after the imports they triggered, each nesting level indented by two spaces:
+    # "import time: <self us> | <cumulative us> | <indented module name>"
+    import_ms = 0.0
+    packages = {}
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        cumulative_ms = int(fields[1]) / 1000
+        name = fields[2]
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == module:
+                import_ms = cumulative_ms
+                break
+            # Interpreter startup, not triggered by the module
+            packages = {}
+            continue
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + (cumulative_ms if depth == 1 else 0.0)
+    return import_ms, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", choices=sorted(BUDGETS), default=list(BUDGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmarks/results/import_time.json")
+    parser.add_argument("--compare", help="earlier result file to compare with")
+    args = parser.parse_args()
+    previous = load_results(args.compare)
+
+    results = {}
+    failures = []
+    for module in args.modules:
+        budget_ms, forbidden = BUDGETS[module]
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        import_ms, packages = min(runs, key=lambda run: run[0])
+        imported = sorted(package for package in forbidden if package in packages)
+        heaviest = sorted(
+            ((package, ms) for package, ms in packages.items() if ms), key=lambda item: item[1], reverse=True
+        )[:5]
+        results[module] = {
+            "p50_ms": round(sorted(run[0] for run in runs)[len(runs) // 2], 1),
+            "min_ms": round(import_ms, 1),
+            "budget_ms": budget_ms,
+            "forbidden_imports": imported,
+            "heaviest": {package: round(ms, 1) for package, ms in heaviest},
+        }
+        if import_ms > budget_ms:
+            failures.append(f"{module}: {import_ms:.0f} ms, budget {budget_ms} ms")
+        if imported:
+            failures.append(f"{module} imports {', '.join(imported)}")
+
+    report = write_results(args.output, "import_time", results, {"repeat": args.repeat})
+    print_report(report, previous)
+    print(f"Results written to {args.output}")
+    if failures:
+        print("Over budget:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Concurrent load generator for the Flask API.
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py [--endpoints ask_player_details news ...] [--concurrency 8]
+                                   [--requests 200] [--url http://127.0.0.1:5000]
+                                   [--output benchmarks/results/load.json] [--compare previous.json]
+
+Each endpoint is loaded on its own by `--concurrency` workers sending
+`--requests` requests in total, every worker with its own session. The
+report gives p50/p95/p99 latency, requests per second and the status codes
+per endpoint.
+
+By default the app runs in process behind the record/replay harness
+(REPLAY_MODE=replay), so OpenAI, Pinecone, RapidAPI and MongoDB are served
+from fixtures or local stand-ins with their configured latency and no keys
+are needed. With --url, a running server is loaded over HTTP instead.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_results import summarize, load_results, write_results, print_report
+
+PLAYER_QUERIES = [
+    "What is LeBron James's salary?",
+    "How much does Stephen Curry make?",
+    "Top 5 players at rank 30",
+    "Players within a $20 million budget",
+    "What were Nikola Jokic's stats in 2023?",
+    "Compare Jayson Tatum and Jaylen Brown this season",
+    "How many points did Luka Doncic average in 2022?",
+    "Tell me about Giannis Antetokounmpo's career",
+]
+NEWS_QUERIES = [
+    "Latest Lakers news",
+    "Any injury updates on Joel Embiid?",
+    "What happened at the trade deadline?",
+    "Warriors playoff chances",
+]
+TEAM_QUERIES = [
+    "Build me a team with a $150 million budget",
+    "I picked Stephen Curry, who should I add next?",
+    "Recommend five players from rank 20",
+]
+PLAYER_NAMES = ["James", "Curry", "Durant", "Jokic", "Tatum", "Embiid", "Doncic", "Booker", "Harden", "curr"]
+
+SCENARIOS = {
+    "ask_player_details": lambda rng, session_id: ("POST", "/api/ask", {
+        "prompt": rng.choice(PLAYER_QUERIES), "model": "gpt-4",
+        "response_option": "player_details", "session_id": session_id,
+    }),
+    "ask_news": lambda rng, session_id: ("POST", "/api/ask", {
+        "prompt": rng.choice(NEWS_QUERIES), "model": "gpt-4",
+        "response_option": "news", "session_id": session_id,
+    }),
+    "news": lambda rng, session_id: ("POST", "/api/news", {"query": rng.choice(NEWS_QUERIES), "limit": 5}),
+    "team_recommendations": lambda rng, session_id: ("POST", "/api/team/recommendations", {
+        "prompt": rng.choice(TEAM_QUERIES), "session_id": session_id,
+    }),
+    "players": lambda rng, session_id: ("GET", f"/api/players?name={rng.choice(PLAYER_NAMES)}", None),
+}
+
+
+class InProcessTarget:
+    """
+    Sends requests to the app through Flask's test client, one client per worker.
+    """
+
+    def __init__(self):
+        from app import app
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client.open(path, method=method, json=body).status_code
+
+
+class HTTPTarget:
+    """
+    Sends requests to a running server, one connection pool per worker.
+    """
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self._local = threading.local()
+
+    def request(self, method, path, body):
+        import requests
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session.request(method, self.url + path, json=body, timeout=300).status_code
+
+
+def run_endpoint(target, scenario, concurrency, total, seed):
+    samples = []
+    statuses = {}
+    remaining = [total]
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        session_id = uuid.uuid4().hex
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            method, path, body = scenario(rng, session_id)
+            start = time.perf_counter()
+            try:
+                status = target.request(method, path, body)
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples.append(elapsed)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    result = summarize(samples)
+    result["rps"] = round(len(samples) / wall, 2) if wall else 0.0
+    result["errors"] = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+    result["statuses"] = statuses
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--url", help="load a running server instead of the in-process app")
+    parser.add_argument("--answer-cache", action="store_true", help="keep the semantic answer cache on")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmarks/results/load.json")
+    parser.add_argument("--compare", help="earlier result file to compare with")
+    args = parser.parse_args()
+    previous = load_results(args.compare)
+
+    if args.url:
+        target = HTTPTarget(args.url)
+    else:
+        # Settings are read when the app is imported
+        os.environ.setdefault("REPLAY_MODE", "replay")
+        if not args.answer_cache:
+            os.environ["ANSWER_CACHE_ENABLED"] = "0"
+        target = InProcessTarget()
+
+    results = {}
+    for name in args.endpoints:
+        print(f"Loading {name} with {args.concurrency} workers...")
+        results[name] = run_endpoint(target, SCENARIOS[name], args.concurrency, args.requests, args.seed)
+
+    settings = {
+        "concurrency": args.concurrency,
+        "requests_per_endpoint": args.requests,
+        "target": args.url or "in-process",
+        "replay_mode": os.getenv("REPLAY_MODE", "off") if not args.url else None,
+        "answer_cache": args.answer_cache,
+    }
+    if not args.url:
+        import replay
+        settings["replay"] = replay.stats()
+    report = write_results(args.output, "load", results, settings)
+    print_report(report, previous)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from tracing import span
+
+
+def embedding_key(model, text):
+    """
+    Content address of an embedding: sha256 of the model name and the text.
+    """
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings:
+    """
+    Embedding model wrapper backed by a two-tier, content-addressed cache.
+
+    Lookups go to an in-memory LRU first, then to an SQLite file on disk;
+    only texts missing from both are sent to the wrapped embedder, in one
+    batch. The disk tier is bounded by `max_disk_bytes` and evicts the least
+    recently used vectors first.
+    """
+
+    def __init__(self, embedder, cache_path, model=None, max_memory_items=10000, max_disk_bytes=512 * 1024 * 1024):
+        self.embedder = embedder
+        self.model = model or getattr(embedder, "model", None) or type(embedder).__name__
+        self.cache_path = cache_path
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings (last_access)")
+        self._db.commit()
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _load_from_disk(self, keys):
+        found = {}
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch)
+            for key, blob in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                found[key] = vector.tolist()
+        if found:
+            now = time.time()
+            self._db.executemany("UPDATE embeddings SET last_access = ? WHERE key = ?", [(now, key) for key in found])
+            self._db.commit()
+        return found
+
+    def _stored_bytes(self, keys):
+        total = 0
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            total += self._db.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchone()[0]
+        return total
+
+    def _store_on_disk(self, items):
+        now = time.time()
+        rows = {}
+        for key, vector in items:
+            blob = array("f", vector).tobytes()
+            rows[key] = (key, blob, len(blob), now)
+        # Rows of another process (or an earlier miss of the same text) are replaced, not added
+        replaced_bytes = self._stored_bytes(list(rows))
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?)", rows.values()
+        )
+        self._disk_bytes += sum(row[2] for row in rows.values()) - replaced_bytes
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict()
+        self._db.commit()
+
+    def _evict(self):
+        # Drop least recently used vectors until the cache is at 90% of its budget
+        target = int(self.max_disk_bytes * 0.9)
+        while self._disk_bytes > target:
+            rows = self._db.execute("SELECT key, size FROM embeddings ORDER BY last_access LIMIT 256").fetchall()
+            if not rows:
+                break
+            evicted = []
+            for key, size in rows:
+                if self._disk_bytes <= target:
+                    break
+                evicted.append((key,))
+                self._disk_bytes -= size
+            self._db.executemany("DELETE FROM embeddings WHERE key = ?", evicted)
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    def _embed(self, texts, embed_missing):
+        keys = [embedding_key(self.model, text) for text in texts]
+        vectors = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    vectors[key] = self._memory[key]
+            self.hits_memory += len(vectors)
+
+            pending = list(dict.fromkeys(key for key in keys if key not in vectors))
+            if pending:
+                from_disk = self._load_from_disk(pending)
+                self.hits_disk += len(from_disk)
+                for key, vector in from_disk.items():
+                    self._remember(key, vector)
+                    vectors[key] = vector
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing[key] = text
+        if missing:
+            with span("embedding", self.model, texts=len(missing)):
+                embedded = embed_missing(list(missing.values()))
+            with self._lock:
+                self.misses += len(missing)
+                self._store_on_disk(zip(missing.keys(), embedded))
+                for key, vector in zip(missing.keys(), embedded):
+                    self._remember(key, vector)
+                    vectors[key] = vector
+
+        return [vectors[key] for key in keys]
+
+    def embed_documents(self, texts):
+        return self._embed(list(texts), self.embedder.embed_documents)
+
+    def embed_query(self, text):
+        return self._embed([text], lambda missing: [self.embedder.embed_query(missing[0])])[0]
+
+    def stats(self):
+        """
+        Return hit/miss counters and cache sizes.
+        """
+        with self._lock:
+            hits_memory, hits_disk, misses = self.hits_memory, self.hits_disk, self.misses
+            memory_items, disk_bytes = len(self._memory), self._disk_bytes
+        lookups = hits_memory + hits_disk + misses
+        return {
+            "model": self.model,
+            "hits_memory": hits_memory,
+            "hits_disk": hits_disk,
+            "misses": misses,
+            "hit_rate": round((hits_memory + hits_disk) / lookups, 4) if lookups else 0.0,
+            "memory_items": memory_items,
+            "disk_bytes": disk_bytes,
+        }
@@ -1,17 +1,26 @@
-from langchain.agents import AgentExecutor, create_openai_functions_agent
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import tool
-from langchain.memory import ConversationBufferMemory
+import asyncio
 import sys
 import os
 import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from nba_apis import get_player_stat, get_player_salary, search_players
+from config.agent_config import PLAYER_AGENT_MODEL, MAX_TOOL_WORKERS
+from config.history_config import AGENT_HISTORY_MAX_TOKENS, TOOL_OUTPUT_MAX_TOKENS
+from nba_apis import get_player_stat, get_player_stats_for_seasons, get_player_salary, search_players
+from tool_timing import ToolTimingHandler
+from tracing import span
+from registry import register
+from session_store import load_chat_history, save_chat_turn, summary_key
+from history_budget import HistoryBudget, compact_chat_history, truncate_text
 
+logger = logging.getLogger(__name__)
 
 # Define tools
 @tool
@@ -24,7 +33,7 @@ def search_players_tool(name: str) -> str:
     result = search_players(name)
     if isinstance(result, dict) and "error" in result:
         return f"Error: {result['error']}"
-    return str(result)
+    return truncate_text(str(result), TOOL_OUTPUT_MAX_TOKENS)
 
 @tool
 def get_player_stat_tool(id: str, season: str) -> str:
@@ -37,7 +46,20 @@ def get_player_stat_tool(id: str, season: str) -> str:
     result = get_player_stat(id, season)
     if isinstance(result, dict) and "error" in result:
         return f"Error: {result['error']}"
-    return str(result)
+    return truncate_text(str(result), TOOL_OUTPUT_MAX_TOKENS)
+
+@tool
+def get_player_stats_by_seasons_tool(id: str, seasons: List[str]) -> str:
+    """Retrieve statistics for a given NBA player over several seasons in one call. Returns per-game averages, medians, totals and per-36 minute numbers for each season, plus the same numbers over all requested seasons combined.
+    
+    Args:
+        id: The player's unique ID.
+        seasons: The NBA seasons (e.g., ["2021", "2022", "2023"], where 2023 is the 2023-2024 season).
+    """
+    result = get_player_stats_for_seasons(id, seasons)
+    if isinstance(result, dict) and "error" in result:
+        return f"Error: {result['error']}"
+    return truncate_text(str(result), TOOL_OUTPUT_MAX_TOKENS)
 
 @tool
 def get_player_salary_tool(name: str) -> str:
@@ -49,18 +71,20 @@ def get_player_salary_tool(name: str) -> str:
     result = get_player_salary(name)
     if isinstance(result, dict) and "error" in result:
         return f"Error: {result['error']}"
-    return str(result)
+    return truncate_text(str(result), TOOL_OUTPUT_MAX_TOKENS)
 
 
 # Create the agent
 tools = [
     search_players_tool, 
     get_player_stat_tool, 
+    get_player_stats_by_seasons_tool, 
     get_player_salary_tool, 
 ]
 
-# Initialize conversation memory
-memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+# Key of this agent's memory in the session state, and its token budget
+MEMORY_KEY = "player_agent_history"
+history_budget = HistoryBudget(AGENT_HISTORY_MAX_TOKENS)
 
 prompt = ChatPromptTemplate.from_messages([
     ("system", """You are an NBA player information assistant that focuses exclusively on providing detailed player information. Use the available tools to retrieve and present player data efficiently.
@@ -83,7 +107,15 @@ prompt = ChatPromptTemplate.from_messages([
        - If the user doesn't specify a season in their query, you MUST first ask "Which NBA season would you like to see stats for? For example, 2023 represents the 2022-2023 season." and wait for their response
        - Only proceed with the get_player_stat_tool call after the user has specified a season
     
-    3. get_player_salary_tool:
+    3. get_player_stats_by_seasons_tool:
+       - Purpose: Retrieve statistics for a given NBA player over several seasons in ONE call
+       - Parameters:
+         * id (string) - The player's unique ID (obtained from search_players_tool)
+         * seasons (list of strings) - The NBA seasons, e.g. ["2021", "2022", "2023"]
+       - Returns per-game averages, medians, totals and per-36 minute numbers for each season and for all seasons combined
+       - Use this instead of calling get_player_stat_tool once per season for career, multi-season or season-to-season comparison questions
+    
+    4. get_player_salary_tool:
        - Purpose: Retrieve salary information for NBA players by their last name
        - Parameter: name (string) - The player's last name or full name
        - IMPORTANT: Similar to search_players_tool, this searches by LAST NAME ONLY
@@ -93,6 +125,8 @@ prompt = ChatPromptTemplate.from_messages([
     1. Player Information Processing
        - Use search_players_tool() first to find players matching user queries and obtain player IDs
        - Use get_player_stat_tool() to retrieve performance statistics for specific seasons
+       - Use get_player_stats_by_seasons_tool() when the user asks about more than one season
+       - When several lookups do not depend on each other (e.g. searching two different players, or the salary and the stats of a player whose ID you already have), request all of those tool calls at once in the same turn; they run in parallel
        - Use get_player_salary_tool() to provide salary and contract information
        - Present information in a clear, organized format
        - When users ask about player stats without specifying a season, you MUST ask them which season they're interested in before proceeding
@@ -131,44 +165,83 @@ prompt = ChatPromptTemplate.from_messages([
     MessagesPlaceholder(variable_name="agent_scratchpad"),
 ])
 
-# Create the agent and executor
-llm = ChatOpenAI(temperature=0, model="gpt-4")
-agent = create_openai_functions_agent(llm, tools, prompt)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, memory=memory)
+def _build_agent_executor():
+    # Create the agent and executor. The tools agent lets the model request several
+    # independent tool calls in one turn, which ainvoke runs concurrently.
+    # Imported here, the OpenAI chat model and agent machinery are slow to import
+    from langchain.agents import AgentExecutor, create_openai_tools_agent
+    from langchain_openai import ChatOpenAI
+
+    llm = ChatOpenAI(temperature=0, model=PLAYER_AGENT_MODEL)
+    agent = create_openai_tools_agent(llm, tools, prompt)
+    return AgentExecutor(agent=agent, tools=tools, verbose=logger.isEnabledFor(logging.DEBUG))
+
+# Built on first use or by the startup warm-up
+get_agent_executor = register("player_agent_executor", _build_agent_executor)
 
-def process_user_message(message):
+
+async def _run_agent(context, callbacks):
+    # The executor gathers the tool calls of one turn and runs the sync tools on
+    # the loop's default executor, so bound it to MAX_TOOL_WORKERS threads.
+    # Results come back in the order the model requested them.
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS, thread_name_prefix="agent-tool"))
+    return await get_agent_executor().ainvoke(context, config={"callbacks": callbacks})
+
+def process_user_message(message, on_tool_event=None, session=None, usage=None):
     """
     Process a user message through the NBA player information assistant.
     
     Args:
         message: The user's input message/query
+        on_tool_event: Optional callable receiving tool_start/tool_end event dicts
+        session: Session state dict holding this user's chat history, updated in place
+        usage: Optional dict that receives the agent's prompt token counts
         
     Returns:
         The agent's response as a string
     """
+    session = session if session is not None else {}
     try:
-        context = {
-            "input": message
-        }
-        response = agent_executor.invoke(context)
+        with span("agent", "player_agent") as agent_span:
+            context = {
+                "input": message,
+                "chat_history": load_chat_history(session, MEMORY_KEY)
+            }
+            timing = ToolTimingHandler(on_event=on_tool_event)
+            response = asyncio.run(_run_agent(context, [timing]))
+            summary = timing.summary()
+            agent_span.set(prompt_tokens=summary["prompt_tokens"], completion_tokens=summary["completion_tokens"],
+                           llm_calls=summary["llm_calls"], tool_calls=summary["calls"])
+        if summary["calls"]:
+            logger.debug("%s tool calls, %s ms of tool time in %s ms wall clock",
+                         summary["calls"], summary["tool_ms"], summary["wall_ms"])
+        save_chat_turn(session, MEMORY_KEY, message, response["output"])
+        history_tokens = compact_chat_history(session, MEMORY_KEY, history_budget)
+        logger.debug("player agent: %s prompt tokens over %s LLM calls, history now %s tokens",
+                     summary["prompt_tokens"], summary["llm_calls"], history_tokens)
+        if usage is not None:
+            usage["player_agent"] = {
+                "prompt_tokens": summary["prompt_tokens"],
+                "completion_tokens": summary["completion_tokens"],
+                "llm_calls": summary["llm_calls"],
+                "history_tokens": history_tokens,
+            }
         return response["output"]
     except Exception as e:
+        logger.exception("Player agent failed")
         return f"An error occurred: {str(e)}"
 
-def agent_function_calling(user_query):
+def agent_function_calling(user_query, on_tool_event=None, session=None, usage=None):
     # Use the provided query directly instead of asking for input
-    response = process_user_message(user_query)
-    print("\nAssistant:", response)
-    print("\n" + "-"*50 + "\n")
+    response = process_user_message(user_query, on_tool_event=on_tool_event, session=session, usage=usage)
+    logger.debug("Player agent response: %s", response)
     return response
 
-def clear_function_agent_history():
+def clear_function_agent_history(session):
     """
-    Clear the agent's conversation history.
+    Clear the agent's conversation history in a session.
     """
-    global memory
-    memory.clear()
+    session.pop(MEMORY_KEY, None)
+    session.pop(summary_key(MEMORY_KEY), None)
     return "Chat history cleared"
-
-# user_query = "What is Lebron James's Points per game"
-# print(function_calling(user_query))
\ No newline at end of file
@@ -0,0 +1,213 @@
+import logging
+import os
+import sys
+import threading
+
+from dotenv import load_dotenv
+from openai import OpenAI
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from session_store import summary_key
+from tracing import span
+from config.history_config import (
+    KEEP_RECENT_MESSAGES,
+    MAX_MESSAGE_TOKENS,
+    SUMMARY_MODEL,
+    SUMMARY_MAX_TOKENS,
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tokenizer used for counting; every chat model we call uses cl100k_base or a close successor
+DEFAULT_ENCODING = "cl100k_base"
+
+# Per-message overhead of the chat format (role and separators)
+TOKENS_PER_MESSAGE = 3
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+                except Exception as e:
+                    # tiktoken missing, or its BPE file can't be downloaded: estimate instead
+                    logger.warning("tiktoken unavailable, estimating token counts: %s", e)
+                    _encoding = False
+    return _encoding
+
+
+def count_tokens(text):
+    """
+    Number of tokens in a text (about 4 characters per token if tiktoken is unavailable).
+    """
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text or "", disallowed_special=()))
+    return (len(text or "") + 3) // 4
+
+
+def count_message_tokens(messages):
+    """
+    Number of prompt tokens of a list of {"role", "content"} chat messages.
+    """
+    return sum(TOKENS_PER_MESSAGE + count_tokens(message.get("content")) for message in messages) + 3
+
+
+def _cut(text, head_tokens, tail_tokens, encoding):
+    if encoding:
+        tokens = encoding.encode(text, disallowed_special=())
+        head = encoding.decode(tokens[:head_tokens])
+        tail = encoding.decode(tokens[-tail_tokens:]) if tail_tokens else ""
+    else:
+        head = text[:head_tokens * 4]
+        tail = text[-tail_tokens * 4:] if tail_tokens else ""
+    return head, tail
+
+
+def truncate_text(text, max_tokens):
+    """
+    Cut a text to at most `max_tokens` tokens, keeping its beginning and end.
+
+    The truncation marker counts against the budget, so a truncated text fits
+    as it is and is left unchanged when truncated again.
+    """
+    text = text or ""
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    keep = max_tokens - count_tokens(f"\n... [{total} tokens truncated] ...\n")
+    while True:
+        keep = max(keep, 0)
+        head_tokens = keep * 3 // 4
+        head, tail = _cut(text, head_tokens, keep - head_tokens, encoding)
+        truncated = f"{head}\n... [{total - keep} tokens truncated] ...\n{tail}"
+        excess = count_tokens(truncated) - max_tokens
+        # Tokens can merge across the cut, retry with fewer kept tokens
+        if excess <= 0 or keep == 0:
+            return truncated
+        keep -= excess
+
+
+def summarize_messages(previous_summary, messages):
+    """
+    Fold older chat messages into the rolling conversation summary.
+
+    Falls back to a truncated transcript if the summary model can't be reached.
+
+    Args:
+        previous_summary: The summary so far, may be empty
+        messages: {"role", "content"} messages to add to it
+
+    Returns:
+        str: The updated summary
+    """
+    transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+    try:
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        with span("openai", SUMMARY_MODEL, purpose="summary") as summary_span:
+            response = client.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=[
+                    {"role": "system", "content": (
+                        "You maintain a running summary of a conversation between a user and an NBA assistant. "
+                        "Merge the new messages into the existing summary. Keep player names, seasons, "
+                        "salaries, budgets, picked players and the user's preferences; drop raw data and pleasantries. "
+                        f"Answer with the updated summary only, at most {SUMMARY_MAX_TOKENS} tokens."
+                    )},
+                    {"role": "user", "content": f"Existing summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"},
+                ],
+                temperature=0,
+                max_tokens=SUMMARY_MAX_TOKENS,
+            )
+            if response.usage:
+                summary_span.set(prompt_tokens=response.usage.prompt_tokens,
+                                 completion_tokens=response.usage.completion_tokens)
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.warning("Error summarizing conversation: %s", e)
+        return truncate_text(f"{previous_summary}\n{transcript}".strip(), SUMMARY_MAX_TOKENS)
+
+
+class HistoryBudget:
+    """
+    Token budget for a chat history, shared by the main model and both agents.
+
+    compact() applies two steps to a list of {"role", "content"} messages:
+        1. every message but the latest is cut to `max_message_tokens`, so
+           bulky payloads such as the raw first-model output only cost their
+           full size in the request that produced them
+        2. while the history is over `max_tokens`, the oldest messages
+           (never the last `keep_recent`) are folded into a rolling summary
+    """
+
+    def __init__(self, max_tokens, keep_recent=KEEP_RECENT_MESSAGES, max_message_tokens=MAX_MESSAGE_TOKENS,
+                 summarizer=summarize_messages):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.max_message_tokens = max_message_tokens
+        self.summarizer = summarizer
+
+    def compact(self, messages, summary=""):
+        """
+        Args:
+            messages: {"role", "content"} messages, oldest first
+            summary: The current rolling summary of earlier messages
+
+        Returns:
+            tuple: (compacted messages, updated summary)
+        """
+        messages = [
+            dict(message, content=truncate_text(message.get("content"), self.max_message_tokens))
+            if i < len(messages) - 1 else message
+            for i, message in enumerate(messages)
+        ]
+
+        total = count_message_tokens(messages) + count_tokens(summary)
+        if total <= self.max_tokens or len(messages) <= self.keep_recent:
+            return messages, summary
+
+        # Fold the oldest messages until the rest fits in half the budget, so
+        # the summarizer runs every few turns rather than on every turn
+        fold = 0
+        while len(messages) - fold > self.keep_recent and total > self.max_tokens // 2:
+            total -= TOKENS_PER_MESSAGE + count_tokens(messages[fold].get("content"))
+            fold += 1
+        # Don't start the kept history with an assistant reply to a folded question
+        while fold < len(messages) - self.keep_recent and messages[fold].get("role") != "user":
+            fold += 1
+        if fold == 0:
+            return messages, summary
+        return messages[fold:], self.summarizer(summary, messages[:fold])
+
+
+def compact_chat_history(state, key, budget):
+    """
+    Apply a HistoryBudget to an agent memory stored in session state.
+
+    Returns:
+        int: Tokens of the compacted history, summary included
+    """
+    roles = {"human": "user", "ai": "assistant", "system": "system"}
+    messages = [
+        {"role": roles.get(message["type"], message["type"]), "content": message["data"].get("content", "")}
+        for message in state.get(key, [])
+    ]
+    compacted, summary = budget.compact(messages, state.get(summary_key(key), ""))
+    stored = state.get(key, [])
+    state[key] = stored[len(stored) - len(compacted):]
+    for message, compacted_message in zip(state[key], compacted):
+        message["data"]["content"] = compacted_message["content"]
+    if summary:
+        state[summary_key(key)] = summary
+    return count_message_tokens(compacted) + count_tokens(summary)
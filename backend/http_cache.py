@@ -0,0 +1,137 @@
+"""
+HTTP caching of the salary data endpoints.
+
+Responses computed from the salary table only change when the salary data
+version changes (bumped by every salary ingest). cached_by_data_version
+keeps each rendered response in memory under (endpoint, query parameters,
+data version), sends it with a strong ETag, Cache-Control and the data
+version, and answers If-None-Match revalidations with 304 Not Modified
+without running the view. The ETag covers the data version as well as the
+body, so every salary ingest gives clients a new ETag.
+"""
+
+import functools
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.http_cache_config import HTTP_CACHE_ENABLED, HTTP_CACHE_MAX_AGE, HTTP_CACHE_MAX_ENTRIES
+from mongo import MongoUnavailable
+
+# Statuses worth caching: results and "no such player"
+CACHEABLE_STATUSES = (200, 404)
+
+
+class ResponseCache:
+    """
+    LRU cache of rendered responses: key -> (status, mimetype, body, etag).
+    """
+
+    def __init__(self, max_entries=HTTP_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _cache_key(version):
+    # Repeated parameters keep their order, different parameters are sorted
+    params = tuple(sorted((name, tuple(request.args.getlist(name))) for name in request.args))
+    return request.endpoint, params, version
+
+
+def _render(entry, version):
+    status, mimetype, body, etag = entry
+    response = Response(body, status=status, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={HTTP_CACHE_MAX_AGE}"
+    response.headers["X-Data-Version"] = str(version)
+    # Turns the response into a 304 if the client already has this ETag
+    return response.make_conditional(request)
+
+
+def cached_by_data_version(get_version):
+    """
+    Decorator caching a GET view's responses until the data version changes.
+
+    Args:
+        get_version: Zero-argument callable returning the current data version
+
+    Views can opt a response out, e.g. a fallback served on error, by setting
+    `Cache-Control: no-store` on it.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not HTTP_CACHE_ENABLED or request.method != "GET":
+                return view(*args, **kwargs)
+            try:
+                version = get_version()
+            except MongoUnavailable:
+                # Let the view answer (or fail) as it would without the cache
+                return view(*args, **kwargs)
+
+            key = _cache_key(version)
+            entry = response_cache.get(key)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code not in CACHEABLE_STATUSES or response.cache_control.no_store:
+                    return response
+                body = response.get_data()
+                etag = f"{version}-{hashlib.sha256(body).hexdigest()[:32]}"
+                entry = (response.status_code, response.mimetype, body, etag)
+                response_cache.put(key, entry)
+
+            response = _render(entry, version)
+            if response.status_code == 304:
+                response_cache.record_not_modified()
+            return response
+        return wrapper
+    return decorator
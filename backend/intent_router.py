@@ -0,0 +1,392 @@
+import logging
+import math
+import os
+import re
+import sys
+import threading
+from collections import Counter, defaultdict
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.router_config import ROUTER_ENABLED, ROUTER_MIN_CONFIDENCE, ROUTER_MAX_PLAYERS
+from salary_schema import SEASONS, CURRENT_SEASON, normalize_name
+
+logger = logging.getLogger(__name__)
+
+# Intents answered from the salary table; anything else goes to the LLM pipeline
+SALARY = "salary"
+RANK = "rank"
+BUDGET = "budget"
+OTHER = "other"
+
+# Queries about stats, comparisons or earlier turns always need the agent
+AGENT_ONLY_PATTERN = re.compile(
+    r"\b(stats?|statistics|points|rebounds|assists|steals|blocks|average|averages|averaged|per game|ppg|rpg|apg|"
+    r"career|compare|comparison|vs|versus|better|best|worst|why|he|him|his|she|her|they|them|their|that player|"
+    r"this player|same|previous|above|also|too|news|injury|injured|trade|traded)\b"
+)
+
+SALARY_RULE = re.compile(r"\b(salary|salaries|paid|pay|earn|earns|earning|earnings|makes?|making|contract|wage)\b")
+RANK_RULE = re.compile(r"\b(?:rank(?:ed|ing)?|number|no|spot|position)\s*(?:of\s*)?#?\s*(\d{1,3})\b|#(\d{1,3})\b")
+# A rank is only a salary rank with salary context: "#1 pick", "ranked 3 in MVP
+# voting" or "jersey number 30" are not about the salary table
+RANK_CONTEXT = re.compile(
+    r"\b(?:salary|salaries|paid|pay|payroll|earners?|earnings|contracts?|money|richest|highest|lowest|cheapest)\b"
+)
+BUDGET_RULE = re.compile(r"\b(budget|afford|affordable|under|within|below|less than|cheaper than|for)\b")
+
+# "$30,000,000", "$30m", "30 million", "2.5M"
+AMOUNT_PATTERN = re.compile(
+    r"(\$)?\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(billion|bn|b|million|mil|mm|m|thousand|k)?\b", re.IGNORECASE
+)
+AMOUNT_UNITS = {
+    "billion": 10 ** 9, "bn": 10 ** 9, "b": 10 ** 9,
+    "million": 10 ** 6, "mil": 10 ** 6, "mm": 10 ** 6, "m": 10 ** 6,
+    "thousand": 10 ** 3, "k": 10 ** 3,
+}
+SEASON_PATTERN = re.compile(r"\b(20\d\d)\s*[/-]\s*(\d\d)\b")
+
+# A salary answer is only templated for a season read from the query or for the
+# current one; other years, relative seasons and career totals need the agent
+YEAR_PATTERN = re.compile(r"\b(?:19|20)\d\d\b|'\d\d\b")
+OTHER_SEASON_PATTERN = re.compile(
+    r"\b(?:(?:next|last|previous|prior|past|upcoming|coming|following)\s+(?:season|year)s?|career|lifetime|all time)\b"
+)
+
+# "Is LeBron's salary under 50 million?", "Does Curry make more than $40m?"
+YES_NO_COMPARISON_PATTERN = re.compile(
+    r"^(?:is|are|was|were|does|do|did|can|could|will|would|has|have|should)\b.*"
+    r"\b(?:under|over|above|below|within|more|less|greater|higher|lower|least|most|than|exceeds?)\b"
+)
+
+# Seed examples of the local classifier. Numbers are replaced by <num> and
+# player name tokens by <player> before training and classification.
+TRAINING_EXAMPLES = {
+    SALARY: [
+        "what is <player> <player> salary",
+        "how much does <player> make",
+        "how much is <player> paid",
+        "<player> salary",
+        "what does <player> <player> earn per year",
+        "how much money does <player> get",
+        "what is <player> contract worth",
+        "how much will <player> be paid next season",
+        "<player> <player> pay",
+        "what does <player> pull in a year",
+        "how much is <player> <player> getting this season",
+        "tell me the salary of <player>",
+    ],
+    RANK: [
+        "top 5 players at rank <num>",
+        "who is ranked <num>",
+        "show players from rank <num>",
+        "which players are at number <num> on the salary list",
+        "who are the players ranked <num> to <num>",
+        "list the players around rank <num>",
+        "who is number <num> in salaries",
+        "players starting at rank <num>",
+        "give me five players from position <num>",
+        "who sits at spot <num> of the salary ranking",
+    ],
+    BUDGET: [
+        "players within a <num> million budget",
+        "who can i afford with <num> million",
+        "5 players under <num> million",
+        "which players can i get for <num>",
+        "show me players below <num>",
+        "i have a budget of <num> who can i pick",
+        "good value players under <num> million",
+        "players cheaper than <num> m",
+        "who fits in <num> dollars",
+        "players i can sign with <num> million left",
+    ],
+    OTHER: [
+        "what are <player> stats in <num>",
+        "how many points did <player> average last season",
+        "compare <player> and <player>",
+        "is <player> better than <player>",
+        "tell me about <player> career",
+        "what about his rebounds",
+        "show me <player> <player> assists per game in <num>",
+        "who won the finals",
+        "how old is <player>",
+        "what team does <player> play for",
+        "latest news about <player>",
+        "hello",
+        "thanks",
+        "what can you do",
+        "how did <player> play in the <num> playoffs",
+    ],
+}
+
+
+def featurize(query, name_tokens=()):
+    tokens = []
+    for token in normalize_name(query).split():
+        if token.isdigit():
+            tokens.append("<num>")
+        elif token in name_tokens:
+            tokens.append("<player>")
+        else:
+            tokens.append(token)
+    return tokens
+
+
+class NaiveBayesIntentClassifier:
+    """
+    Multinomial naive Bayes over query words, trained on a handful of examples.
+
+    Tiny and local on purpose: it runs in well under a millisecond and only
+    has to catch phrasings of the fast-path intents the rules miss.
+    """
+
+    def __init__(self, examples=TRAINING_EXAMPLES):
+        self.word_counts = defaultdict(Counter)
+        self.totals = Counter()
+        self.priors = {}
+        vocabulary = set()
+        for intent, queries in examples.items():
+            for query in queries:
+                tokens = query.split()
+                self.word_counts[intent].update(tokens)
+                self.totals[intent] += len(tokens)
+                vocabulary.update(tokens)
+        count = sum(len(queries) for queries in examples.values())
+        self.priors = {intent: math.log(len(queries) / count) for intent, queries in examples.items()}
+        self.vocabulary = vocabulary
+        self.vocabulary_size = len(vocabulary)
+
+    def predict(self, tokens):
+        """
+        Returns:
+            tuple: (most likely intent, its probability)
+        """
+        scores = {}
+        for intent, prior in self.priors.items():
+            denominator = self.totals[intent] + self.vocabulary_size
+            scores[intent] = prior + sum(
+                math.log((self.word_counts[intent][token] + 1) / denominator) for token in tokens
+            )
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1 / normalizer
+
+
+def parse_amount(text):
+    """
+    Largest dollar amount mentioned in a text, e.g. "$30m" or "30 million" -> 30000000, or None.
+    """
+    amounts = []
+    for dollar, number, unit in AMOUNT_PATTERN.findall(text):
+        value = float(number.replace(",", ""))
+        if unit:
+            value *= AMOUNT_UNITS[unit.lower()]
+        elif not dollar and value < 10 ** 5:
+            # A bare small number is a rank or a count, not a budget
+            continue
+        amounts.append(int(value))
+    return max(amounts) if amounts else None
+
+
+def format_salary(amount):
+    return f"${amount:,}" if amount is not None else "not available"
+
+
+def player_salary(player, season=CURRENT_SEASON):
+    salaries = player.get("salaries") or {}
+    if salaries.get(season) is not None:
+        return format_salary(salaries[season])
+    return player.get(season) or "not available"
+
+
+class IntentRouter:
+    """
+    Routes player_details queries either to a templated answer built from the
+    salary table (the fast path) or to the LLM pipeline.
+
+    High-precision rules are tried first, then the local classifier. A query
+    only takes the fast path when its intent is recognized and every slot it
+    needs (player name, rank, budget) can be read from the query; otherwise
+    it goes to the agent, so the router never answers worse than before.
+    """
+
+    def __init__(self, name_tokens=None, find_players=None, players_from_rank=None, players_within_budget=None,
+                 min_confidence=ROUTER_MIN_CONFIDENCE, max_players=ROUTER_MAX_PLAYERS):
+        self.name_tokens = name_tokens or (lambda: ())
+        self.find_players = find_players
+        self.players_from_rank = players_from_rank
+        self.players_within_budget = players_within_budget
+        self.min_confidence = min_confidence
+        self.max_players = max_players
+        self.classifier = NaiveBayesIntentClassifier()
+        self.paths = Counter()
+        self._lock = threading.Lock()
+
+    def classify(self, query):
+        """
+        Returns:
+            tuple: (intent, confidence, method), method is "rule", "classifier" or "guard"
+        """
+        text = normalize_name(query)
+        if AGENT_ONLY_PATTERN.search(text) or YES_NO_COMPARISON_PATTERN.search(text):
+            return OTHER, 1.0, "guard"
+        name_tokens = self.name_tokens()
+        # "for", "under" and "within" are common words: a query naming a player
+        # is about that player, not a budget
+        if BUDGET_RULE.search(text) and parse_amount(query) is not None and not self._matching_players(query):
+            return BUDGET, 1.0, "rule"
+        if RANK_RULE.search(query.lower()) and RANK_CONTEXT.search(text):
+            return RANK, 1.0, "rule"
+        if SALARY_RULE.search(text) and any(token in name_tokens for token in text.split()):
+            return SALARY, 1.0, "rule"
+        intent, confidence = self.classifier.predict(featurize(query, name_tokens))
+        return intent, confidence, "classifier"
+
+    def route(self, query):
+        """
+        Decide how to answer a query.
+
+        Returns:
+            dict: intent, method and confidence of the decision, and the
+                  templated answer, None if the query needs the LLM pipeline
+        """
+        intent, confidence, method = self.classify(query)
+        decision = {"intent": intent, "method": method, "confidence": round(confidence, 3), "answer": None}
+        if intent == OTHER or confidence < self.min_confidence:
+            return decision
+        try:
+            if intent == SALARY:
+                decision["answer"] = self._salary_answer(query)
+            elif intent == RANK:
+                decision["answer"] = self._rank_answer(query)
+            elif intent == BUDGET:
+                decision["answer"] = self._budget_answer(query)
+        except Exception as e:
+            logger.warning("Fast path failed, using the agent: %s", e)
+            decision["answer"] = None
+        return decision
+
+    def _query_names(self, query):
+        name_tokens = self.name_tokens()
+        names = [token for token in normalize_name(query).split() if token in name_tokens]
+        # Words such as "will" or "green" are name tokens too; drop the ones the
+        # classifier knows as question words unless nothing else is left
+        return [token for token in names if token not in self.classifier.vocabulary] or names
+
+    def _matching_players(self, query):
+        """
+        Players carrying every name token the query mentions, so "LeBron and
+        Curry" or a misread name matches nobody.
+        """
+        names = self._query_names(query)
+        if not names or self.find_players is None:
+            return []
+        return [
+            player for player in self.find_players(" ".join(names))
+            if set(names) <= set(normalize_name(player.get("name", "")).split())
+        ]
+
+    def _salary_season(self, query):
+        """
+        Season a salary query asks about, or None if it can't be read from the
+        query (another year, "next season", a career total...).
+        """
+        season_match = SEASON_PATTERN.search(query)
+        rest = query[:season_match.start()] + query[season_match.end():] if season_match else query
+        if YEAR_PATTERN.search(rest) or OTHER_SEASON_PATTERN.search(normalize_name(rest)):
+            return None
+        season = f"{season_match.group(1)}/{season_match.group(2)}" if season_match else CURRENT_SEASON
+        return season if season in SEASONS else None
+
+    def _salary_answer(self, query):
+        season = self._salary_season(query)
+        if season is None:
+            return None
+        # Answer only for one player: the one whose full name the query gives,
+        # or the only player the name matches ("Kobe" is Bufkin or Brown)
+        names = set(self._query_names(query))
+        players = self._matching_players(query)
+        exact = [player for player in players if set(normalize_name(player.get("name", "")).split()) == names]
+        players = exact or players
+        if len(players) != 1:
+            return None
+        player = players[0]
+        return (
+            f"{season} salary:\n"
+            f"- **{player.get('name')}** (salary rank {player.get('rank_value', player.get('rank'))}): "
+            f"{player_salary(player, season)} in {season}"
+        )
+
+    def _rank_answer(self, query):
+        match = RANK_RULE.search(query.lower())
+        if not match or not RANK_CONTEXT.search(normalize_name(query)):
+            return None
+        rank = int(match.group(1) or match.group(2))
+        players = self.players_from_rank(rank)[:self.max_players]
+        if not players:
+            return f"No players found from salary rank {rank}."
+        lines = [
+            f"- {player.get('rank_value', player.get('rank'))}. **{player.get('name')}**: {player.get(CURRENT_SEASON) or 'not available'}"
+            for player in players
+        ]
+        return "\n".join([f"Players from salary rank {rank} ({CURRENT_SEASON}):"] + lines)
+
+    def _budget_answer(self, query):
+        budget = parse_amount(query)
+        if budget is None:
+            return None
+        match = RANK_RULE.search(query.lower())
+        start_rank = int(match.group(1) or match.group(2)) if match else 1
+        players = self.players_within_budget(budget, start_rank)[:self.max_players]
+        if not players:
+            return f"No player's {CURRENT_SEASON} salary fits within {format_salary(budget)}."
+        lines = [
+            f"- {player.get('rank_value', player.get('rank'))}. **{player.get('name')}**: {player.get(CURRENT_SEASON) or 'not available'}"
+            for player in players
+        ]
+        return "\n".join([f"Players within a {format_salary(budget)} budget ({CURRENT_SEASON} salaries):"] + lines)
+
+    def record(self, path):
+        """
+        Count a request by the path it took (e.g. "fast:salary", "cache", "agent").
+        """
+        with self._lock:
+            self.paths[path] += 1
+
+    def stats(self):
+        with self._lock:
+            total = sum(self.paths.values())
+            fast = sum(count for path, count in self.paths.items() if path.startswith("fast:"))
+            return {
+                "requests": total,
+                "fast_path_rate": round(fast / total, 4) if total else 0.0,
+                "paths": dict(self.paths),
+            }
+
+
+_intent_router = None
+_intent_router_lock = threading.Lock()
+
+
+def get_intent_router():
+    """
+    Return the shared intent router, or None if ROUTER_ENABLED is off.
+    """
+    global _intent_router
+    if not ROUTER_ENABLED:
+        return None
+    if _intent_router is None:
+        with _intent_router_lock:
+            if _intent_router is None:
+                from player_repository import find_player_documents, player_name_tokens
+                from user_budget import get_top_5_players_from_rank, get_five_players_within_budget
+
+                _intent_router = IntentRouter(
+                    name_tokens=player_name_tokens,
+                    find_players=find_player_documents,
+                    players_from_rank=get_top_5_players_from_rank,
+                    players_within_budget=lambda budget, start_rank: get_five_players_within_budget(
+                        initial_budget=budget, start_rank=start_rank
+                    ),
+                )
+    return _intent_router
@@ -1,37 +1,51 @@
+import contextvars
 import json
+import logging
+import queue
+import threading
+import time
 from openai import OpenAI
 #from nba_apis import search_players, get_player_stat, get_player_salary
 from prompt import functions_system_prompt, main_system_prompt, tools
 import os
 from dotenv import load_dotenv
+import sys
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.history_config import MAIN_HISTORY_MAX_TOKENS
+from config.router_config import REPHRASE_AGENT_ANSWERS
 from query import query_pinecone_and_get_response
-from langchain_openai import OpenAIEmbeddings
-from pinecone import Pinecone
-from langchain_pinecone import PineconeVectorStore
-from function_agent import agent_function_calling
+from function_agent import agent_function_calling, clear_function_agent_history, MEMORY_KEY as PLAYER_AGENT_MEMORY_KEY
+from session_store import get_session_store, new_session_id, save_chat_turn, summary_key
+from history_budget import HistoryBudget, count_message_tokens
+from answer_cache import get_answer_cache, is_standalone_query
+from intent_router import get_intent_router
+from tracing import span
 
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
+logger = logging.getLogger(__name__)
+
 # Initialize global conversation histories
 function_model_conversation_history = [
     {"role": "system", "content": functions_system_prompt}
 ]
 
-main_model_conversation_history = [
-    {"role": "system", "content": main_system_prompt("player_details")}
-]
+# The main model conversation history is kept per session, under this key of the session state
+MAIN_HISTORY_KEY = "main_model_history"
+main_history_budget = HistoryBudget(MAIN_HISTORY_MAX_TOKENS)
 
 MAX_TURNS = 20
 MAX_HISTORY = 10  # Keep last 10 exchanges
 
 response_options = ["player_details", "news", "recommendation"]
 
-##response_options
-def main_model(user_query, response_options = "player_details"):
-    global main_model_conversation_history
-    client = OpenAI(api_key=api_key)
-    
+def _add_user_message(session, user_query, response_options):
+    main_model_conversation_history = session.get(MAIN_HISTORY_KEY) or [
+        {"role": "system", "content": main_system_prompt("player_details")}
+    ]
     # Update system prompt if response option changed
     if main_model_conversation_history[0]["content"] != main_system_prompt(response_options):
         main_model_conversation_history[0] = {"role": "system", "content": main_system_prompt(response_options)}
@@ -39,39 +53,272 @@ def main_model(user_query, response_options = "player_details"):
     # Add user message to conversation
     main_model_conversation_history.append({"role": "user", "content": user_query})
     
-    # Manage conversation history length
-    if len(main_model_conversation_history) > (MAX_HISTORY * 2 + 1):
-        main_model_conversation_history = [main_model_conversation_history[0]] + main_model_conversation_history[-(MAX_HISTORY * 2):]
-    print("Current response_options : ", response_options)
+    # Keep the history within its token budget: cut earlier bulky messages and
+    # fold the oldest turns into a rolling summary
+    messages, summary = main_history_budget.compact(
+        main_model_conversation_history[1:], session.get(summary_key(MAIN_HISTORY_KEY), "")
+    )
+    main_model_conversation_history = [main_model_conversation_history[0]] + messages
+    if summary:
+        session[summary_key(MAIN_HISTORY_KEY)] = summary
+    session[MAIN_HISTORY_KEY] = main_model_conversation_history
+    return main_model_conversation_history
+
+def _completion_messages(session, main_model_conversation_history):
+    # The rolling summary goes right after the system prompt
+    summary = session.get(summary_key(MAIN_HISTORY_KEY))
+    if not summary:
+        return main_model_conversation_history
+    return [
+        main_model_conversation_history[0],
+        {"role": "system", "content": f"Summary of the earlier conversation: {summary}"},
+    ] + main_model_conversation_history[1:]
+
+def _report_usage(usage, messages=None, prompt_tokens=None):
+    if messages is not None:
+        usage["main_model"] = {
+            "prompt_tokens": prompt_tokens if prompt_tokens is not None else count_message_tokens(messages),
+            "history_tokens": count_message_tokens(messages),
+        }
+    usage["total_prompt_tokens"] = sum(
+        part["prompt_tokens"] for part in usage.values() if isinstance(part, dict)
+    )
+    logger.debug("request used %s prompt tokens: %s", usage["total_prompt_tokens"], usage)
+
+def _route_query(user_query, response_options):
+    """
+    Return the intent router's decision for a player_details query, or None.
+    """
+    router = get_intent_router()
+    if router is None or response_options != "player_details":
+        return None
+    decision = router.route(user_query)
+    logger.debug("routed as %s by %s (%s)", decision["intent"], decision["method"], decision["confidence"])
+    return decision
+
+def _record_path(usage, path):
+    # Which path answered the request: "fast:<intent>", "cache", "agent", "agent:direct" or "news"
+    usage["path"] = path
+    router = get_intent_router()
+    if router is not None:
+        router.record(path)
+    logger.debug("request answered by %s", path)
+
+def _run_first_model(user_query, response_options, session, on_tool_event=None, usage=None):
+    logger.debug("Current response_options: %s", response_options)
+    result = None
     if response_options == "player_details":
         # Get response from function_calling
-        result = agent_function_calling(user_query)
-        print(result)
-        print("-"*100)
-        print("-"*100)
+        result = agent_function_calling(user_query, on_tool_event=on_tool_event, session=session, usage=usage)
     elif response_options == "news":
         result = query_pinecone_and_get_news(user_query)
-        print(result)
-        print("-"*100)
-        print("-"*100)
-    # Add result to conversation if it exists
-    if result:
-        main_model_conversation_history.append({"role": "assistant", "content": 
-                                                "this is the output the first model : /n" + result})
+    logger.debug("First model result: %s", result)
+    return result
+
+def _lookup_cached_answer(user_query, response_options):
+    """
+    Return (cached answer or None, query embedding or None) for a standalone query.
+    """
+    if not is_standalone_query(user_query):
+        return None, None
+    try:
+        # The cache is optional: if it can't be built, every lookup is a miss
+        cache = get_answer_cache()
+        if cache is None:
+            return None, None
+        return cache.lookup(response_options, user_query)
+    except Exception as e:
+        logger.warning("Answer cache lookup failed: %s", e)
+        return None, None
+
+def _store_cached_answer(user_query, response_options, answer, started, vector):
+    if vector is None:
+        return
+    try:
+        cache = get_answer_cache()
+        if cache is None:
+            return
+        cache.store(response_options, user_query, answer, (time.perf_counter() - started) * 1000, vector=vector)
+    except Exception as e:
+        logger.warning("Answer cache store failed: %s", e)
+
+def _record_direct_answer(session, main_model_conversation_history, user_query, response_options, answer):
+    # Keep the conversation coherent for follow-up questions, as if the answer had been
+    # generated by the full pipeline (used for cached and fast-path answers)
+    main_model_conversation_history.append({"role": "assistant", "content": answer})
+    if response_options == "player_details":
+        save_chat_turn(session, PLAYER_AGENT_MEMORY_KEY, user_query, answer)
+
+##response_options
+def main_model(user_query, response_options = "player_details", session_id = None, usage = None):
+    client = OpenAI(api_key=api_key)
+    usage = usage if usage is not None else {}
+    # Requests of one session run one at a time, other sessions run concurrently
+    started = time.perf_counter()
+    with get_session_store().session(session_id or new_session_id()) as session:
+        main_model_conversation_history = _add_user_message(session, user_query, response_options)
+
+        # Simple salary and rank questions are answered straight from the salary table
+        decision = _route_query(user_query, response_options)
+        if decision and decision["answer"]:
+            _record_direct_answer(session, main_model_conversation_history, user_query, response_options, decision["answer"])
+            _record_path(usage, f"fast:{decision['intent']}")
+            return decision["answer"]
+
+        # Near-duplicate standalone questions reuse an earlier answer
+        cached_answer, query_vector = _lookup_cached_answer(user_query, response_options)
+        if cached_answer:
+            _record_direct_answer(session, main_model_conversation_history, user_query, response_options, cached_answer)
+            _record_path(usage, "cache")
+            return cached_answer
+
+        result = _run_first_model(user_query, response_options, session, usage=usage)
+        # Add result to conversation if it exists
+        if result and response_options == "player_details" and not REPHRASE_AGENT_ANSWERS:
+            # The agent's answer is already user-facing, skip the rephrase completion
+            main_model_conversation_history.append({"role": "assistant", "content": result})
+            _report_usage(usage)
+            _record_path(usage, "agent:direct")
+            _store_cached_answer(user_query, response_options, result, started, query_vector)
+            return result
+
+        if result:
+            main_model_conversation_history.append({"role": "assistant", "content": 
+                                                    "this is the output the first model : /n" + result})
         
-        # Get final response with tool results
-        final_response = client.chat.completions.create(
-            model="gpt-4",
-            messages=main_model_conversation_history,
-            temperature=0.7
-        )
-        response_content = final_response.choices[0].message.content
+            # Get final response with tool results
+            messages = _completion_messages(session, main_model_conversation_history)
+            with span("openai", "gpt-4") as completion_span:
+                final_response = client.chat.completions.create(
+                    model="gpt-4",
+                    messages=messages,
+                    temperature=0.7
+                )
+                if final_response.usage:
+                    completion_span.set(prompt_tokens=final_response.usage.prompt_tokens,
+                                        completion_tokens=final_response.usage.completion_tokens)
+            response_content = final_response.choices[0].message.content
+            _report_usage(usage, messages, final_response.usage.prompt_tokens if final_response.usage else None)
         
+            # Add assistant response to history
+            main_model_conversation_history.append({"role": "assistant", "content": response_content})
+            _record_path(usage, "agent" if response_options == "player_details" else response_options)
+            _store_cached_answer(user_query, response_options, response_content, started, query_vector)
+            return response_content
+    
+        return result
+
+def main_model_stream(user_query, response_options = "player_details", session_id = None):
+    """
+    Streaming variant of main_model.
+
+    Yields event dicts as they happen: "status" when work starts, "tool_start"
+    and "tool_end" while the player agent runs its tools, "token" for each
+    chunk of the final completion and "done" with the full message and the
+    request's token usage and path, or "error" if something failed.
+    """
+    client = OpenAI(api_key=api_key)
+    started = time.perf_counter()
+    usage = {}
+    with get_session_store().session(session_id or new_session_id()) as session:
+        main_model_conversation_history = _add_user_message(session, user_query, response_options)
+        yield {"event": "status", "stage": response_options}
+
+        # Simple salary and rank questions are answered straight from the salary table
+        decision = _route_query(user_query, response_options)
+        if decision and decision["answer"]:
+            _record_direct_answer(session, main_model_conversation_history, user_query, response_options, decision["answer"])
+            _record_path(usage, f"fast:{decision['intent']}")
+            yield {"event": "status", "stage": "fast_path"}
+            yield {"event": "token", "content": decision["answer"]}
+            yield {"event": "done", "message": decision["answer"], "usage": usage}
+            return
+
+        # Near-duplicate standalone questions reuse an earlier answer
+        cached_answer, query_vector = _lookup_cached_answer(user_query, response_options)
+        if cached_answer:
+            _record_direct_answer(session, main_model_conversation_history, user_query, response_options, cached_answer)
+            _record_path(usage, "cache")
+            yield {"event": "status", "stage": "cached"}
+            yield {"event": "token", "content": cached_answer}
+            yield {"event": "done", "message": cached_answer, "cached": True, "usage": usage}
+            return
+
+        # Run the first model in a worker thread and forward its tool events as they happen
+        events = queue.Queue()
+        outcome = {}
+
+        def run_first_model():
+            try:
+                outcome["result"] = _run_first_model(user_query, response_options, session, on_tool_event=events.put, usage=usage)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                events.put(None)
+
+        # Run in a copy of this context so the agent's spans join the request's trace
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(run_first_model,), daemon=True)
+        worker.start()
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            # Also when the client disconnects (GeneratorExit): the agent writes to the
+            # session, so the session is saved and unlocked only once it is done
+            worker.join()
+
+        if "error" in outcome:
+            yield {"event": "error", "message": str(outcome["error"])}
+            return
+        result = outcome.get("result")
+        if not result:
+            yield {"event": "done", "message": result, "usage": usage}
+            return
+
+        if response_options == "player_details" and not REPHRASE_AGENT_ANSWERS:
+            # The agent's answer is already user-facing, skip the rephrase completion
+            main_model_conversation_history.append({"role": "assistant", "content": result})
+            _report_usage(usage)
+            _record_path(usage, "agent:direct")
+            _store_cached_answer(user_query, response_options, result, started, query_vector)
+            yield {"event": "token", "content": result}
+            yield {"event": "done", "message": result, "usage": usage}
+            return
+
+        main_model_conversation_history.append({"role": "assistant", "content": 
+                                                "this is the output the first model : /n" + result})
+        yield {"event": "status", "stage": "answer"}
+
+        messages = _completion_messages(session, main_model_conversation_history)
+        parts = []
+        prompt_tokens = None
+        with span("openai", "gpt-4", stream=True) as completion_span:
+            stream = client.chat.completions.create(
+                model="gpt-4",
+                messages=messages,
+                temperature=0.7,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    prompt_tokens = chunk.usage.prompt_tokens
+                    completion_span.set(prompt_tokens=prompt_tokens, completion_tokens=chunk.usage.completion_tokens)
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    parts.append(content)
+                    yield {"event": "token", "content": content}
+        response_content = "".join(parts)
+        _report_usage(usage, messages, prompt_tokens)
+
         # Add assistant response to history
         main_model_conversation_history.append({"role": "assistant", "content": response_content})
-        return response_content
-    
-    return result
+        _record_path(usage, "agent" if response_options == "player_details" else response_options)
+        _store_cached_answer(user_query, response_options, response_content, started, query_vector)
+        yield {"event": "done", "message": response_content, "usage": usage}
 
 # def function_calling(user_query):
 #     """Handle tool calls and return results"""
@@ -181,68 +428,22 @@ def main_model(user_query, response_options = "player_details"):
 
 def query_pinecone_and_get_news(query, k=5):
     """Get relevant news articles based on query"""
-    print("calling function news data")
-    with open("web_scrape/news_data.json", "r", encoding="utf-8") as f:
-        news_json = json.load(f)
-    news_dict = {item["news_id"]: item["Content"] for item in news_json}
-    
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    pinecone_api_key = os.getenv("PINECONE_API_KEY")
-    embedding = OpenAIEmbeddings(api_key=openai_api_key)
-    pc = Pinecone(api_key=pinecone_api_key)
-    index_name = "nba-news-yahoo"
-    index = pc.Index(index_name)
-    vectorstore = PineconeVectorStore(index=index, embedding=embedding, text_key="text")
-    retriever = vectorstore.as_retriever(search_type="mmr", search_kwargs={"k": k})
-
-    results = retriever.invoke(query)
-    top2_news_ids = set([doc.metadata["news_id"] for doc in results[:2]])
-    processed_news_ids = set()
-
-    context = ""
-    for i, doc in enumerate(results):
-        news_id = doc.metadata["news_id"]
-        
-        # Skip if we've already processed this news_id
-        if news_id in processed_news_ids:
-            continue
-            
-        processed_news_ids.add(news_id)  # Mark as processed
-        if news_id in top2_news_ids:
-            full_news = news_dict.get(news_id)
-            if full_news:
-                context += f"【Source{i+1}】\nTitle：{doc.metadata['title']}\nDate：{doc.metadata['date']}\nLink：{doc.metadata['url']}\ncontent：{full_news}\n\n"
-        else:
-            context += f"【Source{i+1}】\nTitle：{doc.metadata['title']}\nDate：{doc.metadata['date']}\nLink：{doc.metadata['url']}\ncontent：{doc.page_content}\n\n"
-    print("get response from news data")
-    return context
-
-
-
-
-
+    logger.debug("calling function news data")
+    return query_pinecone_and_get_response(query, k=k)
 
-def clear_conversation():
-    global function_model_conversation_history, main_model_conversation_history
-    
-    # # Reset function model conversation history
-    # function_model_conversation_history = [
-    #     {"role": "system", "content": functions_system_prompt}
-    # ]
-    
-    # Reset main model conversation history
-    main_model_conversation_history = [
-        {"role": "system", "content": main_system_prompt("player_details")}
-    ]
-    
-    # Clear agent conversation history
-    from function_agent import clear_function_agent_history
-    clear_function_agent_history()
 
-    return "Chat history cleared"
 
 
 
 
+def clear_conversation(session_id):
+    # Reset the main model, player agent and team agent conversation histories of this session
+    from team_agent import clear_team_agent_history  # the team agent stack loads on first use
 
+    with get_session_store().session(session_id) as session:
+        session.pop(MAIN_HISTORY_KEY, None)
+        session.pop(summary_key(MAIN_HISTORY_KEY), None)
+        clear_function_agent_history(session)
+        clear_team_agent_history(session)
 
+    return "Chat history cleared"
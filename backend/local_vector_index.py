@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+import re
+import numpy as np
+
+
+class IndexedChunk:
+    """
+    A chunk returned from the local index, shaped like a LangChain Document.
+    """
+
+    __slots__ = ("id", "page_content", "metadata")
+
+    def __init__(self, id, page_content, metadata):
+        self.id = id
+        self.page_content = page_content
+        self.metadata = metadata
+
+    def __repr__(self):
+        return f"IndexedChunk(id={self.id!r}, metadata={self.metadata!r})"
+
+
+class HashingEmbeddings:
+    """
+    Deterministic, offline stand-in for OpenAIEmbeddings.
+
+    Every lowercase word token is hashed into a fixed number of signed buckets,
+    so identical texts always get identical vectors and texts sharing words
+    end up close in cosine space. No network access is needed.
+    """
+
+    def __init__(self, dimension=256):
+        self.dimension = dimension
+        self.model = f"hashing-{dimension}"
+
+    def _embed(self, text):
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dimension] += sign
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def _normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def maximal_marginal_relevance(query_similarity, candidate_embeddings, k=4, lambda_mult=0.5):
+    """
+    Vectorized maximal marginal relevance selection.
+
+    Args:
+        query_similarity: Cosine similarity of each candidate to the query, shape (n,)
+        candidate_embeddings: Normalized candidate embeddings, shape (n, d)
+        k: Number of candidates to select
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+
+    Returns:
+        list: Positions of the selected candidates, in selection order
+    """
+    n = len(query_similarity)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    # Pairwise similarity between all candidates, computed once
+    pairwise = candidate_embeddings @ candidate_embeddings.T
+    max_redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+
+    selected = [int(np.argmax(query_similarity))]
+    available[selected[0]] = False
+    max_redundancy = np.maximum(max_redundancy, pairwise[:, selected[0]])
+
+    while len(selected) < k:
+        scores = lambda_mult * query_similarity - (1 - lambda_mult) * max_redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        max_redundancy = np.maximum(max_redundancy, pairwise[:, best])
+
+    return selected
+
+
+class LocalVectorIndex:
+    """
+    In-process vector index over normalized chunk embeddings.
+
+    Keeps every chunk embedding in one float32 matrix so cosine search is a
+    single matrix product. Exposes the subset of the PineconeVectorStore API
+    used by this project (add_documents, delete, max_marginal_relevance_search,
+    similarity_search) so the two backends are interchangeable.
+    """
+
+    def __init__(self, embedding, dimension=None):
+        self.embedding = embedding
+        self.dimension = dimension
+        self.ids = []
+        self.texts = []
+        self.metadatas = []
+        self.embeddings = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._positions = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add_embeddings(self, ids, embeddings, texts, metadatas):
+        """
+        Insert or replace chunks with precomputed embeddings.
+
+        Args:
+            ids: Chunk IDs; existing IDs are overwritten in place
+            embeddings: Raw embeddings, shape (n, d)
+            texts: Chunk texts
+            metadatas: Chunk metadata dictionaries
+        """
+        if not ids:
+            return []
+        vectors = _normalize_rows(embeddings)
+        if self.dimension is None or len(self.ids) == 0:
+            self.dimension = vectors.shape[1]
+            self.embeddings = self.embeddings.reshape(0, self.dimension)
+        elif vectors.shape[1] != self.dimension:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self.dimension}")
+
+        new_rows = []
+        for row, (chunk_id, text, metadata) in enumerate(zip(ids, texts, metadatas)):
+            position = self._positions.get(chunk_id)
+            if position is None:
+                self._positions[chunk_id] = len(self.ids)
+                self.ids.append(chunk_id)
+                self.texts.append(text)
+                self.metadatas.append(dict(metadata))
+                new_rows.append(row)
+            else:
+                self.texts[position] = text
+                self.metadatas[position] = dict(metadata)
+                self.embeddings[position] = vectors[row]
+
+        if new_rows:
+            self.embeddings = np.vstack([self.embeddings, vectors[new_rows]])
+        return list(ids)
+
+    def add_documents(self, documents, ids=None):
+        """
+        Embed and insert LangChain documents.
+        """
+        if ids is None:
+            ids = [hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest() for doc in documents]
+        texts = [doc.page_content for doc in documents]
+        embeddings = self.embedding.embed_documents(texts)
+        return self.add_embeddings(list(ids), embeddings, texts, [doc.metadata for doc in documents])
+
+    def delete(self, ids):
+        """
+        Remove chunks by ID. Unknown IDs are ignored.
+        """
+        remove = {self._positions[chunk_id] for chunk_id in ids if chunk_id in self._positions}
+        if not remove:
+            return
+        keep = [position for position in range(len(self.ids)) if position not in remove]
+        self.ids = [self.ids[position] for position in keep]
+        self.texts = [self.texts[position] for position in keep]
+        self.metadatas = [self.metadatas[position] for position in keep]
+        self.embeddings = self.embeddings[keep]
+        self._positions = {chunk_id: position for position, chunk_id in enumerate(self.ids)}
+
+    def search_by_vectors(self, query_embeddings, k=4):
+        """
+        Batched top-k cosine search.
+
+        Args:
+            query_embeddings: Query embeddings, shape (m, d) or (d,)
+            k: Number of results per query
+
+        Returns:
+            tuple: (positions, scores), each of shape (m, min(k, len(index)))
+        """
+        queries = _normalize_rows(query_embeddings)
+        k = min(k, len(self.ids))
+        if k == 0:
+            empty = np.zeros((queries.shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        scores = queries @ self.embeddings.T
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+    def _chunk(self, position):
+        return IndexedChunk(self.ids[position], self.texts[position], self.metadatas[position])
+
+    def similarity_search(self, query, k=4):
+        positions, _ = self.search_by_vectors(self.embedding.embed_query(query), k=k)
+        return [self._chunk(int(position)) for position in positions[0]]
+
+    def max_marginal_relevance_search_by_vector(self, query_embedding, k=4, fetch_k=20, lambda_mult=0.5):
+        positions, scores = self.search_by_vectors(query_embedding, k=fetch_k)
+        candidates = positions[0]
+        if len(candidates) == 0:
+            return []
+        selected = maximal_marginal_relevance(scores[0], self.embeddings[candidates], k=k, lambda_mult=lambda_mult)
+        return [self._chunk(int(candidates[position])) for position in selected]
+
+    def max_marginal_relevance_search(self, query, k=4, fetch_k=20, lambda_mult=0.5):
+        """
+        Retrieve k diverse chunks for a query, matching PineconeVectorStore's MMR defaults.
+        """
+        return self.max_marginal_relevance_search_by_vector(
+            self.embedding.embed_query(query), k=k, fetch_k=fetch_k, lambda_mult=lambda_mult
+        )
+
+    @staticmethod
+    def saved_path(path):
+        """
+        The file an index saved to `path` lives in: `path`.npz, or the
+        `path`.npy of an index saved by an earlier version.
+        """
+        if not os.path.exists(path + ".npz") and os.path.exists(path + ".npy"):
+            return path + ".npy"
+        return path + ".npz"
+
+    def save(self, path):
+        """
+        Persist the index to `path`.npz, embeddings and chunks together.
+
+        The file is written next to its destination and swapped in with one
+        rename, so a concurrent load sees either the old or the new index,
+        never new vectors with old chunks.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        chunks = json.dumps({"ids": self.ids, "texts": self.texts, "metadatas": self.metadatas}, ensure_ascii=False)
+        with open(path + ".npz.tmp", "wb") as f:
+            np.savez(f, embeddings=self.embeddings, chunks=np.frombuffer(chunks.encode("utf-8"), dtype=np.uint8))
+        os.replace(path + ".npz.tmp", path + ".npz")
+
+    @classmethod
+    def load(cls, path, embedding):
+        """
+        Load an index saved with `save`, or the `path`.npy and `path`.json
+        pair written by earlier versions.
+        """
+        if os.path.exists(path + ".npz"):
+            with np.load(path + ".npz", allow_pickle=False) as saved:
+                embeddings = saved["embeddings"]
+                chunks = json.loads(saved["chunks"].tobytes().decode("utf-8"))
+        else:
+            embeddings = np.load(path + ".npy")
+            with open(path + ".json", "r", encoding="utf-8") as f:
+                chunks = json.load(f)
+
+        index = cls(embedding, dimension=embeddings.shape[1] if embeddings.ndim == 2 else None)
+        index.ids = chunks["ids"]
+        index.texts = chunks["texts"]
+        index.metadatas = chunks["metadatas"]
+        index.embeddings = embeddings.astype(np.float32, copy=False)
+        index._positions = {chunk_id: position for position, chunk_id in enumerate(index.ids)}
+        return index
+
+    @classmethod
+    def load_or_create(cls, path, embedding):
+        if os.path.exists(path + ".npz") or (os.path.exists(path + ".npy") and os.path.exists(path + ".json")):
+            return cls.load(path, embedding)
+        return cls(embedding)
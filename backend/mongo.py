@@ -0,0 +1,237 @@
+"""
+Shared MongoDB client and query layer.
+
+Every module gets its collections from get_collection(), backed by one
+process-wide MongoClient whose pool, timeouts, compression and read
+preference come from config/mongo_config.py.
+
+Queries on the request paths go through find() and find_one(), which apply a
+server-side time limit, time every query under its name (as a "mongo_query"
+span and in stats()) and fail fast with MongoUnavailable while the server is
+unreachable, instead of every request waiting for server selection to time
+out.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+import pymongo
+from pymongo.errors import ConnectionFailure, PyMongoError, WaitQueueTimeoutError
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.mongo_config import (
+    MONGO_URI,
+    MONGO_DATABASE,
+    MONGO_SALARY_COLLECTION,
+    MONGO_APP_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_QUERY_TIMEOUT_MS,
+    MONGO_UNAVAILABLE_COOLDOWN_SECONDS,
+    MONGO_SLOW_QUERY_MS,
+    MONGO_COMPRESSORS,
+    MONGO_READ_PREFERENCE,
+)
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class MongoUnavailable(Exception):
+    """
+    Raised when MongoDB can't be reached, or could not be reached within the
+    last MONGO_UNAVAILABLE_COOLDOWN_SECONDS.
+    """
+
+
+def client_options():
+    """
+    Keyword arguments of the shared MongoClient.
+    """
+    options = {
+        "appname": MONGO_APP_NAME,
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "readPreference": MONGO_READ_PREFERENCE,
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
+
+
+def create_client(uri=MONGO_URI, **overrides):
+    """
+    Create a MongoClient with the configured pool and timeouts. Most code
+    should use the shared get_client() instead.
+    """
+    # Looked up on the module at call time, so the replay harness can swap it
+    return pymongo.MongoClient(uri, **dict(client_options(), **overrides))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide MongoClient, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_client()
+    return _client
+
+
+def get_database(name=MONGO_DATABASE):
+    return get_client()[name]
+
+
+def get_collection(name=MONGO_SALARY_COLLECTION, database=MONGO_DATABASE):
+    return get_client()[database][name]
+
+
+class QueryStats:
+    """
+    Count, errors and latency of each named query.
+    """
+
+    def __init__(self):
+        self._queries = {}
+        self._unavailable_until = 0.0
+        self.fast_failures = 0
+        self._lock = threading.Lock()
+
+    def check_available(self):
+        if time.monotonic() < self._unavailable_until:
+            with self._lock:
+                self.fast_failures += 1
+            raise MongoUnavailable("MongoDB is unavailable, retrying shortly")
+
+    def mark_unavailable(self):
+        self._unavailable_until = time.monotonic() + MONGO_UNAVAILABLE_COOLDOWN_SECONDS
+
+    def record(self, name, elapsed_ms, error=False):
+        with self._lock:
+            query = self._queries.get(name)
+            if query is None:
+                query = self._queries[name] = {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            query["count"] += 1
+            query["errors"] += int(error)
+            query["total_ms"] += elapsed_ms
+            query["max_ms"] = max(query["max_ms"], elapsed_ms)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "available": time.monotonic() >= self._unavailable_until,
+                "fast_failures": self.fast_failures,
+                "queries": {
+                    name: {
+                        "count": query["count"],
+                        "errors": query["errors"],
+                        "mean_ms": round(query["total_ms"] / query["count"], 2),
+                        "max_ms": round(query["max_ms"], 2),
+                    }
+                    for name, query in self._queries.items()
+                },
+            }
+
+
+query_stats = QueryStats()
+
+
+def _run(collection, operation, name, run):
+    query_stats.check_available()
+    query_name = f"{collection.name}.{name or operation}"
+    start = time.perf_counter()
+    error = False
+    try:
+        with span("mongo_query", query_name):
+            return run()
+    except WaitQueueTimeoutError:
+        # The pool is exhausted, the server itself is fine
+        error = True
+        raise
+    except ConnectionFailure as e:
+        # Server selection timeouts and network errors: stop sending queries for a while
+        error = True
+        query_stats.mark_unavailable()
+        logger.error("MongoDB unavailable during %s: %s", query_name, e)
+        raise MongoUnavailable(str(e)) from e
+    except PyMongoError:
+        error = True
+        raise
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        query_stats.record(query_name, elapsed_ms, error)
+        if elapsed_ms >= MONGO_SLOW_QUERY_MS:
+            logger.info("slow Mongo query %s took %.1f ms", query_name, elapsed_ms)
+
+
+def find(collection, filter=None, projection=None, sort=None, limit=0, name=None):
+    """
+    Run a find and return its documents as a list.
+
+    Args:
+        collection: The collection to query
+        filter: Query filter
+        projection: Fields to return; always pass one on the request paths
+        sort: List of (field, direction) pairs
+        limit: Maximum number of documents, 0 for no limit
+        name: Name the query is timed under, defaults to "find"
+
+    Returns:
+        list: The matching documents
+
+    Raises:
+        MongoUnavailable: If MongoDB can't be reached
+    """
+    def run():
+        cursor = collection.find(filter, projection, max_time_ms=MONGO_QUERY_TIMEOUT_MS)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    return _run(collection, "find", name, run)
+
+
+def find_one(collection, filter=None, projection=None, name=None):
+    """
+    Return the first document matching a filter, or None. See find.
+    """
+    return _run(
+        collection, "find_one", name,
+        lambda: collection.find_one(filter, projection, max_time_ms=MONGO_QUERY_TIMEOUT_MS)
+    )
+
+
+def stats():
+    """
+    Return the pool settings, availability and per-query timings.
+    """
+    return dict(query_stats.stats(), pool={
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "min_pool_size": MONGO_MIN_POOL_SIZE,
+        "wait_queue_timeout_ms": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "server_selection_timeout_ms": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "compressors": MONGO_COMPRESSORS or None,
+        "read_preference": MONGO_READ_PREFERENCE,
+    })
@@ -1,87 +1,101 @@
-import requests
-import pandas as pd
-from query import query_pinecone_and_get_response
-api_key = "5fd4069165msh6cb1e21b7254ef5p14739ejsnbd9d3c24d49b"
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from player_repository import find_players_by_name
+from rapidapi_client import get_rapidapi_client, RapidAPIError
+from stat_aggregation import aggregate_games
+
+# Upper bound on seasons fetched by one get_player_stats_for_seasons call
+MAX_SEASONS_PER_CALL = 20
+
+logger = logging.getLogger(__name__)
 
 
 def search_players(player_name):
-    print("calling function search_players")
-    print("---------------------------------------------")
+    logger.debug("calling function search_players(%r)", player_name)
     # Extract last name from full name
     last_name = player_name.split()[-1]
     
-    url = "https://api-nba-v1.p.rapidapi.com/players"
-    querystring = {"search": last_name}  # Use only last name for search
-    headers = {
-        "x-rapidapi-key": f"{api_key}",
-        "x-rapidapi-host": "api-nba-v1.p.rapidapi.com"
-    }
-    
     try:
-        # get response from NBA api
-        response = requests.get(url, headers=headers, params=querystring)
-        print("get response from search_players()")
-        print("---------------------------------------------")
-        print(response.json())
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {"error": f"API error: {response.status_code}"}
+        # get response from NBA api (cached, use only last name for search)
+        data = get_rapidapi_client().search_players(last_name)
+        logger.debug("search_players response: %s", data)
+        return data
+    except RapidAPIError as e:
+        return {"error": str(e)}
     except Exception as e:
         return {"error": f"Can't get player data: {str(e)}"}
     
 def get_player_stat(id, season):
-    print("calling function get_player_stat")
-    print("---------------------------------------------")
-    url = "https://api-nba-v1.p.rapidapi.com/players/statistics"
-    querystring = {"id":id,"season":season}
-    headers = {
-        "x-rapidapi-key": f"{api_key}",
-        "x-rapidapi-host": "api-nba-v1.p.rapidapi.com"
-    }
-    
+    logger.debug("calling function get_player_stat(%r, %r)", id, season)
     try:
-        response = requests.get(url, headers=headers, params=querystring)
-        print("get response from get_player_stat()")
-        print("---------------------------------------------")
-        data = response.json()
-        if response.status_code == 200:
-            df = pd.DataFrame(data['response'])
-            
-            # Add safer conversion with error handling
-            for col in ['fgp', 'ftp', 'tpp']:
-                try:
-                    # Handle empty or None values
-                    df[col] = df[col].fillna('0%')
-                    # Handle both string and numeric values
-                    df[col] = df[col].apply(lambda x: float(str(x).replace('%', '')) if isinstance(x, (str)) else float(x))
-                except Exception as e:
-                    print(f"Error converting {col}: {e}")
-                    # Set to 0 if conversion fails
-                    df[col] = 0.0
-            
-            averages = df[['points', 'fgm', 'fga', 'fgp', 'fta', 'ftp', 'tpm', 'tpa', 'tpp', 'offReb', 'defReb', 'totReb', 'assists', 'pFouls', 'steals', 'turnovers', 'blocks']].mean().round(2)
-            print(averages)
-            return averages.to_dict()
-        else:
-            return {"error": f"API error: {response.status_code}"}
+        data = get_rapidapi_client().player_statistics(id, season)
+        aggregates = aggregate_games(data['response'])
+        if not aggregates["games"]:
+            return {"error": f"No statistics found for season {season}"}
+        averages = aggregates["averages"]
+        logger.debug("get_player_stat averages: %s", averages)
+        return averages
+    except RapidAPIError as e:
+        return {"error": str(e)}
     except Exception as e:
         return {"error": f"Can't get player detail: {str(e)}"}
-    
+
+def get_player_stats_for_seasons(id, seasons):
+    """
+    Fetch several seasons concurrently and aggregate each one and the whole span.
+
+    Args:
+        id: The player's unique ID
+        seasons: Season start years, e.g. ["2021", "2022", "2023"]
+
+    Returns:
+        dict: Per-season aggregates (averages, medians, totals, per_36) keyed
+              by season, and the same aggregates over every game as "combined"
+    """
+    logger.debug("calling function get_player_stats_for_seasons(%r, %r)", id, seasons)
+    seasons = list(dict.fromkeys(str(season).strip() for season in seasons if str(season).strip()))
+    if not seasons:
+        return {"error": "Please provide at least one season"}
+    if len(seasons) > MAX_SEASONS_PER_CALL:
+        return {"error": f"Please ask for at most {MAX_SEASONS_PER_CALL} seasons at a time"}
+
+    client = get_rapidapi_client()
+    results = {}
+    all_games = []
+    # Requests share the client's connection pool and rate limiter
+    with ThreadPoolExecutor(max_workers=min(len(seasons), 4)) as executor:
+        futures = {executor.submit(client.player_statistics, id, season): season for season in seasons}
+        for future in as_completed(futures):
+            season = futures[future]
+            try:
+                games = future.result()['response']
+            except RapidAPIError as e:
+                results[season] = {"error": str(e)}
+                continue
+            except Exception as e:
+                results[season] = {"error": f"Can't get player detail: {str(e)}"}
+                continue
+            if not games:
+                results[season] = {"error": f"No statistics found for season {season}"}
+                continue
+            results[season] = aggregate_games(games)
+            all_games.extend(games)
+
+    response = {"seasons": {season: results[season] for season in seasons}}
+    if all_games:
+        response["combined"] = aggregate_games(all_games)
+    logger.debug("get_player_stats_for_seasons response: %s", response)
+    return response
+
 def get_player_salary(name):
-    print("calling function get_player_salary")
-    print("---------------------------------------------")
-    url = "http://127.0.0.1:5000/api/players"
-    querystring = {"name" : name}
+    logger.debug("calling function get_player_salary(%r)", name)
     try:
-        # get response from NBA api
-        response = requests.get(url, params=querystring)
-        print("get response from get_player_salary")
-        print("---------------------------------------------")
-        print(response.json())
-        if response.status_code == 200:
-            return response.json()
+        # look up the salary data in-process, same as the /api/players route
+        players = find_players_by_name(name)
+        logger.debug("get_player_salary response: %s", players)
+        if players:
+            return players
         else:
-            return {"error": f"API error: {response.status_code}"}
+            return {"error": "No players found with the provided last name"}
     except Exception as e:
-        return {"error": f"Can't get player data: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Can't get player data: {str(e)}"}
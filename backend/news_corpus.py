@@ -0,0 +1,238 @@
+import json
+import logging
+import mmap
+import os
+import sys
+import threading
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.news_config import NEWS_CORPUS_PATH, LEGACY_NEWS_JSON_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class NewsCorpus:
+    """
+    Append-only JSONL news corpus with a news_id -> byte offset index.
+
+    Each article is one JSON line in `path`. The index at `path`.idx holds one
+    "news_id<TAB>offset<TAB>length" line per appended article, so single
+    articles are read with one seek into a memory-mapped file and iteration
+    streams article by article. Re-appending an existing news_id replaces it:
+    the latest line wins.
+    """
+
+    def __init__(self, path=NEWS_CORPUS_PATH):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.offsets = {}
+        self._indexed_end = 0
+        self._last_entry = None
+        self._file_state = None
+        self._mmap = None
+        self._mmap_size = 0
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, news_id):
+        return news_id in self.offsets
+
+    def ids(self):
+        return list(self.offsets)
+
+    def _reset_index(self):
+        self.offsets = {}
+        self._indexed_end = 0
+        self._last_entry = None
+        # The mapping may show the bytes of the old file
+        self.close()
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+
+    def _was_rewritten(self, stat):
+        """
+        True if the corpus file is not the one indexed so far plus appended
+        lines: replaced by another file, truncated, or rewritten in place.
+        """
+        if self._file_state is not None and stat.st_ino != self._file_state[0]:
+            return True
+        if stat.st_size < self._indexed_end:
+            return True
+        if self._last_entry is None:
+            return False
+        # The last indexed line must still be where the index says it is
+        news_id, offset, length = self._last_entry
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            line = f.read(length)
+        try:
+            return not line.endswith(b"\n") or json.loads(line)["news_id"] != news_id
+        except (ValueError, KeyError):
+            return True
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 3:
+                    continue
+                news_id, offset, length = parts[0], int(parts[1]), int(parts[2])
+                self.offsets[news_id] = (offset, length)
+                if offset + length > self._indexed_end:
+                    self._indexed_end = offset + length
+                    self._last_entry = (news_id, offset, length)
+
+    def _index_tail(self, size):
+        # Index lines appended to the corpus by another process since the last refresh
+        entries = []
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_end)
+            offset = self._indexed_end
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written line, picked up on the next refresh
+                try:
+                    news_id = json.loads(line)["news_id"]
+                except (ValueError, KeyError):
+                    news_id = None
+                if news_id is not None:
+                    entries.append((news_id, offset, len(line)))
+                offset += len(line)
+            self._indexed_end = offset
+        self._write_index(entries)
+
+    def _write_index(self, entries):
+        if not entries:
+            return
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            for news_id, offset, length in entries:
+                f.write(f"{news_id}\t{offset}\t{length}\n")
+                self.offsets[news_id] = (offset, length)
+        self._last_entry = entries[-1]
+
+    def refresh(self):
+        """
+        Bring the in-memory index up to date with the corpus file.
+
+        Returns:
+            bool: True if the index changed
+        """
+        with self._lock:
+            if not os.path.exists(self.path):
+                if self._indexed_end:
+                    self._reset_index()
+                self._file_state = None
+                return False
+            stat = os.stat(self.path)
+            file_state = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_state == self._file_state:
+                return False
+            if not self.offsets and self._indexed_end == 0:
+                self._load_index()
+            if self._was_rewritten(stat):
+                # The corpus was rewritten, rebuild the index from scratch
+                logger.info("News corpus %s was rewritten, rebuilding its index", self.path)
+                self._reset_index()
+            changed = stat.st_size != self._indexed_end
+            if changed:
+                self._index_tail(stat.st_size)
+            self._file_state = file_state
+            return changed
+
+    def _view(self, end):
+        if self._mmap is None or self._mmap_size < end:
+            if self._mmap is not None:
+                self._mmap.close()
+            with open(self.path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mmap_size = len(self._mmap)
+        return self._mmap
+
+    def get(self, news_id):
+        """
+        Fetch a single article by news_id, or None if it is not in the corpus.
+        """
+        with self._lock:
+            location = self.offsets.get(news_id)
+            if location is None:
+                return None
+            offset, length = location
+            line = self._view(offset + length)[offset:offset + length]
+        return json.loads(line)
+
+    def get_content(self, news_id):
+        article = self.get(news_id)
+        return article["Content"] if article else None
+
+    def iter_articles(self):
+        """
+        Stream the latest version of every article, in corpus order.
+        """
+        with self._lock:
+            locations = sorted(self.offsets.values())
+        with open(self.path, "rb") as f:
+            for offset, length in locations:
+                f.seek(offset)
+                yield json.loads(f.read(length))
+
+    def append_many(self, articles):
+        """
+        Append articles to the corpus and index them.
+        """
+        with self._lock:
+            self.refresh()
+            entries = []
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                for article in articles:
+                    line = (json.dumps(article, ensure_ascii=False) + "\n").encode("utf-8")
+                    f.write(line)
+                    entries.append((article["news_id"], offset, len(line)))
+                    offset += len(line)
+            self._indexed_end = offset
+            self._write_index(entries)
+
+    def append(self, article):
+        self.append_many([article])
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+                self._mmap_size = 0
+
+
+def migrate_from_json(json_path=LEGACY_NEWS_JSON_PATH, corpus_path=NEWS_CORPUS_PATH):
+    """
+    Convert a legacy news_data.json array into the JSONL corpus.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        news_json = json.load(f)
+    corpus = NewsCorpus(corpus_path)
+    corpus.append_many(article for article in news_json if article["news_id"] not in corpus)
+    logger.info("Migrated %d articles from %s to %s", len(news_json), json_path, corpus_path)
+    return corpus
+
+
+def get_news_corpus(path=NEWS_CORPUS_PATH):
+    """
+    Open the news corpus, migrating the legacy news_data.json on first use.
+    """
+    if not os.path.exists(path) and os.path.exists(LEGACY_NEWS_JSON_PATH):
+        return migrate_from_json(LEGACY_NEWS_JSON_PATH, path)
+    return NewsCorpus(path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        migrate_from_json(*sys.argv[2:4])
+    else:
+        print("Usage: python news_corpus.py migrate [news_data.json] [news_data.jsonl]")
@@ -1,47 +1,108 @@
+import argparse
+import hashlib
 import json
 import os
+import sys
 from dotenv import load_dotenv
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
 from langchain_openai import OpenAIEmbeddings
 from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
-import uuid
+from local_vector_index import LocalVectorIndex
+from query import get_embedding
+from news_corpus import get_news_corpus
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.news_config import (
+    VECTOR_BACKEND,
+    PINECONE_INDEX_NAME,
+    LOCAL_INDEX_PATH,
+    EMBEDDING_DIMENSION,
+    INGEST_MANIFEST_PATH,
+)
 
 # Load environment variables from .env file
 load_dotenv()
 
-with open("./web_scrape/news_data.json", "r", encoding="utf-8") as f:
-    news_data = json.load(f)
+BATCH_SIZE = 100
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def article_hash(article):
+    """
+    Hash of every article field that ends up in the index.
+    """
+    fields = [article["Title"], article["URL"], article["Date"], article["Content"]]
+    return content_hash("\0".join("" if field is None else str(field) for field in fields))
 
-def main():
+def chunk_id(news_id, offset, text):
+    """
+    Deterministic chunk ID: news_id, chunk start offset and chunk content hash.
+    """
+    return f"{news_id}:{offset}:{content_hash(text)[:16]}"
+
+def get_splitter():
     # Reduce chunk size and overlap
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000, 
-        chunk_overlap=50, 
-        separators=["\n\n", "\n", ". ", "! ", "? ", ", "]
-        )
-    documents = []
-    for article in news_data:
-        chunks = splitter.create_documents(
-            [article["Content"]],
-            metadatas=[{
-                "title": article["Title"],
-                "url": article["URL"],
-                "date": article["Date"],
-                "news_id" : article["news_id"]
-
-            }]
+    return RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=50,
+        separators=["\n\n", "\n", ". ", "! ", "? ", ", "],
+        add_start_index=True,
         )
-        documents.extend(chunks)
 
-    # Ensure OPENAI_API_KEY is set
-    openai_api_key = os.getenv('OPENAI_API_KEY')
-    if not openai_api_key:
-        raise ValueError("OPENAI_API_KEY environment variable is not set.")
-        
-    embedding = OpenAIEmbeddings(api_key=openai_api_key)
+def split_article(splitter, article):
+    """
+    Split an article into chunk documents and their deterministic IDs.
+    """
+    chunks = splitter.create_documents(
+        [article["Content"]],
+        metadatas=[{
+            "title": article["Title"],
+            "url": article["URL"],
+            "date": article["Date"],
+            "news_id" : article["news_id"]
+
+        }]
+    )
+    ids = [chunk_id(article["news_id"], chunk.metadata["start_index"], chunk.page_content) for chunk in chunks]
+    return chunks, ids
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"articles": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(path, manifest):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def plan_ingest(articles, manifest):
+    """
+    Compare the corpus with the manifest in a single streaming pass.
+
+    Args:
+        articles: Iterable of corpus articles
+        manifest: The ingest manifest
+
+    Returns:
+        tuple: (articles to split and upsert, news_ids removed from the corpus, corpus size)
+    """
+    indexed = manifest["articles"]
+    changed = []
+    current_ids = set()
+    for article in articles:
+        current_ids.add(article["news_id"])
+        if indexed.get(article["news_id"], {}).get("hash") != article_hash(article):
+            changed.append(article)
+    removed = [news_id for news_id in indexed if news_id not in current_ids]
+    return changed, removed, len(current_ids)
 
+def get_pinecone_vectorstore(embedding):
     # Set Pinecone environment variables
     PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
     if not PINECONE_API_KEY:
@@ -50,13 +111,13 @@ def main():
 
     # Initialize Pinecone
     pc = Pinecone(api_key=PINECONE_API_KEY)
-    index_name = "nba-news-yahoo"
+    index_name = PINECONE_INDEX_NAME
 
     # Create index if it doesn't exist
     if index_name not in pc.list_indexes().names():
         pc.create_index(
             name=index_name,
-            dimension=1536,  # OpenAI embeddings dimension
+            dimension=EMBEDDING_DIMENSION,  # OpenAI embeddings dimension
             metric="cosine",
             spec=ServerlessSpec(
                 cloud="aws",
@@ -68,20 +129,87 @@ def main():
     index = pc.Index(index_name)
 
     # Create vector store
-    vectorstore = PineconeVectorStore(
+    return PineconeVectorStore(
         index=index,
         embedding=embedding,
         text_key="text"
     )
 
+def main(backend=VECTOR_BACKEND, rebuild=False):
+    """
+    Incrementally sync the vector store with the news corpus.
+
+    Only new or changed articles are split, embedded and upserted; chunks of
+    changed or removed articles that are no longer in the corpus are deleted.
+
+    Args:
+        backend: "pinecone" or "local"
+        rebuild: Delete every vector and re-index the whole corpus
+    """
+    corpus = get_news_corpus()
+
+    # Ensure OPENAI_API_KEY is set
+    openai_api_key = os.getenv('OPENAI_API_KEY')
+    if not openai_api_key:
+        raise ValueError("OPENAI_API_KEY environment variable is not set.")
+
+    # Cached so unchanged chunks are never re-embedded
+    embedding = get_embedding(OpenAIEmbeddings(api_key=openai_api_key))
+
+    manifest_path = INGEST_MANIFEST_PATH.format(backend=backend)
+    if backend == "local":
+        vectorstore = LocalVectorIndex(embedding) if rebuild else LocalVectorIndex.load_or_create(LOCAL_INDEX_PATH, embedding)
+    elif backend == "pinecone":
+        vectorstore = get_pinecone_vectorstore(embedding)
+        if rebuild:
+            vectorstore.delete(delete_all=True)
+    else:
+        raise ValueError(f"Unknown news vector backend: {backend}")
+
+    manifest = {"articles": {}} if rebuild else load_manifest(manifest_path)
+    changed, removed, corpus_size = plan_ingest(corpus.iter_articles(), manifest)
+    print(f"{corpus_size} articles: {len(changed)} new or changed, {len(removed)} removed")
+
+    splitter = get_splitter()
+    documents, ids, stale_ids = [], [], []
+    updated_entries = {}
+    for article in changed:
+        chunks, chunk_ids = split_article(splitter, article)
+        documents.extend(chunks)
+        ids.extend(chunk_ids)
+        previous = manifest["articles"].get(article["news_id"], {}).get("chunk_ids", [])
+        stale_ids.extend(set(previous) - set(chunk_ids))
+        updated_entries[article["news_id"]] = {"hash": article_hash(article), "chunk_ids": chunk_ids}
+    for news_id in removed:
+        stale_ids.extend(manifest["articles"][news_id]["chunk_ids"])
+
     # Add documents in batches
-    BATCH_SIZE = 100
     for i in range(0, len(documents), BATCH_SIZE):
         batch = documents[i:i + BATCH_SIZE]
-        vectorstore.add_documents(batch)
+        vectorstore.add_documents(batch, ids=ids[i:i + BATCH_SIZE])
         print(f"Added batch {i//BATCH_SIZE + 1} of {(len(documents) + BATCH_SIZE - 1)//BATCH_SIZE}")
 
+    # Delete chunks that are no longer part of the corpus
+    for i in range(0, len(stale_ids), BATCH_SIZE):
+        vectorstore.delete(ids=stale_ids[i:i + BATCH_SIZE])
+    if stale_ids:
+        print(f"Deleted {len(stale_ids)} stale chunks")
+
+    manifest["articles"].update(updated_entries)
+    for news_id in removed:
+        del manifest["articles"][news_id]
+
+    if backend == "local":
+        vectorstore.save(LOCAL_INDEX_PATH)
+        print(f"Saved local index with {len(vectorstore)} chunks to {LOCAL_INDEX_PATH}")
+    save_manifest(manifest_path, manifest)
+    print(f"Embedding cache: {embedding.stats()}")
+
     return
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sync the news vector store with the news corpus")
+    parser.add_argument("backend", nargs="?", default=VECTOR_BACKEND, choices=["pinecone", "local"])
+    parser.add_argument("--rebuild", action="store_true", help="delete all vectors and re-index the whole corpus")
+    args = parser.parse_args()
+    main(args.backend, rebuild=args.rebuild)
@@ -0,0 +1,209 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+
+from salary_schema import normalize_name
+
+# Match scores, higher is better
+EXACT_NAME = 100
+LAST_NAME = 95
+EXACT_TOKEN = 90
+SUBSTRING = 70
+PREFIX = 60
+FUZZY = 50
+
+# Minimum similarity (trigram Jaccard or normalized edit distance) for a typo-tolerant match
+FUZZY_THRESHOLD = 0.6
+
+# One built index: the deduplicated players, their normalized names and the
+# token, sorted token and trigram maps pointing at their positions
+NameIndexSnapshot = namedtuple("NameIndexSnapshot", ["version", "players", "names", "tokens", "sorted_tokens", "trigrams"])
+
+EMPTY_INDEX = NameIndexSnapshot(None, [], [], {}, [], {})
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions).
+    """
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+class PlayerNameIndex:
+    """
+    In-memory player name index with exact, prefix and typo-tolerant lookups.
+
+    Built once per salary data version from the salary table. Names are
+    normalized (lowercase, accent and punctuation free) and indexed by whole
+    token, by sorted token list for prefix lookups and by character trigram
+    for substring and fuzzy lookups. Players sharing a name are deduplicated
+    at build time, the first (highest ranked) one wins.
+
+    A build publishes a new NameIndexSnapshot with one assignment and each
+    search reads it once, so a rebuild never mixes two versions.
+    """
+
+    def __init__(self):
+        self.snapshot = EMPTY_INDEX
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    @property
+    def players(self):
+        return self.snapshot.players
+
+    def build(self, players, version=None):
+        unique_players = {}
+        for player in players:
+            if player.get('name') not in unique_players:
+                unique_players[player.get('name')] = {key: value for key, value in player.items() if key != "_id"}
+
+        names = []
+        tokens = defaultdict(set)
+        grams = defaultdict(set)
+        for position, player in enumerate(unique_players.values()):
+            name = normalize_name(player.get('name', ''))
+            names.append(name)
+            for token in name.split():
+                tokens[token].add(position)
+            for gram in trigrams(name):
+                grams[gram].add(position)
+
+        # Lookups must not add keys to the published maps
+        self.snapshot = NameIndexSnapshot(
+            version, list(unique_players.values()), names, dict(tokens), sorted(tokens), dict(grams)
+        )
+
+    def sync(self, salary_table):
+        """
+        Rebuild the index if the salary table holds a newer data version.
+        """
+        salary_table.refresh()
+        table = salary_table.snapshot
+        if self.version != table.version or not self.players:
+            with self._lock:
+                if self.version != table.version or not self.players:
+                    self.build(table.players, table.version)
+
+    def name_tokens(self):
+        """
+        Return every normalized name token in the index (e.g. "lebron", "james").
+        """
+        return self.snapshot.tokens.keys()
+
+    @staticmethod
+    def _prefix_matches(index, prefix):
+        matches = set()
+        start = bisect_left(index.sorted_tokens, prefix)
+        for token in index.sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= index.tokens[token]
+        return matches
+
+    def _score_candidates(self, index, query):
+        scores = {}
+        query_tokens = query.split()
+        names = index.names
+
+        # Exact full name, or every query token is a whole name token (e.g. the last name)
+        token_sets = [index.tokens.get(token, set()) for token in query_tokens]
+        for position in set.intersection(*token_sets) if token_sets else set():
+            if names[position] == query:
+                scores[position] = EXACT_NAME
+            elif names[position].endswith(" " + query):
+                scores[position] = LAST_NAME
+            else:
+                scores[position] = EXACT_TOKEN
+
+        # Substring of the full name: candidates must contain every inner trigram of the query
+        inner = {gram for gram in trigrams(query) if " " not in gram.strip() and len(gram.strip()) == 3}
+        if inner:
+            candidates = set.intersection(*(index.trigrams.get(gram, set()) for gram in inner))
+        else:
+            candidates = range(len(names))
+        for position in candidates:
+            if position not in scores and query in names[position]:
+                scores[position] = SUBSTRING
+
+        if scores:
+            return scores
+
+        # Every query token is a prefix of some name token
+        prefix_sets = [self._prefix_matches(index, token) for token in query_tokens]
+        for position in set.intersection(*prefix_sets) if prefix_sets else set():
+            scores[position] = PREFIX
+        if scores:
+            return scores
+
+        # Typo tolerant: trigram or edit-distance similarity of the query with the
+        # full name or any single token, for names sharing at least one trigram
+        query_grams = trigrams(query)
+        overlap = defaultdict(int)
+        for gram in query_grams:
+            for position in index.trigrams.get(gram, ()):
+                overlap[position] += 1
+        min_shared = max(2, len(query_grams) // 3)
+        for position, shared in overlap.items():
+            if shared < min_shared:
+                continue
+            name = names[position]
+            best = shared / len(query_grams | trigrams(name))
+            for token in [name] + name.split():
+                token_grams = trigrams(token)
+                best = max(best, len(query_grams & token_grams) / len(query_grams | token_grams))
+                if abs(len(token) - len(query)) <= 2:
+                    best = max(best, 1 - edit_distance(query, token) / max(len(token), len(query)))
+            if best >= FUZZY_THRESHOLD:
+                scores[position] = FUZZY * best
+
+        # Keep only the fuzzy matches close to the best one
+        if scores:
+            cutoff = max(scores.values()) * 0.9
+            scores = {position: score for position, score in scores.items() if score >= cutoff}
+        return scores
+
+    def search(self, name, limit=None):
+        """
+        Find players by full name, last name, name prefix or a misspelled name.
+
+        Exact and substring matches are returned when there are any; otherwise
+        prefix matches, otherwise fuzzy matches.
+
+        Args:
+            name: The name to look up
+            limit: Maximum number of players to return
+
+        Returns:
+            list: Matching player documents, best match first
+        """
+        query = normalize_name(name)
+        if not query:
+            return []
+
+        index = self.snapshot
+        scores = self._score_candidates(index, query)
+        ranked = sorted(
+            scores,
+            key=lambda position: (-scores[position], index.players[position].get("rank_value") or 0)
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [index.players[position] for position in ranked]
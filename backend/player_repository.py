@@ -0,0 +1,40 @@
+from user_budget import salary_table
+from player_name_index import PlayerNameIndex
+from salary_schema import to_public_document
+
+# Player name index, built from the salary table and rebuilt when the salary data changes
+player_name_index = PlayerNameIndex()
+
+
+def find_players_by_name(name):
+    """
+    Find players and their salary data by last name, full name or a misspelled name.
+
+    Shared by the /api/players route and the agent tools, so salary lookups
+    run in-process instead of going through an HTTP request.
+
+    Args:
+        name: The player's last name (e.g., 'James') or full name (e.g., 'LeBron James')
+
+    Returns:
+        list: Matching player documents, best match first, without the typed fields
+    """
+    return [to_public_document(player) for player in find_player_documents(name)]
+
+
+def find_player_documents(name):
+    """
+    Like find_players_by_name, but returns the typed salary documents (with
+    rank_value, salaries...) for in-process use. Do not serialize them as is.
+    """
+    player_name_index.sync(salary_table)
+    return player_name_index.search(name)
+
+
+def player_name_tokens():
+    """
+    Return the normalized name tokens of every known player, used to tell which
+    players a free-text query mentions.
+    """
+    player_name_index.sync(salary_table)
+    return player_name_index.name_tokens()
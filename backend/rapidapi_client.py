@@ -0,0 +1,288 @@
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.rapidapi_config import (
+    RAPIDAPI_HOST,
+    RAPIDAPI_BASE_URL,
+    RAPIDAPI_KEY_ENV,
+    RAPIDAPI_RATE_PER_SECOND,
+    RAPIDAPI_BURST,
+    RAPIDAPI_TIMEOUT,
+    RAPIDAPI_SEARCH_TTL,
+    RAPIDAPI_CURRENT_SEASON_TTL,
+    RAPIDAPI_MEMORY_ITEMS,
+    RAPIDAPI_CACHE_PATH,
+)
+from replay import cache_path
+from tracing import span
+
+load_dotenv()
+
+
+class RapidAPIError(Exception):
+    """
+    Raised when the API answers with a non-200 status.
+    """
+
+    def __init__(self, status_code):
+        super().__init__(f"API error: {status_code}")
+        self.status_code = status_code
+
+
+def current_season_start_year(today=None):
+    """
+    Start year of the NBA season in progress (or the last one, before October).
+
+    The api-nba-v1 `season` parameter is the start year, e.g. 2023 for 2023-24.
+    """
+    today = today or datetime.date.today()
+    return today.year if today.month >= 10 else today.year - 1
+
+
+def is_completed_season(season, today=None):
+    """
+    True if the season is over, so its statistics can no longer change.
+    """
+    try:
+        return int(season) < current_season_start_year(today)
+    except (TypeError, ValueError):
+        return False
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: `rate` tokens per second, at most `capacity` stored.
+
+    acquire() blocks until a token is available, so bursts up to `capacity`
+    go through immediately and sustained traffic is held to `rate`.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.waited_seconds = 0.0
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+                self.waited_seconds += wait
+            time.sleep(wait)
+
+
+class RapidAPIClient:
+    """
+    api-nba-v1 client with pooled connections, a token bucket and a tiered cache.
+
+    Responses are cached in two tiers:
+        - statistics of completed seasons never change and are kept in an
+          SQLite file on disk, so they survive restarts
+        - player searches and current-season statistics are kept in an
+          in-memory LRU for a TTL
+    Only successful responses are cached.
+    """
+
+    def __init__(self, api_key=None, session=None, cache_path=RAPIDAPI_CACHE_PATH,
+                 rate=RAPIDAPI_RATE_PER_SECOND, burst=RAPIDAPI_BURST, timeout=RAPIDAPI_TIMEOUT,
+                 max_memory_items=RAPIDAPI_MEMORY_ITEMS):
+        self.api_key = api_key or os.getenv(RAPIDAPI_KEY_ENV)
+        self.session = session or self._make_session()
+        self.timeout = timeout
+        self.max_memory_items = max_memory_items
+        self.limiter = TokenBucket(rate, burst)
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.errors = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body TEXT NOT NULL, stored_at REAL NOT NULL)")
+        self._db.commit()
+
+    @staticmethod
+    def _make_session(pool_size=8, retries=2):
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.headers["x-rapidapi-host"] = RAPIDAPI_HOST
+        return session
+
+    @staticmethod
+    def _cache_key(path, params):
+        return path + "?" + json.dumps(params, sort_keys=True, default=str)
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.hits_memory += 1
+            return data
+
+    def _set_memory(self, key, data, ttl):
+        with self._lock:
+            self._memory[key] = (time.monotonic() + ttl, data)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _get_disk(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.hits_disk += 1
+        return json.loads(row[0]) if row else None
+
+    def _count(self, counter):
+        # Requests run on several threads, counters are updated under the lock
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _set_disk(self, key, data):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, body, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(data), time.time())
+            )
+            self._db.commit()
+
+    def get(self, path, params, ttl=None, permanent=False):
+        """
+        GET an API endpoint, serving it from the cache when possible.
+
+        Args:
+            path: Endpoint path, e.g. "/players"
+            params: Query parameters
+            ttl: Seconds to keep the response in memory, None to not cache it
+            permanent: Keep the response on disk forever
+
+        Returns:
+            dict: The decoded JSON response
+
+        Raises:
+            RapidAPIError: If the API answers with a non-200 status
+        """
+        key = self._cache_key(path, params)
+        data = self._get_memory(key)
+        if data is not None:
+            return data
+        if permanent:
+            data = self._get_disk(key)
+            if data is not None:
+                self._set_memory(key, data, RAPIDAPI_SEARCH_TTL)
+                return data
+
+        self._count("misses")
+        if not self.api_key:
+            raise RuntimeError(f"{RAPIDAPI_KEY_ENV} is not set")
+        self.limiter.acquire()
+        with span("rapidapi", path) as request_span:
+            response = self.session.get(
+                RAPIDAPI_BASE_URL + path,
+                params=params,
+                headers={"x-rapidapi-key": self.api_key},
+                timeout=self.timeout,
+            )
+            request_span.set(status=response.status_code)
+            if response.status_code != 200:
+                self._count("errors")
+                raise RapidAPIError(response.status_code)
+            data = response.json()
+        # The API reports bad parameters in the body of a 200 response, don't cache those
+        if data.get("errors"):
+            return data
+        if permanent:
+            self._set_disk(key, data)
+            self._set_memory(key, data, RAPIDAPI_SEARCH_TTL)
+        elif ttl:
+            self._set_memory(key, data, ttl)
+        return data
+
+    def search_players(self, last_name):
+        """
+        Search players by last name.
+        """
+        return self.get("/players", {"search": last_name}, ttl=RAPIDAPI_SEARCH_TTL)
+
+    def player_statistics(self, player_id, season):
+        """
+        Per-game statistics of a player for a season (start year).
+
+        Completed seasons are cached permanently, the current one for a short TTL.
+        """
+        params = {"id": str(player_id), "season": str(season)}
+        if is_completed_season(season):
+            return self.get("/players/statistics", params, permanent=True)
+        return self.get("/players/statistics", params, ttl=RAPIDAPI_CURRENT_SEASON_TTL)
+
+    def stats(self):
+        with self._lock:
+            hits_memory, hits_disk, misses, errors = self.hits_memory, self.hits_disk, self.misses, self.errors
+            memory_items = len(self._memory)
+            disk_items = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = hits_memory + hits_disk + misses
+        return {
+            "hits_memory": hits_memory,
+            "hits_disk": hits_disk,
+            "misses": misses,
+            "errors": errors,
+            "hit_rate": round((hits_memory + hits_disk) / lookups, 4) if lookups else 0.0,
+            "memory_items": memory_items,
+            "disk_items": disk_items,
+            "rate_limited_seconds": round(self.limiter.waited_seconds, 3),
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_rapidapi_client():
+    """
+    Return the process-wide RapidAPI client, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RapidAPIClient(cache_path=cache_path(RAPIDAPI_CACHE_PATH))
+    return _client
@@ -0,0 +1,149 @@
+"""
+Lazily built shared objects.
+
+Heavy objects (agent executors, API clients, the news retriever, modules
+that pull in the LLM stack) are registered under a name with a factory and
+built on first use, so importing a module stays cheap. warm_up() builds the
+registered objects ahead of the first request, typically in the background
+once the server is accepting connections.
+"""
+
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.startup_config import WARMUP_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRegistry:
+    """
+    Named factories whose results are built once, on first get().
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._build_ms = {}
+        self._errors = {}
+        self._warm = []
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory, warm_up=True):
+        """
+        Register a factory.
+
+        Args:
+            name: Name the object is built and looked up under
+            factory: Zero-argument callable building the object
+            warm_up: Build the object in warm_up()
+
+        Returns:
+            callable: A zero-argument getter returning the built object
+        """
+        with self._lock:
+            if name not in self._factories:
+                self._factories[name] = factory
+                self._locks[name] = threading.Lock()
+                if warm_up:
+                    self._warm.append(name)
+        return lambda: self.get(name)
+
+    def get(self, name):
+        instance = self._instances.get(name)
+        if instance is not None or name in self._instances:
+            return instance
+        with self._locks[name]:
+            if name not in self._instances:
+                start = time.perf_counter()
+                try:
+                    instance = self._factories[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._build_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+                self._errors.pop(name, None)
+                self._instances[name] = instance
+                logger.debug("built %s in %s ms", name, self._build_ms[name])
+        return self._instances[name]
+
+    def is_built(self, name):
+        return name in self._instances
+
+    def warm_up(self, names=None):
+        """
+        Build registered objects now. Factories may register more objects
+        (e.g. a module imported by one), those are built too.
+
+        Args:
+            names: Names to build, every warm_up=True object if None
+
+        Returns:
+            dict: Build time in milliseconds of each object, or its error
+        """
+        start = time.perf_counter()
+        done = {}
+        while True:
+            with self._lock:
+                pending = [name for name in (names or self._warm) if name not in done]
+            if not pending:
+                break
+            for name in pending:
+                try:
+                    self.get(name)
+                    done[name] = self._build_ms.get(name, 0.0)
+                except Exception as e:
+                    logger.warning("Warm-up of %s failed: %s", name, e)
+                    done[name] = f"error: {e}"
+        logger.info("Warm-up built %d objects in %.0f ms", len(done), (time.perf_counter() - start) * 1000)
+        return done
+
+    def stats(self):
+        """
+        Return which objects are built and how long each took to build.
+        """
+        with self._lock:
+            return {
+                "registered": sorted(self._factories),
+                "build_ms": dict(self._build_ms),
+                "errors": dict(self._errors),
+            }
+
+
+registry = LazyRegistry()
+
+
+def register(name, factory, warm_up=True):
+    """
+    Register a factory with the shared registry, see LazyRegistry.register.
+    """
+    return registry.register(name, factory, warm_up=warm_up)
+
+
+def warm_up_when_listening(host, port, wait_seconds=WARMUP_WAIT_SECONDS):
+    """
+    Warm up the shared registry in a background thread as soon as a server
+    accepts connections on host:port, so startup is not delayed by it.
+    """
+    def run():
+        deadline = time.monotonic() + wait_seconds
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection((host, port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            logger.warning("Server not listening on %s:%s after %s s, warming up anyway", host, port, wait_seconds)
+        registry.warm_up()
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,647 @@
+"""
+Record/replay harness for the external services the backend talks to.
+
+With REPLAY_MODE=record the backend calls the real services and every
+interaction is appended to a fixture file per service. With
+REPLAY_MODE=replay no network access or API key is needed: interactions are
+answered from the fixtures, or by a local stand-in when missing, after an
+injected latency. End-to-end latency and throughput can then be measured
+deterministically on a laptop.
+
+    OpenAI    chat completions and embeddings, intercepted at the httpx transport
+    RapidAPI  api-nba-v1 requests, intercepted at the requests adapter
+    Pinecone  news vector searches, through ReplayVectorStore
+    MongoDB   the salary collections, snapshotted in record mode and served
+              by an in-memory stand-in in replay mode
+
+install() must run before the modules that create clients at import time,
+and before the shared MongoClient is first created (mongo.get_client).
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.replay_config import (
+    REPLAY_MODE,
+    REPLAY_FIXTURES_DIR,
+    REPLAY_STRICT,
+    REPLAY_LATENCY_MS,
+    REPLAY_USE_RECORDED_LATENCY,
+    REPLAY_LATENCY_SCALE,
+    REPLAY_SALARY_SEED_PATH,
+    REPLAY_MONGO_URI,
+    REPLAY_MONGO_COLLECTIONS,
+)
+from config.rapidapi_config import RAPIDAPI_HOST
+from local_vector_index import HashingEmbeddings, IndexedChunk
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay")
+OPENAI_HOSTS = {"api.openai.com"}
+if os.getenv("OPENAI_BASE_URL"):
+    OPENAI_HOSTS.add(urlparse(os.getenv("OPENAI_BASE_URL")).hostname)
+
+_mode = "off"
+_install_lock = threading.Lock()
+
+
+class ReplayMiss(Exception):
+    """
+    Raised in strict replay mode for an interaction missing from the fixtures.
+    """
+
+
+def active_mode():
+    return _mode
+
+
+def is_active():
+    return _mode != "off"
+
+
+def cache_path(path):
+    """
+    Path of an on-disk client cache: in memory while recording or replaying,
+    so cached responses neither hide interactions from the recorder nor
+    leak stand-in answers into the real caches.
+    """
+    return ":memory:" if is_active() else path
+
+
+def request_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """
+    Interactions of one service, keyed by a hash of the request.
+
+    Fixtures are JSON lines appended to "<fixtures dir>/<service>.jsonl";
+    when a request was recorded more than once the last recording wins.
+    """
+
+    def __init__(self, service, directory=REPLAY_FIXTURES_DIR):
+        self.service = service
+        self.path = os.path.join(directory, f"{service}.jsonl")
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def add(self, key, request, response, latency_ms):
+        entry = {"key": key, "request": request, "response": response, "latency_ms": round(latency_ms, 2)}
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._entries[key] = entry
+            self.recorded += 1
+
+    def stats(self):
+        with self._lock:
+            return {"fixtures": len(self._entries), "hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(service):
+    if service not in _stores:
+        with _stores_lock:
+            if service not in _stores:
+                _stores[service] = FixtureStore(service)
+    return _stores[service]
+
+
+def injected_latency(service, entry=None):
+    """
+    Seconds to wait before answering a replayed interaction.
+    """
+    if entry is not None and REPLAY_USE_RECORDED_LATENCY:
+        milliseconds = entry.get("latency_ms", 0)
+    else:
+        milliseconds = REPLAY_LATENCY_MS.get(service, 0)
+    return milliseconds * REPLAY_LATENCY_SCALE / 1000
+
+
+def _missing(service, description):
+    if REPLAY_STRICT:
+        raise ReplayMiss(f"No {service} fixture for {description}")
+
+
+# --- OpenAI ---------------------------------------------------------------
+
+def _openai_request(request):
+    try:
+        body = json.loads(request.content or b"{}")
+    except ValueError:
+        body = request.content.decode("utf-8", errors="replace")
+    return {"method": request.method, "path": request.url.path, "body": body}
+
+
+def _openai_response(entry, request):
+    import httpx
+
+    response = entry["response"]
+    return httpx.Response(
+        response["status"],
+        headers={"content-type": response.get("content_type", "application/json")},
+        content=response["body"].encode("utf-8"),
+        request=request,
+    )
+
+
+def _openai_standin(summary, request):
+    """
+    Local stand-in for an OpenAI endpoint: an echo completion (streamed if
+    requested) or deterministic hashing embeddings.
+    """
+    import httpx
+
+    body = summary["body"] if isinstance(summary["body"], dict) else {}
+    if summary["path"].endswith("/embeddings"):
+        inputs = body.get("input", [])
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        embedder = HashingEmbeddings(dimension=body.get("dimensions") or 1536)
+        data = []
+        for i, text in enumerate(inputs):
+            vector = embedder.embed_query(text if isinstance(text, str) else " ".join(map(str, text)))
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+        payload = {
+            "object": "list", "data": data, "model": body.get("model", "replay"),
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        }
+        return httpx.Response(200, json=payload, request=request)
+
+    if summary["path"].endswith("/chat/completions"):
+        messages = body.get("messages", [])
+        last_user = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "")
+        content = f"[replay] {str(last_user)[:200]}"
+        prompt_tokens = len(json.dumps(messages)) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                 "total_tokens": prompt_tokens + len(content) // 4}
+        base = {"id": "chatcmpl-replay", "created": 0, "model": body.get("model", "replay")}
+        if not body.get("stream"):
+            payload = dict(base, object="chat.completion", usage=usage, choices=[
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ])
+            return httpx.Response(200, json=payload, request=request)
+
+        chunks = [
+            dict(base, object="chat.completion.chunk", choices=[
+                {"index": 0, "delta": {"role": "assistant", "content": word}, "finish_reason": None}
+            ])
+            for word in re.findall(r"\S+\s*", content)
+        ]
+        chunks.append(dict(base, object="chat.completion.chunk", choices=[
+            {"index": 0, "delta": {}, "finish_reason": "stop"}
+        ]))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunks.append(dict(base, object="chat.completion.chunk", choices=[], usage=usage))
+        events = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events.encode("utf-8"),
+                              request=request)
+
+    return httpx.Response(404, json={"error": {"message": f"No replay stand-in for {summary['path']}"}}, request=request)
+
+
+def _record_openai(request, response, content, started):
+    import httpx
+
+    summary = _openai_request(request)
+    get_store("openai").add(
+        request_key(summary),
+        summary,
+        {
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "body": content.decode("utf-8", errors="replace"),
+        },
+        (time.perf_counter() - started) * 1000,
+    )
+    # The body was read (and decoded) while recording, hand back a plain copy
+    return httpx.Response(
+        response.status_code,
+        headers={"content-type": response.headers.get("content-type", "application/json")},
+        content=content,
+        request=request,
+    )
+
+
+def _replay_openai(request):
+    summary = _openai_request(request)
+    entry = get_store("openai").get(request_key(summary))
+    if entry is None:
+        _missing("openai", f"{summary['method']} {summary['path']}")
+    return entry, summary
+
+
+def _install_httpx():
+    import httpx
+
+    original_sync = httpx.HTTPTransport.handle_request
+    original_async = httpx.AsyncHTTPTransport.handle_async_request
+
+    def handle_request(self, request):
+        if request.url.host not in OPENAI_HOSTS:
+            return original_sync(self, request)
+        request.read()
+        if _mode == "record":
+            started = time.perf_counter()
+            response = original_sync(self, request)
+            return _record_openai(request, response, response.read(), started)
+        entry, summary = _replay_openai(request)
+        time.sleep(injected_latency("openai", entry))
+        return _openai_response(entry, request) if entry else _openai_standin(summary, request)
+
+    async def handle_async_request(self, request):
+        if request.url.host not in OPENAI_HOSTS:
+            return await original_async(self, request)
+        await request.aread()
+        if _mode == "record":
+            started = time.perf_counter()
+            response = await original_async(self, request)
+            return _record_openai(request, response, await response.aread(), started)
+        entry, summary = _replay_openai(request)
+        await asyncio.sleep(injected_latency("openai", entry))
+        return _openai_response(entry, request) if entry else _openai_standin(summary, request)
+
+    httpx.HTTPTransport.handle_request = handle_request
+    httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+
+
+# --- RapidAPI -------------------------------------------------------------
+
+def _install_requests():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    original_send = HTTPAdapter.send
+
+    def send(self, request, **kwargs):
+        url = urlparse(request.url)
+        if url.hostname != RAPIDAPI_HOST:
+            return original_send(self, request, **kwargs)
+        # The URL carries the path and query parameters; the key header is left out
+        summary = {"method": request.method, "path": url.path, "query": url.query}
+        key = request_key(summary)
+        store = get_store("rapidapi")
+
+        if _mode == "record":
+            started = time.perf_counter()
+            response = original_send(self, request, **kwargs)
+            store.add(key, summary, {
+                "status": response.status_code,
+                "content_type": response.headers.get("content-type", "application/json"),
+                "body": response.text,
+            }, (time.perf_counter() - started) * 1000)
+            return response
+
+        entry = store.get(key)
+        if entry is None:
+            _missing("rapidapi", f"{request.method} {request.url}")
+            body = json.dumps({"get": url.path.lstrip("/"), "parameters": {}, "errors": [], "results": 0, "response": []})
+            stored = {"status": 200, "content_type": "application/json", "body": body}
+        else:
+            stored = entry["response"]
+        time.sleep(injected_latency("rapidapi", entry))
+
+        response = requests.Response()
+        response.status_code = stored["status"]
+        response.headers = CaseInsensitiveDict({"content-type": stored.get("content_type", "application/json")})
+        response._content = stored["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    HTTPAdapter.send = send
+
+
+# --- Pinecone -------------------------------------------------------------
+
+class ReplayVectorStore:
+    """
+    Records or replays the MMR searches of a vector store.
+
+    While recording, searches go to the wrapped store and their results are
+    saved. While replaying, results come from the fixtures; a search missing
+    from them returns no chunks. Other methods are passed to the wrapped
+    store, which is None in replay mode.
+    """
+
+    def __init__(self, vectorstore=None, service="pinecone"):
+        self.vectorstore = vectorstore
+        self.service = service
+
+    def max_marginal_relevance_search(self, query, k=4, **kwargs):
+        summary = {"method": "max_marginal_relevance_search", "query": query, "k": k, "kwargs": kwargs}
+        key = request_key(summary)
+        store = get_store(self.service)
+
+        if _mode == "record":
+            started = time.perf_counter()
+            results = self.vectorstore.max_marginal_relevance_search(query, k=k, **kwargs)
+            store.add(key, summary, {"documents": [
+                {"id": getattr(doc, "id", None), "page_content": doc.page_content, "metadata": doc.metadata}
+                for doc in results
+            ]}, (time.perf_counter() - started) * 1000)
+            return results
+
+        entry = store.get(key)
+        if entry is None:
+            _missing(self.service, f"search {query!r}")
+        time.sleep(injected_latency(self.service, entry))
+        if entry is None:
+            return []
+        return [
+            IndexedChunk(doc.get("id"), doc["page_content"], doc["metadata"])
+            for doc in entry["response"]["documents"]
+        ]
+
+    def __getattr__(self, name):
+        if self.vectorstore is None:
+            raise AttributeError(f"{name} is not available on the replayed {self.service} store")
+        return getattr(self.vectorstore, name)
+
+
+def wrap_vectorstore(build, service="pinecone"):
+    """
+    Return the vector store built by `build` when the harness is off, a
+    recording wrapper around it in record mode, and a replaying stand-in
+    (without calling `build`) in replay mode.
+    """
+    if _mode == "replay":
+        return ReplayVectorStore(None, service)
+    if _mode == "record":
+        return ReplayVectorStore(build(), service)
+    return build()
+
+
+# --- MongoDB --------------------------------------------------------------
+
+def _matches(document, query):
+    for field, condition in (query or {}).items():
+        value = document.get(field)
+        if isinstance(condition, dict) and any(op.startswith("$") for op in condition):
+            for op, operand in condition.items():
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+                if op == "$exists" and (field in document) != bool(operand):
+                    return False
+                if op in ("$gt", "$gte", "$lt", "$lte"):
+                    if value is None:
+                        return False
+                    if op == "$gt" and not value > operand:
+                        return False
+                    if op == "$gte" and not value >= operand:
+                        return False
+                    if op == "$lt" and not value < operand:
+                        return False
+                    if op == "$lte" and not value <= operand:
+                        return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _project(document, projection):
+    if not projection:
+        return dict(document)
+    included = {field for field, flag in projection.items() if flag and field != "_id"}
+    if included:
+        result = {field: document[field] for field in included if field in document}
+        if projection.get("_id", 1) and "_id" in document:
+            result["_id"] = document["_id"]
+        return result
+    excluded = {field for field, flag in projection.items() if not flag}
+    return {field: value for field, value in document.items() if field not in excluded}
+
+
+class ReplayCursor:
+    def __init__(self, documents):
+        self._documents = documents
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, field_direction in reversed(keys):
+            self._documents.sort(
+                key=lambda document: (document.get(field) is None, document.get(field)),
+                reverse=field_direction < 0,
+            )
+        return self
+
+    def limit(self, count):
+        if count:
+            self._documents = self._documents[:count]
+        return self
+
+    def __iter__(self):
+        return iter(self._documents)
+
+
+class ReplayCollection:
+    """
+    In-memory stand-in for the subset of the pymongo Collection API the
+    backend's request paths use.
+    """
+
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.documents = []
+        self._lock = threading.Lock()
+
+    def _delay(self):
+        time.sleep(injected_latency("mongo"))
+
+    def find(self, filter=None, projection=None, max_time_ms=None):
+        self._delay()
+        with self._lock:
+            return ReplayCursor([_project(d, projection) for d in self.documents if _matches(d, filter)])
+
+    def find_one(self, filter=None, projection=None, max_time_ms=None):
+        self._delay()
+        with self._lock:
+            for document in self.documents:
+                if _matches(document, filter):
+                    return _project(document, projection)
+        return None
+
+    def count_documents(self, filter):
+        with self._lock:
+            return sum(1 for document in self.documents if _matches(document, filter))
+
+    def update_one(self, filter, update, upsert=False):
+        self._delay()
+        with self._lock:
+            document = next((d for d in self.documents if _matches(d, filter)), None)
+            if document is None:
+                if not upsert:
+                    return
+                document = {field: value for field, value in filter.items() if not isinstance(value, dict)}
+                self.documents.append(document)
+            for field, value in update.get("$set", {}).items():
+                document[field] = value
+            for field, value in update.get("$inc", {}).items():
+                document[field] = document.get(field, 0) + value
+
+    def delete_many(self, filter):
+        with self._lock:
+            self.documents = [document for document in self.documents if not _matches(document, filter)]
+
+    def create_index(self, keys, **kwargs):
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+class ReplayDatabase:
+    def __init__(self, name):
+        self.name = name
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = ReplayCollection(self, name)
+        return self._collections[name]
+
+
+class ReplayMongoClient:
+    """
+    Stand-in for pymongo.MongoClient. Every client shares one set of
+    in-memory databases, seeded from the Mongo fixture or, without one, from
+    the scraped salary data.
+    """
+
+    _databases = None
+    _lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        with ReplayMongoClient._lock:
+            if ReplayMongoClient._databases is None:
+                ReplayMongoClient._databases = _seed_databases()
+
+    def __getitem__(self, name):
+        with ReplayMongoClient._lock:
+            if name not in self._databases:
+                self._databases[name] = ReplayDatabase(name)
+            return self._databases[name]
+
+    def close(self):
+        pass
+
+
+def _seed_databases():
+    databases = {}
+    path = os.path.join(REPLAY_FIXTURES_DIR, "mongo.json")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    else:
+        from salary_schema import DATA_VERSION_ID, to_typed_document
+
+        with open(REPLAY_SALARY_SEED_PATH, encoding="utf-8") as f:
+            players = [to_typed_document(player) for player in json.load(f)]
+        snapshot = {"nba_salaries": {
+            "players": [player for player in players if player["name_key"]],
+            "meta": [{"_id": DATA_VERSION_ID, "version": 1}],
+        }}
+
+    for database_name, collections in snapshot.items():
+        database = databases[database_name] = ReplayDatabase(database_name)
+        for collection_name, documents in collections.items():
+            database[collection_name].documents = documents
+    return databases
+
+
+def snapshot_mongo(uri=REPLAY_MONGO_URI, collections=REPLAY_MONGO_COLLECTIONS):
+    """
+    Save the salary collections to the Mongo fixture, used to seed the
+    stand-in in replay mode.
+    """
+    from mongo import create_client
+
+    client = create_client(uri, serverSelectionTimeoutMS=5000)
+    snapshot = {
+        database: {name: list(client[database][name].find()) for name in names}
+        for database, names in collections.items()
+    }
+    os.makedirs(REPLAY_FIXTURES_DIR, exist_ok=True)
+    with open(os.path.join(REPLAY_FIXTURES_DIR, "mongo.json"), "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, default=str)
+    return {database: {name: len(documents) for name, documents in names.items()} for database, names in snapshot.items()}
+
+
+# --------------------------------------------------------------------------
+
+def install(mode=REPLAY_MODE):
+    """
+    Activate the harness in "record" or "replay" mode; "off" does nothing.
+    """
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"Unknown REPLAY_MODE: {mode}. Available: {', '.join(MODES)}")
+    with _install_lock:
+        if mode == "off" or _mode != "off":
+            return
+        _install_httpx()
+        _install_requests()
+        if mode == "replay":
+            import pymongo
+
+            pymongo.MongoClient = ReplayMongoClient
+            # Clients refuse to start without keys, none of them reaches a service
+            for variable in ("OPENAI_API_KEY", "PINECONE_API_KEY", "RAPIDAPI_KEY"):
+                os.environ.setdefault(variable, "replay")
+        else:
+            try:
+                logger.info("Snapshotted MongoDB for replay: %s", snapshot_mongo())
+            except Exception as e:
+                logger.warning("Error snapshotting MongoDB, replay will seed from %s: %s", REPLAY_SALARY_SEED_PATH, e)
+        _mode = mode
+    logger.info("Replay harness in %s mode, fixtures in %s", mode, REPLAY_FIXTURES_DIR)
+
+
+def stats():
+    return {
+        "mode": _mode,
+        "services": {service: store.stats() for service, store in _stores.items()},
+    }
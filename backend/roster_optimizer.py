@@ -0,0 +1,162 @@
+import numpy as np
+
+from salary_schema import normalize_name
+
+# Upper bound on the DP choice table (bits), keeps memory around 32 MB
+MAX_TABLE_BITS = 256 * 1024 * 1024
+
+
+def rank_value(player, max_rank):
+    """
+    Default value score: players ranked higher are worth more, linearly.
+    """
+    return max_rank + 1 - player["rank_value"]
+
+
+def top_heavy_value(player, max_rank):
+    """
+    Value score favouring stars: quadratic in the rank-based score.
+    """
+    score = max_rank + 1 - player["rank_value"]
+    return score * score // max_rank
+
+
+VALUE_FUNCTIONS = {
+    "rank": rank_value,
+    "top_heavy": top_heavy_value,
+}
+
+
+def _choose(values, salaries, roster_size, budget):
+    """
+    Exact cardinality-constrained knapsack.
+
+    dp[c][v] is the minimum total salary of c players with total value v.
+    Each player updates every (c, v) cell in one vectorized step and records
+    in a packed bit table whether it improved that cell, so the chosen
+    players can be traced back afterwards.
+
+    Returns:
+        list: Positions of the chosen players, or None if no roster fits the budget
+    """
+    max_value = int(np.sort(values)[::-1][:roster_size].sum())
+    unreachable = np.iinfo(np.int64).max // 2
+    dp = np.full((roster_size + 1, max_value + 1), unreachable, dtype=np.int64)
+    dp[0, 0] = 0
+
+    taken = []
+    for i, (value, salary) in enumerate(zip(values, salaries)):
+        improved = np.zeros((roster_size + 1, max_value + 1), dtype=bool)
+        for c in range(min(i + 1, roster_size), 0, -1):
+            candidate = dp[c - 1, :max_value + 1 - value] + salary
+            better = candidate < dp[c, value:]
+            dp[c, value:][better] = candidate[better]
+            improved[c, value:] = better
+        taken.append(np.packbits(improved, axis=1))
+
+    feasible = np.nonzero(dp[roster_size] <= budget)[0]
+    if len(feasible) == 0:
+        return None
+
+    chosen = []
+    c, v = roster_size, int(feasible[-1])
+    for i in range(len(values) - 1, -1, -1):
+        if c == 0:
+            break
+        if taken[i][c, v // 8] & (0x80 >> (v % 8)):
+            chosen.append(i)
+            c -= 1
+            v -= int(values[i])
+    return chosen[::-1]
+
+
+def optimize_roster(players, roster_size=8, budget=200000000, locked=(), value="rank"):
+    """
+    Pick the roster with the highest total value that fits the budget.
+
+    Args:
+        players: Salary documents with name, rank_value and salary_value
+        roster_size: Number of players on the roster, locked players included
+        budget: Total salary budget in dollars
+        locked: Names of players that must be on the roster
+        value: Name of a value function in VALUE_FUNCTIONS, or a callable
+               (player, max_rank) -> non-negative integer score
+
+    Returns:
+        dict: The chosen players, totals and remaining budget
+
+    Raises:
+        ValueError: If a locked player is unknown, or no roster fits the budget
+    """
+    value_function = VALUE_FUNCTIONS.get(value) if isinstance(value, str) else value
+    if value_function is None:
+        raise ValueError(f"Unknown value function: {value}. Available: {', '.join(VALUE_FUNCTIONS)}")
+    if roster_size < 1:
+        raise ValueError("roster_size must be at least 1")
+
+    # One entry per player with a known rank and salary
+    by_name = {}
+    for player in players:
+        if player.get("rank_value") is None or player.get("salary_value") is None:
+            continue
+        by_name.setdefault(player.get("name_key") or normalize_name(player["name"]), player)
+    max_rank = max((player["rank_value"] for player in by_name.values()), default=0)
+
+    locked_keys = []
+    for name in locked:
+        key = normalize_name(name)
+        if key not in by_name:
+            raise ValueError(f"Locked player not found: {name}")
+        if key not in locked_keys:
+            locked_keys.append(key)
+    locked_players = [by_name[key] for key in locked_keys]
+    if len(locked_players) > roster_size:
+        raise ValueError(f"{len(locked_players)} locked players exceed the roster size of {roster_size}")
+
+    locked_salary = sum(player["salary_value"] for player in locked_players)
+    remaining_budget = budget - locked_salary
+    if remaining_budget < 0:
+        raise ValueError("Locked players alone exceed the budget")
+
+    open_slots = roster_size - len(locked_players)
+    candidates = [
+        player for key, player in by_name.items()
+        if key not in locked_keys and player["salary_value"] <= remaining_budget
+    ]
+    if len(candidates) < open_slots:
+        raise ValueError("Not enough players available to fill the roster")
+
+    chosen = []
+    if open_slots > 0:
+        values = np.array([int(value_function(player, max_rank)) for player in candidates], dtype=np.int64)
+        if (values < 0).any():
+            raise ValueError("Value scores must be non-negative integers")
+        salaries = np.array([player["salary_value"] for player in candidates], dtype=np.int64)
+
+        table_bits = len(candidates) * (open_slots + 1) * (int(np.sort(values)[::-1][:open_slots].sum()) + 1)
+        if table_bits > MAX_TABLE_BITS:
+            raise ValueError("Roster too large to optimize exactly, reduce roster_size")
+
+        positions = _choose(values, salaries, open_slots, remaining_budget)
+        if positions is None:
+            raise ValueError("No roster of that size fits the budget")
+        chosen = [candidates[position] for position in positions]
+
+    roster = sorted(locked_players + chosen, key=lambda player: player["rank_value"])
+    total_salary = sum(player["salary_value"] for player in roster)
+    return {
+        "players": [
+            {
+                "name": player["name"],
+                "rank": player.get("rank", f"{player['rank_value']}."),
+                "salary": player["salary_value"],
+                "formatted_salary": player.get("2024/25", f"${player['salary_value']:,}"),
+                "value": int(value_function(player, max_rank)),
+                "locked": any(player is locked_player for locked_player in locked_players),
+            }
+            for player in roster
+        ],
+        "total_salary": total_salary,
+        "total_value": sum(int(value_function(player, max_rank)) for player in roster),
+        "remaining_budget": budget - total_salary,
+    }
@@ -0,0 +1,141 @@
+import re
+import time
+import unicodedata
+from pymongo import ASCENDING, UpdateOne
+
+from mongo import find_one
+
+# Document in the meta collection holding the salary data version
+DATA_VERSION_ID = "salary_data"
+
+# Salary seasons scraped from hoopshype, the first one is the current season
+SEASONS = ["2024/25", "2025/26", "2026/27", "2027/28"]
+CURRENT_SEASON = SEASONS[0]
+
+
+def parse_rank(rank):
+    """
+    Convert a scraped rank such as "12." to an integer, or None if it is not a number.
+    """
+    digits = re.sub(r"[^0-9]", "", str(rank))
+    return int(digits) if digits else None
+
+
+def parse_salary(salary):
+    """
+    Convert a scraped salary such as "$47,600,000" to integer dollars, or None
+    if it is not a number.
+    """
+    if isinstance(salary, (int, float)):
+        return int(salary)
+    digits = str(salary).replace("$", "").replace(",", "").strip()
+    try:
+        return int(float(digits))
+    except ValueError:
+        return None
+
+
+def normalize_name(name):
+    """
+    Lowercase, accent-free, punctuation-free form of a player name.
+
+    e.g. "Nikola Jokić" -> "nikola jokic", "De'Aaron Fox" -> "deaaron fox"
+    """
+    name = unicodedata.normalize("NFKD", str(name))
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    name = re.sub(r"[^\w\s-]", "", name.lower()).replace("-", " ")
+    return " ".join(name.split())
+
+
+def to_typed_document(player):
+    """
+    Add typed fields to a scraped salary row, keeping the original strings.
+
+    Added fields:
+        rank_value: integer rank
+        salary_value: integer salary of the current season in dollars
+        salaries: integer salary per season
+        name_key: normalized player name, used as the player identity
+    """
+    salaries = {}
+    for season in SEASONS:
+        if season in player:
+            salaries[season] = parse_salary(player[season])
+
+    document = dict(player)
+    document.pop("_id", None)
+    document["rank_value"] = parse_rank(player.get("rank", ""))
+    document["salary_value"] = salaries.get(CURRENT_SEASON)
+    document["salaries"] = salaries
+    document["name_key"] = normalize_name(player.get("name", ""))
+    return document
+
+
+# Fields added by to_typed_document; internal to the backend, not part of the API responses
+TYPED_FIELDS = ("rank_value", "salary_value", "salaries", "name_key")
+
+
+def to_public_document(document):
+    """
+    The scraped salary row of a typed document, as served by /api/players
+    and the agent tools.
+    """
+    return {field: value for field, value in document.items() if field not in TYPED_FIELDS}
+
+
+def ensure_indexes(collection):
+    """
+    Create the indexes used by the salary query paths.
+    """
+    collection.create_index([("rank_value", ASCENDING), ("salary_value", ASCENDING)])
+    collection.create_index([("salary_value", ASCENDING)])
+    collection.create_index([("name_key", ASCENDING)])
+
+
+def upsert_players(collection, players):
+    """
+    Upsert scraped salary rows by player and drop players no longer listed.
+
+    Rows written by the old insert_many ingest have no name_key and are
+    removed as well, which also clears their duplicates.
+
+    Returns:
+        int: Number of players written
+
+    Raises:
+        ValueError: If no row has a player name, e.g. after a failed scrape;
+            the stored data and its version are left untouched
+    """
+    documents = [to_typed_document(player) for player in players]
+    documents = [document for document in documents if document["name_key"]]
+    if not documents:
+        raise ValueError("No salary rows with a player name to upsert")
+    operations = [
+        UpdateOne({"name_key": document["name_key"]}, {"$set": document}, upsert=True)
+        for document in documents
+    ]
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    collection.delete_many({"name_key": {"$nin": [document["name_key"] for document in documents]}})
+    ensure_indexes(collection)
+    bump_data_version(collection)
+    return len(documents)
+
+
+def bump_data_version(collection):
+    """
+    Increment the salary data version so in-process caches reload.
+    """
+    collection.database["meta"].update_one(
+        {"_id": DATA_VERSION_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": time.time()}},
+        upsert=True
+    )
+
+
+def get_data_version(collection):
+    """
+    Return the current salary data version, 0 if the data was never versioned.
+    """
+    meta = find_one(collection.database["meta"], {"_id": DATA_VERSION_ID}, {"version": 1}, name="data_version")
+    return meta["version"] if meta else 0
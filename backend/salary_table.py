@@ -0,0 +1,206 @@
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+from mongo import MongoUnavailable, find
+from salary_schema import get_data_version
+
+logger = logging.getLogger(__name__)
+
+# Salary used for players without a parsable salary, never affordable
+UNAFFORDABLE = 2 ** 62
+
+# Fields returned for each player, matching the Mongo projection used before
+PLAYER_FIELDS = ("rank", "2024/25", "name", "rank_value", "salary_value")
+
+# One loaded data version: players sorted by rank, their ranks and salaries,
+# the suffix minimums of the salaries and their sparse table of range minimums
+SalarySnapshot = namedtuple("SalarySnapshot", ["version", "players", "ranks", "salaries", "suffix_min", "range_min"])
+
+EMPTY_SNAPSHOT = SalarySnapshot(None, [], array("q"), array("q"), array("q"), [])
+
+
+def build_snapshot(players, version):
+    """
+    Build the lookup arrays of a list of player documents sorted by rank.
+    """
+    ranks = array("q", (player["rank_value"] for player in players))
+    salaries = array("q", (
+        UNAFFORDABLE if player.get("salary_value") is None else player["salary_value"]
+        for player in players
+    ))
+
+    suffix_min = array("q", salaries)
+    for i in range(len(suffix_min) - 2, -1, -1):
+        suffix_min[i] = min(suffix_min[i], suffix_min[i + 1])
+
+    # range_min[level][i] = min(salaries[i:i + 2 ** level])
+    range_min = [salaries]
+    width = 1
+    while width * 2 <= len(salaries):
+        previous = range_min[-1]
+        range_min.append(array("q", (
+            min(previous[i], previous[i + width]) for i in range(len(salaries) - width * 2 + 1)
+        )))
+        width *= 2
+    return SalarySnapshot(version, players, ranks, salaries, suffix_min, range_min)
+
+
+class SalaryTable:
+    """
+    Compact in-process copy of the salary collection.
+
+    Players are held sorted by rank next to two parallel integer arrays of
+    ranks and salaries. A suffix-minimum array answers "is anyone from rank r
+    on affordable" in O(1) and a sparse table of range minimums lets
+    next_affordable_rank binary search the first affordable rank in
+    O(log n), all without touching the database.
+
+    The table reloads itself when the salary data version (bumped by every
+    salary ingest) changes. The version is checked at most once every
+    `refresh_interval` seconds.
+
+    A reload builds a new SalarySnapshot and publishes it with one
+    assignment; lookups read `snapshot` once, so they never mix two versions.
+
+    `get_collection` returns the salary collection. It is first called on
+    the first load, so creating the table does not connect to MongoDB.
+    """
+
+    def __init__(self, get_collection, refresh_interval=60):
+        self.get_collection = get_collection
+        self.refresh_interval = refresh_interval
+        self.snapshot = EMPTY_SNAPSHOT
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._reload_hooks = []
+
+    def __len__(self):
+        self.refresh()
+        return len(self.snapshot.players)
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    @property
+    def players(self):
+        return self.snapshot.players
+
+    def add_reload_hook(self, hook):
+        """
+        Register a callable invoked after the table has been reloaded.
+        """
+        self._reload_hooks.append(hook)
+
+    def refresh(self, force=False):
+        """
+        Reload the table if the salary data version changed.
+
+        If MongoDB is unavailable, the loaded table is kept.
+
+        Returns:
+            bool: True if the table was reloaded
+
+        Raises:
+            MongoUnavailable: If MongoDB can't be reached and no table was loaded yet
+        """
+        now = time.monotonic()
+        if not force and self.version is not None and now - self._checked_at < self.refresh_interval:
+            return False
+
+        with self._lock:
+            if not force and self.version is not None and now - self._checked_at < self.refresh_interval:
+                return False
+            try:
+                version = get_data_version(self.get_collection())
+            except MongoUnavailable as e:
+                if self.version is None:
+                    raise
+                # Keep serving the loaded table until MongoDB is back
+                logger.warning("Salary table not refreshed, serving data version %s: %s", self.version, e)
+                self._checked_at = now
+                return False
+            self._checked_at = now
+            if not force and version == self.version:
+                return False
+            self._load(version)
+
+        for hook in self._reload_hooks:
+            hook(self)
+        return True
+
+    def _load(self, version):
+        players = find(
+            self.get_collection(),
+            {"rank_value": {"$ne": None}},
+            {"_id": 0},
+            sort=[("rank_value", 1)],
+            name="salary_table",
+        )
+        self.snapshot = build_snapshot(players, version)
+        logger.info("Loaded salary table with %d players (data version %s)", len(players), version)
+
+    @staticmethod
+    def _min_salary(snapshot, start, end):
+        # Minimum salary over positions start..end inclusive
+        level = (end - start + 1).bit_length() - 1
+        table = snapshot.range_min[level]
+        return min(table[start], table[end - (1 << level) + 1])
+
+    def next_affordable_rank(self, budget, start_rank=1):
+        """
+        Find the first rank >= start_rank with at least one salary <= budget.
+
+        Args:
+            budget: The available budget in dollars
+            start_rank: The rank to start searching from
+
+        Returns:
+            int: The rank found, or None if no player from start_rank on fits the budget
+        """
+        self.refresh()
+        snapshot = self.snapshot
+        ranks = snapshot.ranks
+        start = bisect_left(ranks, start_rank)
+        if start == len(ranks) or snapshot.suffix_min[start] > budget:
+            return None
+
+        lo, hi = start, len(ranks) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._min_salary(snapshot, start, mid) <= budget:
+                hi = mid
+            else:
+                lo = mid + 1
+        return ranks[lo]
+
+    def data_version(self):
+        """
+        Return the salary data version of the table, refreshing it first if due.
+        """
+        self.refresh()
+        return self.version
+
+    def all_players(self):
+        """
+        Return every player document, sorted by rank.
+        """
+        self.refresh()
+        return self.players
+
+    def players_from_rank(self, rank, count=5, rank_span=6):
+        """
+        Return up to `count` players with rank in [rank, rank + rank_span), by rank.
+        """
+        self.refresh()
+        snapshot = self.snapshot
+        start = bisect_left(snapshot.ranks, rank)
+        end = min(bisect_left(snapshot.ranks, rank + rank_span), start + count)
+        return [
+            {field: player[field] for field in PLAYER_FIELDS if field in player}
+            for player in snapshot.players[start:end]
+        ]
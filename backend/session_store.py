@@ -0,0 +1,341 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.session_config import (
+    SESSION_BACKEND,
+    SESSION_TTL_SECONDS,
+    SESSION_MAX_SESSIONS,
+    SESSION_MAX_BYTES,
+    SESSION_SQLITE_PATH,
+    SESSION_REDIS_URL,
+    SESSION_LOCK_TIMEOUT,
+)
+
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class SessionLockTimeout(Exception):
+    """
+    Raised when another request of the same session holds its lock for too long.
+    """
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+def is_valid_session_id(session_id):
+    return bool(session_id) and SESSION_ID_PATTERN.match(session_id) is not None
+
+
+class InMemorySessionBackend:
+    """
+    Per-process session backend: an LRU of serialized sessions.
+
+    Every read or write moves the session to the most recently used end and
+    pushes its expiry `ttl` seconds out, so the LRU order is also the expiry
+    order and expired sessions are always at the front. Sessions are evicted
+    when they expire or when the number of sessions or their total size goes
+    over the cap.
+    """
+
+    shared = False
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS, max_sessions=SESSION_MAX_SESSIONS, max_bytes=SESSION_MAX_BYTES):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._session_locks = {}
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._data:
+            key, (expires_at, payload) = next(iter(self._data.items()))
+            if expires_at > now and len(self._data) <= self.max_sessions and self._bytes <= self.max_bytes:
+                break
+            del self._data[key]
+            self._bytes -= len(payload)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            self._evict()
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data[key] = (time.monotonic() + self.ttl, entry[1])
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, payload):
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._data[key] = (time.monotonic() + self.ttl, payload)
+            self._bytes += len(payload)
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+
+    @contextmanager
+    def lock(self, key, timeout):
+        # One lock per session in use, dropped once no request holds or waits for it
+        with self._lock:
+            entry = self._session_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            if not entry[0].acquire(timeout=timeout):
+                raise SessionLockTimeout(f"Session {key} is busy")
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._session_locks.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._data), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class SQLiteSessionBackend:
+    """
+    Session backend in an SQLite file, shared by every worker process on one host.
+
+    Stands in for a networked store in development and tests. Session locks
+    are rows in a `locks` table with an expiry, so a lock left behind by a
+    crashed worker is released after `lock_ttl` seconds.
+    """
+
+    shared = True
+
+    def __init__(self, path=SESSION_SQLITE_PATH, ttl=SESSION_TTL_SECONDS, lock_ttl=SESSION_LOCK_TIMEOUT):
+        self.path = path
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._local = threading.local()
+        db = self._db()
+        db.execute("CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+        db.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+        db.commit()
+
+    def _db(self):
+        # sqlite3 connections are per thread
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def get(self, key):
+        now = time.time()
+        db = self._db()
+        row = db.execute("SELECT payload FROM sessions WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+        if row is None:
+            return None
+        db.execute("UPDATE sessions SET expires_at = ? WHERE key = ?", (now + self.ttl, key))
+        return row[0]
+
+    def set(self, key, payload):
+        now = time.time()
+        db = self._db()
+        db.execute("INSERT OR REPLACE INTO sessions (key, payload, expires_at) VALUES (?, ?, ?)", (key, payload, now + self.ttl))
+        db.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, key):
+        self._db().execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    @contextmanager
+    def lock(self, key, timeout):
+        db = self._db()
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.time()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now))
+                acquired = db.execute(
+                    "INSERT OR IGNORE INTO locks (key, owner, expires_at) VALUES (?, ?, ?)",
+                    (key, owner, now + self.lock_ttl)
+                ).rowcount == 1
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            if acquired:
+                break
+            if time.monotonic() >= deadline:
+                raise SessionLockTimeout(f"Session {key} is busy")
+            time.sleep(0.05)
+        try:
+            yield
+        finally:
+            db.execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, owner))
+
+    def stats(self):
+        row = self._db().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        return {"sessions": row[0], "bytes": row[1]}
+
+
+class RedisSessionBackend:
+    """
+    Session backend in Redis, shared by every worker on every host.
+
+    Requires the optional `redis` package.
+    """
+
+    shared = True
+
+    def __init__(self, url=SESSION_REDIS_URL, ttl=SESSION_TTL_SECONDS, lock_ttl=SESSION_LOCK_TIMEOUT, prefix="nba-chatbot:session:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("SESSION_BACKEND=redis requires the redis package: pip install redis") from e
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        pipeline = self.client.pipeline()
+        pipeline.get(self.prefix + key)
+        pipeline.expire(self.prefix + key, self.ttl)
+        payload, _ = pipeline.execute()
+        return payload.decode("utf-8") if payload is not None else None
+
+    def set(self, key, payload):
+        self.client.set(self.prefix + key, payload, ex=self.ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    @contextmanager
+    def lock(self, key, timeout):
+        lock = self.client.lock(self.prefix + "lock:" + key, timeout=self.lock_ttl, blocking_timeout=timeout)
+        if not lock.acquire():
+            raise SessionLockTimeout(f"Session {key} is busy")
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def stats(self):
+        return {"sessions": sum(1 for _ in self.client.scan_iter(self.prefix + "*", count=1000))}
+
+
+BACKENDS = {
+    "memory": InMemorySessionBackend,
+    "sqlite": SQLiteSessionBackend,
+    "redis": RedisSessionBackend,
+}
+
+
+class SessionStore:
+    """
+    Conversation state keyed by client session ID.
+
+    session() holds the session's lock for the whole request, so two
+    requests of one session run one after the other while different
+    sessions run concurrently. State is a JSON-serializable dict and is
+    written back to the backend when the request finishes.
+    """
+
+    def __init__(self, backend, lock_timeout=SESSION_LOCK_TIMEOUT):
+        self.backend = backend
+        self.lock_timeout = lock_timeout
+
+    @contextmanager
+    def session(self, session_id):
+        with self.backend.lock(session_id, self.lock_timeout):
+            payload = self.backend.get(session_id)
+            state = json.loads(payload) if payload else {}
+            try:
+                yield state
+            finally:
+                self.backend.set(session_id, json.dumps(state))
+
+    def clear(self, session_id):
+        with self.backend.lock(session_id, self.lock_timeout):
+            self.backend.delete(session_id)
+
+    def stats(self):
+        stats = {"backend": type(self.backend).__name__}
+        stats.update(self.backend.stats())
+        return stats
+
+
+def summary_key(key):
+    """
+    Session state key of the rolling summary of an agent memory.
+    """
+    return key + "_summary"
+
+
+def load_chat_history(state, key):
+    """
+    Return the LangChain messages of an agent memory stored in session state,
+    preceded by the summary of older turns if there is one.
+    """
+    # Imported here, the session store is used without LangChain by the app itself
+    from langchain_core.messages import SystemMessage, messages_from_dict
+
+    messages = messages_from_dict(state.get(key, []))
+    if state.get(summary_key(key)):
+        messages.insert(0, SystemMessage(content=f"Summary of the earlier conversation: {state[summary_key(key)]}"))
+    return messages
+
+
+def save_chat_turn(state, key, user_message, ai_message):
+    """
+    Append a user/assistant exchange to an agent memory in session state.
+
+    The memory is kept within its token budget by history_budget.compact_chat_history.
+    """
+    from langchain_core.messages import AIMessage, HumanMessage, messages_to_dict
+
+    state[key] = state.get(key, []) + messages_to_dict([HumanMessage(content=user_message), AIMessage(content=ai_message)])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """
+    Return the process-wide session store, using the backend named by SESSION_BACKEND.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if SESSION_BACKEND not in BACKENDS:
+                    raise ValueError(f"Unknown SESSION_BACKEND: {SESSION_BACKEND}. Available: {', '.join(BACKENDS)}")
+                _store = SessionStore(BACKENDS[SESSION_BACKEND]())
+    return _store
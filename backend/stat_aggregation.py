@@ -0,0 +1,114 @@
+import warnings
+
+import numpy as np
+
+# Per-game statistics returned by api-nba-v1 /players/statistics
+STAT_FIELDS = [
+    'points', 'fgm', 'fga', 'fgp', 'fta', 'ftp', 'tpm', 'tpa', 'tpp',
+    'offReb', 'defReb', 'totReb', 'assists', 'pFouls', 'steals', 'turnovers', 'blocks'
+]
+
+# Shooting percentages, sent as strings such as "45.5" or "45.5%"
+PERCENT_FIELDS = {'fgp': ('fgm', 'fga'), 'ftp': ('ftm', 'fta'), 'tpp': ('tpm', 'tpa')}
+
+# Counting statistics, summed for totals and scaled for per-36
+COUNTING_FIELDS = [field for field in STAT_FIELDS if field not in PERCENT_FIELDS]
+
+
+def to_float_array(values, missing=np.nan):
+    """
+    Convert a column of API values (numbers, numeric strings, "45.5%", None) to floats in bulk.
+
+    Args:
+        values: The raw column values
+        missing: Value used for None, empty and unparsable entries
+
+    Returns:
+        np.ndarray: float64 array of the same length
+    """
+    text = np.char.strip(np.char.replace(np.asarray(values, dtype=object).astype(str), '%', ''))
+    blank = np.isin(text, ['', 'None', 'nan', '-'])
+    text[blank] = 'nan'
+    try:
+        result = text.astype(np.float64)
+    except ValueError:
+        # Rare malformed entries: fall back to converting them one by one
+        result = np.array([_to_float(value) for value in text], dtype=np.float64)
+    result[np.isnan(result)] = missing
+    return result
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def to_minutes_array(values):
+    """
+    Convert "min" values such as "34", "34:12" or None to minutes as floats (missing is 0).
+    """
+    text = np.asarray(values, dtype=object).astype(str)
+    parts = np.char.partition(text, ':')
+    minutes = to_float_array(parts[:, 0], missing=0.0)
+    seconds = to_float_array(parts[:, 2], missing=0.0)
+    return minutes + seconds / 60.0
+
+
+def _round(array):
+    return {field: round(float(value), 2) for field, value in array.items() if not np.isnan(value)}
+
+
+def aggregate_games(games):
+    """
+    Aggregate per-game statistics: per-game averages, medians, totals and per-36.
+
+    Each statistic is converted to a float column once and the aggregates are
+    computed with NumPy reductions over the whole column. Averages keep the
+    semantics of the old pandas path: missing percentages count as 0, other
+    missing values are skipped.
+
+    Args:
+        games: Game rows from the /players/statistics response
+
+    Returns:
+        dict: games and minutes played, plus averages, medians, totals and
+              per_36 dictionaries keyed by statistic
+    """
+    if not games:
+        return {"games": 0, "minutes": 0.0, "averages": {}, "medians": {}, "totals": {}, "per_36": {}}
+
+    columns = {}
+    for field in STAT_FIELDS + ['ftm']:
+        values = [game.get(field) for game in games]
+        columns[field] = to_float_array(values, missing=0.0 if field in PERCENT_FIELDS else np.nan)
+    minutes = to_minutes_array([game.get('min') for game in games])
+
+    matrix = np.vstack([columns[field] for field in STAT_FIELDS])
+    with warnings.catch_warnings():
+        # All-missing columns give NaN, which _round drops
+        warnings.simplefilter('ignore', RuntimeWarning)
+        averages = np.nanmean(matrix, axis=1)
+        medians = np.nanmedian(matrix, axis=1)
+
+    counting = np.vstack([columns[field] for field in COUNTING_FIELDS + ['ftm']])
+    totals = np.nansum(counting, axis=1)
+    total_minutes = float(minutes.sum())
+
+    totals_by_field = dict(zip(COUNTING_FIELDS + ['ftm'], totals))
+    for field, (made, attempted) in PERCENT_FIELDS.items():
+        attempts = totals_by_field[attempted]
+        totals_by_field[field] = totals_by_field[made] / attempts * 100 if attempts else 0.0
+    per_36 = {}
+    if total_minutes > 0:
+        per_36 = dict(zip(COUNTING_FIELDS, totals[:len(COUNTING_FIELDS)] * 36.0 / total_minutes))
+
+    return {
+        "games": len(games),
+        "minutes": round(total_minutes, 2),
+        "averages": _round(dict(zip(STAT_FIELDS, averages))),
+        "medians": _round(dict(zip(STAT_FIELDS, medians))),
+        "totals": _round(totals_by_field),
+        "per_36": _round(per_36),
+    }
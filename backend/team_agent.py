@@ -1,11 +1,9 @@
-from langchain.agents import AgentExecutor, create_openai_functions_agent
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.tools import tool
-from langchain.memory import ConversationBufferMemory
 import sys
 import os
 import json
+import logging
 from dotenv import load_dotenv
 
 # Import budget configuration
@@ -15,14 +13,19 @@ from config.budget_config import DEFAULT_BUDGET, MIN_BUDGET
 # Load environment variables from .env file
 load_dotenv()
 
-# Get API key from environment
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY environment variable not set. Please set it in your .env file.")
-
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from user_budget import collection, get_top_5_players_from_rank, calculate_remaining_budget
+from user_budget import get_top_5_players_from_rank, calculate_remaining_budget
+from user_budget import get_next_available_rank as find_next_available_rank
+from user_budget import optimize_team
+from session_store import load_chat_history, save_chat_turn, summary_key
+from history_budget import HistoryBudget, compact_chat_history
+from tool_timing import ToolTimingHandler
+from tracing import span
+from registry import register
+from config.history_config import AGENT_HISTORY_MAX_TOKENS
+
+logger = logging.getLogger(__name__)
 
 @tool
 def convert_player_to_button_format(player_data) -> str:
@@ -69,16 +72,9 @@ def get_five_players_salary_tool(rank) -> str:
     # Create the JSON response structure
     player_list = []
     for player in players:
-        # Extract salary as a number (removing $, M, and commas)
-        salary_str = player.get('2024/25', '0').replace('$', '').replace('M', '').replace(',', '')
-        try:
-            salary = float(salary_str)
-        except ValueError:
-            salary = 0
-            
         player_info = {
             "name": player.get('name', ''),
-            "salary": salary,
+            "salary": player.get('salary_value') or 0,
             "rank": player.get('rank', ''),
             "formatted_salary": player.get('2024/25', '$0') 
         }
@@ -126,32 +122,7 @@ def get_next_available_rank(current_budget, current_rank=1) -> int:
     Returns:
         int: The next rank number where at least one player's salary is within budget
     """
-    try:
-        while True:
-            rank_str = f"{current_rank}."
-            players = collection.find(
-                {"rank": rank_str},
-                {"_id": 0, "2024/25": 1}
-            )
-
-            # Convert salaries to float and filter out missing/bad data
-            salaries = []
-            for player in players:
-                salary_str = player.get("2024/25", "").replace("$", "").replace("M", "").replace(",", "")
-                try:
-                    salary = float(salary_str)
-                    salaries.append(salary)
-                except ValueError:
-                    continue
-
-            if salaries and min(salaries) <= current_budget:
-                return current_rank
-
-            current_rank += 1
-
-    except Exception as e:
-        print(f"Error finding next available rank: {str(e)}")
-        return 1
+    return find_next_available_rank(float(current_budget), int(current_rank))
 
 
 @tool
@@ -220,20 +191,43 @@ def check_budget_strategy(current_budget, team_size=0, target_team_size=8) -> st
         return summary
             
     except Exception as e:
-        print(f"Error in budget strategy check: {str(e)}")
+        logger.warning("Error in budget strategy check: %s", e)
         return f"Error checking budget. Recommend rank: 101."
 
 
+@tool
+def optimize_roster_tool(budget: float = DEFAULT_BUDGET, roster_size: int = 8, locked_players: str = "") -> str:
+    """
+    Build the best full roster that fits the budget in one step.
+
+    Args:
+        budget: The total budget for the roster, defaults to the configured DEFAULT_BUDGET
+        roster_size: Number of players on the roster, including locked players
+        locked_players: Comma-separated names of players already picked that must stay on the roster
+
+    Returns:
+        A JSON string with the chosen players, total salary and remaining budget
+    """
+    locked = [name.strip() for name in locked_players.split(",") if name.strip()]
+    try:
+        result = optimize_team(budget=budget, roster_size=roster_size, locked_players=locked)
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
+    return json.dumps(result, ensure_ascii=False)
+
+
 # Create the tools list
 tools = [
     get_five_players_salary_tool,
     calculate_remaining_budget_tool,
     get_next_available_rank,
-    check_budget_strategy
+    check_budget_strategy,
+    optimize_roster_tool
 ]
 
-# Create consistent memory configuration
-memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+# Key of this agent's memory in the session state, and its token budget
+MEMORY_KEY = "team_agent_history"
+history_budget = HistoryBudget(AGENT_HISTORY_MAX_TOKENS)
 
 prompt = ChatPromptTemplate.from_messages([
     ("system", """You are an NBA team-building assistant. Keep responses clear and concise.
@@ -277,6 +271,9 @@ Budget: ${{current_budget:,.0f}} remaining ({{budget_percentage_remaining:.1f}}%
 Budget tier: {{budget_tier}} (rank range: {{rank_range}})
 Recommended rank: {{appropriate_rank}}
 
+If the user asks for a complete team or roster at once, use optimize_roster_tool with the budget,
+team size and any already picked players, and list every player it returns.
+
 NEVER make up player information. Always use get_five_players_salary_tool.
 NEVER use [Assistant to=functions.xyz] format in your responses.
     """),
@@ -285,36 +282,58 @@ NEVER use [Assistant to=functions.xyz] format in your responses.
     MessagesPlaceholder(variable_name="agent_scratchpad"),
 ])
 
-# Create the agent and executor with updated memory approach
-llm = ChatOpenAI(temperature=0, model="gpt-4")
-agent = create_openai_functions_agent(llm, tools, prompt)
-
-# Use the memory with consistent configuration
-agent_executor = AgentExecutor(
-    agent=agent, 
-    tools=tools, 
-    verbose=True, 
-    memory=memory,
-    handle_parsing_errors=True,  # Handle parsing errors
-    max_iterations=5,  # Limit maximum iterations to prevent loops
-)
-
-def process_user_message(message):
+def _build_agent_executor():
+    # Imported here, the OpenAI chat model and agent machinery are slow to import
+    from langchain.agents import AgentExecutor, create_openai_functions_agent
+    from langchain_openai import ChatOpenAI
+
+    # Get API key from environment
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError("OPENAI_API_KEY environment variable not set. Please set it in your .env file.")
+
+    # Create the agent and executor, chat history comes from the session store
+    llm = ChatOpenAI(temperature=0, model="gpt-4")
+    agent = create_openai_functions_agent(llm, tools, prompt)
+
+    # Chat history is passed in with each input
+    return AgentExecutor(
+        agent=agent, 
+        tools=tools, 
+        verbose=logger.isEnabledFor(logging.DEBUG), 
+        handle_parsing_errors=True,  # Handle parsing errors
+        max_iterations=5,  # Limit maximum iterations to prevent loops
+    )
+
+# Built on first use or by the startup warm-up
+get_agent_executor = register("team_agent_executor", _build_agent_executor)
+
+def process_user_message(message, session=None, usage=None):
     """
     Process a user message through the NBA player information assistant.
     
     Args:
         message: The user's input message/query
+        session: Session state dict holding this user's chat history, updated in place
+        usage: Optional dict that receives the agent's prompt token counts
         
     Returns:
         The agent's response as a string
     """
+    session = session if session is not None else {}
     try:
         # Add a simple reminder to use the correct format and tools
         enhanced_message = message + "\n\nReminder: Use get_five_players_salary_tool for real player data."
         
         # Pass only the input message as expected by the executor
-        response = agent_executor.invoke({"input": enhanced_message})
+        with span("agent", "team_agent") as agent_span:
+            timing = ToolTimingHandler()
+            response = get_agent_executor().invoke({
+                "input": enhanced_message,
+                "chat_history": load_chat_history(session, MEMORY_KEY)
+            }, config={"callbacks": [timing]})
+            summary = timing.summary()
+            agent_span.set(prompt_tokens=summary["prompt_tokens"], completion_tokens=summary["completion_tokens"],
+                           llm_calls=summary["llm_calls"], tool_calls=summary["calls"])
         
         # Get the output and clean up any function call syntax
         output = response["output"]
@@ -326,30 +345,41 @@ def process_user_message(message):
         if any(pattern in output for pattern in ["Player A", "Player B", "fictitious player"]):
             output = "I need to provide real NBA player data. Let me correct that.\n\n" + output
             
+        save_chat_turn(session, MEMORY_KEY, enhanced_message, output)
+        history_tokens = compact_chat_history(session, MEMORY_KEY, history_budget)
+        logger.debug("team agent: %s prompt tokens over %s LLM calls, history now %s tokens",
+                     summary["prompt_tokens"], summary["llm_calls"], history_tokens)
+        if usage is not None:
+            usage["team_agent"] = {
+                "prompt_tokens": summary["prompt_tokens"],
+                "completion_tokens": summary["completion_tokens"],
+                "llm_calls": summary["llm_calls"],
+                "history_tokens": history_tokens,
+            }
         return output
     except Exception as e:
+        logger.exception("Team agent failed")
         return f"An error occurred: {str(e)}"
 
-def agent_function_calling(user_query):
+def agent_function_calling(user_query, session=None, usage=None):
     # Get response from the agent
-    response = process_user_message(user_query)
+    response = process_user_message(user_query, session=session, usage=usage)
     
     # Final check for incorrect formats and made-up data
     if "[" in response and "]" in response:
         response = response.replace("[", "").replace("]", "")
     
-    print("\nAssistant:", response)
-    print("\n" + "-"*50 + "\n")
+    logger.debug("Team agent response: %s", response)
     return response
 
 
 
-def clear_team_agent_history():
+def clear_team_agent_history(session):
     """
-    Clear the agent's conversation history.
+    Clear the agent's conversation history in a session.
     """
-    global memory
-    memory.clear()
+    session.pop(MEMORY_KEY, None)
+    session.pop(summary_key(MEMORY_KEY), None)
     return "Chat history cleared"
 
 
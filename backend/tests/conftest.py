@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests run offline: external services are served from the recorded fixtures (see replay.py)
+os.environ.setdefault("REPLAY_MODE", "replay")
+os.environ.setdefault("WARMUP_ENABLED", "0")
+
+# Tests import the backend modules the way the app does, from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,145 @@
+import pytest
+
+import answer_cache as answer_cache_module
+import salary_table as salary_table_module
+from answer_cache import SemanticAnswerCache, query_signature, signatures_compatible
+from salary_table import SalaryTable
+
+NAME_TOKENS = {"lebron", "james", "stephen", "curry"}
+
+
+class SameVectorEmbeddings:
+    """
+    Embeds every query to the same vector, so only the signature decides a hit.
+    """
+
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0]
+
+
+def make_cache(**kwargs):
+    kwargs.setdefault("ttls", {"player_details": 60, "recommendation": 60, "news": 60})
+    return SemanticAnswerCache(SameVectorEmbeddings(), threshold=0.9, name_tokens=lambda: NAME_TOKENS, **kwargs)
+
+
+def test_signature_holds_names_and_numbers():
+    assert query_signature("LeBron James salary in 2025/26?", NAME_TOKENS) == (
+        frozenset({"lebron", "james"}), frozenset({"2025", "26"})
+    )
+
+
+@pytest.mark.parametrize("stored, query", [
+    ("What is LeBron James's salary?", "What is Stephen Curry's salary?"),
+    ("What is LeBron's salary?", "What is Curry’s salary?"),
+    ("What is LeBron James's salary?", "What is LeBron James's salary in 2026?"),
+    ("What is LeBron James's salary?", "What is the highest salary?"),
+    ("Build a team with 200000000", "Build a team with 150000000"),
+    ("Compare LeBron and Curry", "Compare LeBron and James"),
+])
+def test_near_duplicates_with_other_players_or_numbers_miss(stored, query):
+    cache = make_cache()
+    cache.store("player_details", stored, "cached answer", latency_ms=100)
+    assert cache.lookup("player_details", query)[0] is None
+    assert cache.lookup("player_details", stored)[0] == "cached answer"
+
+
+def test_partial_name_of_the_same_player_hits():
+    cache = make_cache()
+    cache.store("player_details", "What is LeBron James's salary?", "cached answer", latency_ms=100)
+    assert cache.lookup("player_details", "what is lebron's salary")[0] == "cached answer"
+    assert signatures_compatible(
+        query_signature("LeBron", NAME_TOKENS), query_signature("LeBron James", NAME_TOKENS)
+    )
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache_module.time, "time", lambda: now[0])
+    cache = make_cache(ttls={"player_details": 60, "news": 10})
+    cache.store("player_details", "top salary", "salary answer", latency_ms=10)
+    cache.store("news", "latest trade news", "news answer", latency_ms=10)
+
+    now[0] += 30
+    assert cache.lookup("player_details", "top salary")[0] == "salary answer"
+    assert cache.lookup("news", "latest trade news")[0] is None
+    assert cache.stats()["entries"] == {"player_details": 1, "news": 0}
+
+    now[0] += 30
+    assert cache.lookup("player_details", "top salary")[0] is None
+
+
+def test_oldest_entries_are_evicted_past_capacity():
+    cache = make_cache(max_entries=2)
+    for season in ("2024", "2025", "2026"):
+        cache.store("player_details", f"top salary {season}", f"answer {season}", latency_ms=10)
+
+    assert cache.stats()["entries"] == {"player_details": 2}
+    assert cache.lookup("player_details", "top salary 2024")[0] is None
+    assert cache.lookup("player_details", "top salary 2025")[0] == "answer 2025"
+    assert cache.lookup("player_details", "top salary 2026")[0] == "answer 2026"
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    import player_repository
+    import query
+    import user_budget
+
+    data = {"players": [{"name": "LeBron James", "rank_value": 1, "salary_value": 50}], "version": 1}
+    monkeypatch.setattr(salary_table_module, "get_data_version", lambda collection: data["version"])
+    monkeypatch.setattr(salary_table_module, "find", lambda collection, *args, **kwargs: list(data["players"]))
+    table = SalaryTable(get_collection=lambda: None, refresh_interval=0)
+    table.refresh()
+
+    monkeypatch.setattr(user_budget, "salary_table", table)
+    monkeypatch.setattr(player_repository, "player_name_tokens", lambda: NAME_TOKENS)
+    monkeypatch.setattr(query, "get_shared_embedding", lambda: SameVectorEmbeddings())
+    monkeypatch.setattr(answer_cache_module, "ANSWER_CACHE_ENABLED", True)
+    monkeypatch.setattr(answer_cache_module, "_answer_cache", None)
+    return answer_cache_module.get_answer_cache(), data
+
+
+def test_salary_reload_invalidates_player_answers(shared_cache):
+    cache, data = shared_cache
+    cache.store("player_details", "LeBron James salary", "old salary", latency_ms=10)
+    cache.store("recommendation", "best team for 200000000", "old team", latency_ms=10)
+    cache.store("news", "latest news", "news answer", latency_ms=10)
+    assert cache.lookup("player_details", "LeBron James salary")[0] == "old salary"
+
+    data["version"] = 2
+    assert cache.lookup("player_details", "LeBron James salary")[0] is None
+    assert cache.lookup("recommendation", "best team for 200000000")[0] is None
+    assert cache.stats()["entries"]["news"] == 1
+
+
+class FakeRetriever:
+    def __init__(self):
+        self.changed = False
+        self.hooks = []
+
+    def add_reload_hook(self, hook):
+        self.hooks.append(hook)
+
+    def reload_if_changed(self):
+        if self.changed:
+            self.changed = False
+            for hook in self.hooks:
+                hook(self)
+
+
+def test_news_reload_invalidates_news_answers(shared_cache, monkeypatch):
+    import query
+
+    cache, _ = shared_cache
+    retriever = FakeRetriever()
+    monkeypatch.setattr(query, "get_news_retriever", lambda create=True: retriever)
+    cache.store("news", "latest trade news", "old news", latency_ms=10)
+    cache.store("player_details", "LeBron James salary", "salary", latency_ms=10)
+    assert cache.lookup("news", "latest trade news")[0] == "old news"
+    assert len(retriever.hooks) == 1
+
+    retriever.changed = True
+    assert cache.lookup("news", "latest trade news")[0] is None
+    assert cache.lookup("news", "latest trade news")[0] is None
+    assert len(retriever.hooks) == 1
+    assert cache.stats()["entries"]["player_details"] == 1
@@ -0,0 +1,14 @@
+import pytest
+
+app_module = pytest.importorskip("app")
+
+
+def test_unmatched_routes_share_one_metric_label():
+    client = app_module.app.test_client()
+    for path in ("/wp-login.php", "/.env", "/admin/config.php"):
+        assert client.get(path).status_code == 404
+
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert 'kind="route",name="unmatched"' in metrics
+    for path in ("wp-login", ".env", "admin/config"):
+        assert path not in metrics
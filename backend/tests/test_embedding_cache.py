@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+from embedding_cache import CachedEmbeddings, embedding_key
+
+
+class FakeEmbedder:
+    model = "fake-embedding"
+
+    def __init__(self, dimensions=8):
+        self.dimensions = dimensions
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text))] * self.dimensions for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def disk_bytes_in_table(cache):
+    return cache._db.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "embeddings.sqlite3")
+
+
+def test_only_missing_texts_are_embedded_in_one_batch(path):
+    embedder = FakeEmbedder()
+    cache = CachedEmbeddings(embedder, path)
+    cache.embed_documents(["a", "bb"])
+    vectors = cache.embed_documents(["a", "ccc", "bb", "dddd"])
+
+    assert embedder.calls == [["a", "bb"], ["ccc", "dddd"]]
+    assert vectors[2] == [2.0] * 8
+    stats = cache.stats()
+    assert (stats["hits_memory"], stats["hits_disk"], stats["misses"]) == (2, 0, 4)
+
+
+def test_vectors_are_read_back_from_disk(path):
+    CachedEmbeddings(FakeEmbedder(), path).embed_documents(["a", "bb"])
+
+    embedder = FakeEmbedder()
+    cache = CachedEmbeddings(embedder, path)
+    assert cache.embed_query("bb") == [2.0] * 8
+    assert embedder.calls == []
+    assert cache.stats()["hits_disk"] == 1
+
+
+def test_cache_is_keyed_by_model(path):
+    CachedEmbeddings(FakeEmbedder(), path).embed_query("a")
+    embedder = FakeEmbedder()
+    CachedEmbeddings(embedder, path, model="other-model").embed_query("a")
+    assert embedder.calls == [["a"]]
+    assert embedding_key("fake-embedding", "a") != embedding_key("other-model", "a")
+
+
+def test_replacing_a_stored_vector_does_not_grow_the_byte_count(path):
+    cache = CachedEmbeddings(FakeEmbedder(), path)
+    cache.embed_documents(["a", "bb"])
+    # Another worker, or a concurrent miss of the same text, stores the same keys again
+    other = CachedEmbeddings(FakeEmbedder(), path)
+    other._store_on_disk([(embedding_key("fake-embedding", "a"), [1.0] * 8)] * 2)
+
+    assert other._disk_bytes == disk_bytes_in_table(other) == 2 * 8 * 4
+    with cache._lock:
+        cache._store_on_disk([(embedding_key("fake-embedding", "bb"), [2.0] * 8)])
+    assert cache._disk_bytes == disk_bytes_in_table(cache) == 2 * 8 * 4
+
+
+def test_least_recently_used_vectors_are_evicted_over_the_disk_cap(path):
+    vector_bytes = 8 * 4
+    cache = CachedEmbeddings(FakeEmbedder(), path, max_memory_items=1, max_disk_bytes=10 * vector_bytes)
+    texts = [f"text {i}" for i in range(10)]
+    for text in texts:
+        cache.embed_query(text)
+    assert cache.stats()["disk_bytes"] == 10 * vector_bytes
+    cache.embed_query(texts[0])  # read back from disk, now the most recently used
+
+    cache.embed_query("one more")
+    assert cache._disk_bytes == disk_bytes_in_table(cache) <= 9 * vector_bytes
+    stored = {key for key, in cache._db.execute("SELECT key FROM embeddings")}
+    assert embedding_key("fake-embedding", texts[0]) in stored
+    assert embedding_key("fake-embedding", texts[1]) not in stored
+
+
+def test_counters_add_up_under_concurrent_lookups(path):
+    cache = CachedEmbeddings(FakeEmbedder(), path, max_memory_items=5)
+    texts = [f"text {i}" for i in range(10)]
+
+    def run():
+        for _ in range(20):
+            cache.embed_documents(texts)
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats["hits_memory"] + stats["hits_disk"] + stats["misses"] == 6 * 20 * len(texts)
+    assert stats["memory_items"] == 5
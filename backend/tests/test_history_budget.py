@@ -0,0 +1,67 @@
+import pytest
+
+import history_budget
+from history_budget import HistoryBudget, count_message_tokens, count_tokens, truncate_text
+
+
+@pytest.fixture(autouse=True)
+def estimated_token_counts(monkeypatch):
+    # The estimate used when tiktoken's BPE file can't be downloaded
+    monkeypatch.setattr(history_budget, "_encoding", False)
+
+
+def fail_summarizer(summary, messages):
+    raise AssertionError("the history fits, nothing should be summarized")
+
+
+def long_text(words):
+    return " ".join(f"word{i}" for i in range(words))
+
+
+def test_truncated_text_fits_the_budget():
+    truncated = truncate_text(long_text(2000), 600)
+    assert count_tokens(truncated) <= 600
+    assert truncated.startswith("word0 ")
+    assert truncated.endswith("word1999")
+    assert "tokens truncated" in truncated
+
+
+def test_truncating_twice_changes_nothing():
+    truncated = truncate_text(long_text(2000), 600)
+    assert truncate_text(truncated, 600) == truncated
+
+
+def test_compacting_twice_is_stable():
+    budget = HistoryBudget(max_tokens=10000, keep_recent=2, max_message_tokens=600, summarizer=fail_summarizer)
+    messages = [
+        {"role": "user", "content": "LeBron stats"},
+        {"role": "assistant", "content": long_text(3000)},
+        {"role": "user", "content": "and Curry?"},
+        {"role": "assistant", "content": long_text(2500)},
+    ]
+
+    once, summary = budget.compact(messages)
+    twice, summary_twice = budget.compact(once, summary)
+    assert twice == once
+    assert summary_twice == summary
+    assert count_tokens(once[1]["content"]) <= 600
+    # The latest message is kept whole
+    assert once[-1] == messages[-1]
+
+
+def test_old_messages_are_folded_into_the_summary():
+    summaries = []
+
+    def summarizer(summary, messages):
+        summaries.append(messages)
+        return "summary"
+
+    budget = HistoryBudget(max_tokens=400, keep_recent=2, max_message_tokens=600, summarizer=summarizer)
+    messages = [{"role": role, "content": long_text(100)} for role in ("user", "assistant") * 3]
+    compacted, summary = budget.compact(messages)
+
+    assert summary == "summary"
+    assert compacted == messages[-len(compacted):]
+    assert compacted[0]["role"] == "user"
+    assert count_message_tokens(compacted) <= 400
+    assert summaries[0] == messages[:len(messages) - len(compacted)]
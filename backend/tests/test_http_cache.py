@@ -0,0 +1,147 @@
+import pytest
+from flask import Flask, jsonify, request
+
+import http_cache
+import salary_table as salary_table_module
+from http_cache import cached_by_data_version, response_cache
+from salary_table import EMPTY_SNAPSHOT
+
+
+@pytest.fixture
+def counted_app(monkeypatch):
+    """
+    A one-route app whose data version and body can be changed, counting view calls.
+    """
+    state = {"version": 1, "body": "first", "calls": 0, "no_store": False}
+    app = Flask(__name__)
+
+    @app.route("/data")
+    @cached_by_data_version(lambda: state["version"])
+    def data():
+        state["calls"] += 1
+        if request.args.get("missing"):
+            return jsonify({"error": "not found"}), 404
+        if request.args.get("fail"):
+            return jsonify({"error": "boom"}), 500
+        response = jsonify({"body": state["body"], "q": request.args.getlist("q")})
+        if state["no_store"]:
+            response.headers["Cache-Control"] = "no-store"
+        return response
+
+    monkeypatch.setattr(http_cache, "HTTP_CACHE_ENABLED", True)
+    response_cache.clear()
+    yield app.test_client(), state
+    response_cache.clear()
+
+
+def test_repeat_requests_are_served_from_the_cache(counted_app):
+    client, state = counted_app
+    first = client.get("/data?q=a")
+    second = client.get("/data?q=a")
+    assert first.status_code == second.status_code == 200
+    assert first.get_data() == second.get_data()
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.headers["X-Data-Version"] == "1"
+    assert "max-age" in first.headers["Cache-Control"]
+    assert state["calls"] == 1
+
+    client.get("/data?q=b")
+    assert state["calls"] == 2
+
+
+def test_if_none_match_answers_304_without_running_the_view(counted_app):
+    client, state = counted_app
+    etag = client.get("/data").headers["ETag"]
+    before = response_cache.stats()["not_modified"]
+
+    response = client.get("/data", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert state["calls"] == 1
+    assert response_cache.stats()["not_modified"] == before + 1
+
+
+def test_etag_changes_with_the_data_version(counted_app):
+    client, state = counted_app
+    etag = client.get("/data").headers["ETag"]
+
+    state["version"] = 2
+    response = client.get("/data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.headers["X-Data-Version"] == "2"
+    assert state["calls"] == 2
+
+    state["version"], state["body"] = 3, "second"
+    response = client.get("/data")
+    assert response.get_json()["body"] == "second"
+
+
+def test_no_store_and_error_responses_are_not_cached(counted_app):
+    client, state = counted_app
+    state["no_store"] = True
+    for _ in range(2):
+        response = client.get("/data")
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+    assert state["calls"] == 2
+
+    client.get("/data?fail=1")
+    client.get("/data?fail=1")
+    assert state["calls"] == 4
+
+    client.get("/data?missing=1")
+    assert client.get("/data?missing=1").status_code == 404
+    assert state["calls"] == 5
+
+
+app_module = pytest.importorskip("app")
+
+
+@pytest.fixture
+def salary_client(monkeypatch):
+    import user_budget
+
+    data = {"version": 1, "players": [
+        {"name": f"Player {rank}", "rank": f"{rank}.", "rank_value": rank,
+         "salary_value": 10 ** 6, "2024/25": "$1,000,000"}
+        for rank in range(1, 8)
+    ]}
+    monkeypatch.setattr(salary_table_module, "get_data_version", lambda collection: data["version"])
+    monkeypatch.setattr(salary_table_module, "find", lambda collection, *args, **kwargs: list(data["players"]))
+    monkeypatch.setattr(user_budget.salary_table, "refresh_interval", 0)
+    monkeypatch.setattr(user_budget.salary_table, "snapshot", EMPTY_SNAPSHOT)
+    monkeypatch.setattr(http_cache, "HTTP_CACHE_ENABLED", True)
+    response_cache.clear()
+    yield app_module.app.test_client(), data
+    response_cache.clear()
+
+
+def test_salary_ingest_changes_the_available_players_etag(salary_client):
+    client, data = salary_client
+    first = client.get("/api/available-players?rank=1")
+    assert first.status_code == 200
+    assert client.get("/api/available-players?rank=1", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    data["version"] = 2
+    response = client.get("/api/available-players?rank=1", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first.headers["ETag"]
+
+
+def test_available_players_fallback_is_not_cached(salary_client, monkeypatch):
+    client, _ = salary_client
+    calls = []
+
+    def failing(rank):
+        calls.append(rank)
+        raise RuntimeError("salary lookup failed")
+
+    monkeypatch.setattr(app_module, "get_top_5_players_from_rank", failing)
+    for _ in range(2):
+        response = client.get("/api/available-players?rank=1")
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == "no-store"
+        assert "ETag" not in response.headers
+    assert len(calls) == 2
+    assert response_cache.stats()["entries"] == 0
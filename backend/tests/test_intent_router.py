@@ -0,0 +1,105 @@
+import pytest
+
+from intent_router import BUDGET, OTHER, RANK, SALARY, IntentRouter
+from salary_schema import normalize_name
+
+PLAYERS = [
+    {"name": "Stephen Curry", "rank": "1", "2024/25": "$55,761,216", "2025/26": "$59,606,817"},
+    {"name": "LeBron James", "rank": "3", "2024/25": "$48,728,845", "2025/26": "$52,627,153"},
+    {"name": "Seth Curry", "rank": "300", "2024/25": "$2,087,519"},
+    {"name": "Kobe Bufkin", "rank": "250", "2024/25": "$4,289,160"},
+    {"name": "Kobe Brown", "rank": "280", "2024/25": "$2,533,920"},
+]
+
+
+def find_players(name):
+    tokens = set(normalize_name(name).split())
+    return [player for player in PLAYERS if tokens & set(normalize_name(player["name"]).split())]
+
+
+@pytest.fixture
+def router():
+    return IntentRouter(
+        name_tokens=lambda: {token for player in PLAYERS for token in normalize_name(player["name"]).split()},
+        find_players=find_players,
+        players_from_rank=lambda rank: PLAYERS[rank - 1:],
+        players_within_budget=lambda budget, start_rank: [PLAYERS[3], PLAYERS[4]],
+    )
+
+
+def test_current_season_salary_is_answered(router):
+    decision = router.route("What is LeBron James salary?")
+    assert decision["intent"] == SALARY
+    assert "$48,728,845 in 2024/25" in decision["answer"]
+
+
+def test_explicit_known_season_is_answered(router):
+    decision = router.route("What is Stephen Curry salary in 2025/26?")
+    assert "$59,606,817 in 2025/26" in decision["answer"]
+
+
+@pytest.mark.parametrize("query", [
+    "How much will Stephen Curry make next season?",
+    "How much did Stephen Curry make last season?",
+    "What was LeBron James salary in 2020?",
+    "What is Curry salary in 2027",
+    "What is LeBron James salary in 2031/32?",
+    "What are LeBron James career earnings?",
+])
+def test_other_seasons_go_to_the_agent(router, query):
+    assert router.route(query)["answer"] is None
+
+
+def test_ambiguous_first_name_goes_to_the_agent(router):
+    assert router.route("what did Kobe earn")["answer"] is None
+
+
+def test_ambiguous_last_name_goes_to_the_agent(router):
+    assert router.route("What is Curry salary?")["answer"] is None
+
+
+def test_exact_full_name_is_answered(router):
+    decision = router.route("What is Seth Curry salary?")
+    assert "**Seth Curry**" in decision["answer"]
+    assert "Stephen" not in decision["answer"]
+
+
+def test_yes_no_comparison_goes_to_the_agent(router):
+    decision = router.route("Is LeBron salary under 50 million?")
+    assert decision["intent"] == OTHER
+    assert decision["answer"] is None
+
+
+def test_budget_rule_skips_queries_naming_a_player(router):
+    intent, _, _ = router.classify("LeBron James salary for 50 million")
+    assert intent != BUDGET
+
+
+def test_budget_query_without_a_player(router):
+    decision = router.route("Which players can I get for 30 million?")
+    assert decision["intent"] == BUDGET
+    assert "Kobe Bufkin" in decision["answer"]
+
+
+@pytest.mark.parametrize("query", [
+    "Who is the #1 pick in the 2024 draft?",
+    "who was ranked 3 in MVP voting",
+    "Which team is number 1 in the west?",
+    "What is Curry's jersey number 30?",
+    "top 5 players at rank 3",
+])
+def test_ranks_without_salary_context_go_to_the_agent(router, query):
+    decision = router.route(query)
+    assert decision["intent"] != RANK or decision["answer"] is None
+    assert decision["answer"] is None
+
+
+@pytest.mark.parametrize("query", [
+    "Who is ranked 2 on the salary list?",
+    "Show the highest paid players from rank 2",
+    "who is number 2 in salaries",
+])
+def test_salary_ranks_are_answered(router, query):
+    decision = router.route(query)
+    assert decision["intent"] == RANK
+    assert "LeBron James" in decision["answer"]
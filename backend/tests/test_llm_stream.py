@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+llm = pytest.importorskip("llm")
+from session_store import InMemorySessionBackend, SessionLockTimeout, SessionStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = SessionStore(InMemorySessionBackend(ttl=60), lock_timeout=5)
+    monkeypatch.setattr(llm, "get_session_store", lambda: store)
+    monkeypatch.setattr(llm, "OpenAI", lambda **kwargs: None)
+    monkeypatch.setattr(llm, "_lookup_cached_answer", lambda query, options: (None, None))
+    return store
+
+
+def test_disconnect_waits_for_the_agent_before_saving_the_session(store, monkeypatch):
+    release = threading.Event()
+
+    def first_model(user_query, response_options, session, on_tool_event=None, usage=None):
+        on_tool_event({"event": "tool_start", "tool": "get_player_salary"})
+        release.wait(5)
+        session["agent_history"] = ["written after the client left"]
+        return None
+
+    monkeypatch.setattr(llm, "_run_first_model", first_model)
+    stream = llm.main_model_stream("latest news", "news", session_id="client")
+    assert next(stream)["event"] == "status"
+    assert next(stream)["event"] == "tool_start"
+
+    # The client disconnects while the agent is still running
+    closer = threading.Thread(target=stream.close)
+    closer.start()
+    store.lock_timeout = 0.1
+    with pytest.raises(SessionLockTimeout):
+        with store.session("client"):
+            pass
+
+    release.set()
+    closer.join(5)
+    assert not closer.is_alive()
+    store.lock_timeout = 5
+    with store.session("client") as state:
+        assert state["agent_history"] == ["written after the client left"]
+
+
+def test_empty_result_reports_usage(store, monkeypatch):
+    monkeypatch.setattr(llm, "_run_first_model", lambda *args, **kwargs: None)
+    events = list(llm.main_model_stream("latest news", "news", session_id="client"))
+    assert events[-1]["event"] == "done"
+    assert "usage" in events[-1]
+
+
+def test_clear_conversation_resets_every_history(store):
+    import function_agent
+    import team_agent
+    from session_store import summary_key
+
+    keys = [llm.MAIN_HISTORY_KEY, function_agent.MEMORY_KEY, team_agent.MEMORY_KEY]
+    with store.session("client") as session:
+        for key in keys:
+            session[key] = ["an earlier turn"]
+            session[summary_key(key)] = "a summary"
+        session["unrelated"] = 1
+
+    llm.clear_conversation("client")
+    with store.session("client") as session:
+        assert dict(session) == {"unrelated": 1}
@@ -0,0 +1,114 @@
+import json
+
+import numpy as np
+
+from local_vector_index import HashingEmbeddings, IndexedChunk, LocalVectorIndex, maximal_marginal_relevance
+
+TEXTS = [
+    "LeBron James scores 40 points in Lakers win",
+    "LeBron James leads Lakers past Celtics",
+    "Stephen Curry hits ten threes for Warriors",
+    "Warriors beat Suns behind Curry",
+    "Nikola Jokic records triple double for Nuggets",
+]
+
+
+class Document:
+    def __init__(self, page_content, metadata):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+def make_index():
+    index = LocalVectorIndex(HashingEmbeddings())
+    index.add_documents(
+        [Document(text, {"news_id": f"n{i}"}) for i, text in enumerate(TEXTS)], ids=[f"c{i}" for i in range(len(TEXTS))]
+    )
+    return index
+
+
+def reference_mmr(query_similarity, embeddings, k, lambda_mult):
+    # The textbook loop the vectorized version replaces
+    selected = [int(np.argmax(query_similarity))]
+    while len(selected) < min(k, len(query_similarity)):
+        best, best_score = None, -np.inf
+        for i in range(len(query_similarity)):
+            if i in selected:
+                continue
+            redundancy = max(float(embeddings[i] @ embeddings[j]) for j in selected)
+            score = lambda_mult * query_similarity[i] - (1 - lambda_mult) * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+    return selected
+
+
+def test_search_finds_the_closest_chunks():
+    index = make_index()
+    results = index.similarity_search("Curry Warriors", k=2)
+    assert {chunk.id for chunk in results} == {"c2", "c3"}
+    assert isinstance(results[0], IndexedChunk)
+    assert results[0].metadata["news_id"] in ("n2", "n3")
+
+
+def test_adding_an_existing_id_replaces_it_and_delete_removes_it():
+    index = make_index()
+    index.add_documents([Document("Jokic wins MVP", {"news_id": "n9"})], ids=["c0"])
+    assert len(index) == len(TEXTS)
+    assert index.similarity_search("Jokic MVP", k=1)[0].id == "c0"
+
+    index.delete(["c0", "unknown"])
+    assert len(index) == len(TEXTS) - 1
+    assert "c0" not in {chunk.id for chunk in index.similarity_search("LeBron", k=5)}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = make_index()
+    path = str(tmp_path / "index")
+    index.save(path)
+    loaded = LocalVectorIndex.load_or_create(path, HashingEmbeddings())
+
+    assert loaded.ids == index.ids
+    assert loaded.texts == index.texts
+    assert loaded.metadatas == index.metadatas
+    np.testing.assert_array_equal(loaded.embeddings, index.embeddings)
+    assert [chunk.id for chunk in loaded.max_marginal_relevance_search("Lakers", k=3)] == \
+        [chunk.id for chunk in index.max_marginal_relevance_search("Lakers", k=3)]
+    assert LocalVectorIndex.saved_path(path) == path + ".npz"
+
+
+def test_index_saved_by_an_earlier_version_loads(tmp_path):
+    index = make_index()
+    path = str(tmp_path / "index")
+    np.save(path + ".npy", index.embeddings)
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump({"ids": index.ids, "texts": index.texts, "metadatas": index.metadatas}, f)
+
+    assert LocalVectorIndex.saved_path(path) == path + ".npy"
+    assert LocalVectorIndex.load_or_create(path, HashingEmbeddings()).ids == index.ids
+
+
+def test_missing_index_is_created_empty(tmp_path):
+    index = LocalVectorIndex.load_or_create(str(tmp_path / "index"), HashingEmbeddings())
+    assert len(index) == 0
+    assert index.max_marginal_relevance_search("anything") == []
+
+
+def test_mmr_matches_the_reference_loop():
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        embeddings = rng.normal(size=(30, 16)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        query = rng.normal(size=16).astype(np.float32)
+        similarity = embeddings @ (query / np.linalg.norm(query))
+        for lambda_mult in (0.0, 0.5, 1.0):
+            assert maximal_marginal_relevance(similarity, embeddings, k=6, lambda_mult=lambda_mult) == \
+                reference_mmr(similarity, embeddings, 6, lambda_mult)
+
+
+def test_mmr_prefers_diverse_chunks():
+    index = make_index()
+    relevant = [chunk.id for chunk in index.similarity_search("LeBron James Lakers Curry", k=2)]
+    diverse = [chunk.id for chunk in index.max_marginal_relevance_search("LeBron James Lakers Curry", k=2, lambda_mult=0.3)]
+    assert set(relevant) == {"c0", "c1"}
+    assert diverse[0] in ("c0", "c1") and diverse[1] not in ("c0", "c1")
@@ -0,0 +1,125 @@
+import pytest
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+import http_cache
+import mongo
+from mongo import MongoUnavailable, QueryStats, find, find_one
+
+
+class FakeCursor(list):
+    def sort(self, sort):
+        key, direction = sort[0]
+        return FakeCursor(sorted(self, key=lambda document: document[key], reverse=direction < 0))
+
+    def limit(self, limit):
+        return FakeCursor(self[:limit])
+
+
+class FakeCollection:
+    name = "players"
+
+    def __init__(self, documents=(), error=None):
+        self.documents = list(documents)
+        self.error = error
+        self.calls = []
+
+    def find(self, filter, projection, max_time_ms=None):
+        self.calls.append(("find", max_time_ms))
+        if self.error:
+            raise self.error
+        return FakeCursor(self.documents)
+
+    def find_one(self, filter, projection, max_time_ms=None):
+        self.calls.append(("find_one", max_time_ms))
+        if self.error:
+            raise self.error
+        return self.documents[0] if self.documents else None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    A fresh QueryStats and a monotonic clock the test moves by hand.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(mongo, "query_stats", QueryStats())
+    monkeypatch.setattr(mongo.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_queries_are_timed_under_their_name(clock):
+    collection = FakeCollection([{"rank_value": 2}, {"rank_value": 1}, {"rank_value": 3}])
+    assert find(collection, sort=[("rank_value", 1)], limit=2, name="top") == [{"rank_value": 1}, {"rank_value": 2}]
+    assert find_one(collection) == {"rank_value": 2}
+    assert find_one(collection) == {"rank_value": 2}
+    assert collection.calls == [(operation, mongo.MONGO_QUERY_TIMEOUT_MS) for operation in ("find", "find_one", "find_one")]
+
+    stats = mongo.query_stats.stats()
+    assert stats["available"]
+    assert stats["queries"]["players.top"]["count"] == 1
+    assert stats["queries"]["players.find_one"]["count"] == 2
+    assert stats["queries"]["players.find_one"]["errors"] == 0
+    assert stats["queries"]["players.top"]["max_ms"] >= stats["queries"]["players.top"]["mean_ms"] >= 0
+
+
+def test_record_keeps_count_errors_mean_and_max():
+    stats = QueryStats()
+    for elapsed_ms, error in ((10.0, False), (30.0, True), (20.0, False)):
+        stats.record("players.find", elapsed_ms, error)
+    assert stats.stats()["queries"]["players.find"] == {"count": 3, "errors": 1, "mean_ms": 20.0, "max_ms": 30.0}
+
+
+def test_connection_failure_fails_fast_until_the_cooldown_ends(clock):
+    down = FakeCollection(error=ServerSelectionTimeoutError("no servers"))
+    with pytest.raises(MongoUnavailable):
+        find(down, name="salary_table")
+    assert len(down.calls) == 1
+    assert mongo.query_stats.stats()["queries"]["players.salary_table"]["errors"] == 1
+
+    # During the cooldown no query reaches the server
+    up = FakeCollection([{"rank_value": 1}])
+    clock[0] += mongo.MONGO_UNAVAILABLE_COOLDOWN_SECONDS / 2
+    for _ in range(3):
+        with pytest.raises(MongoUnavailable):
+            find_one(up)
+    assert up.calls == []
+    stats = mongo.query_stats.stats()
+    assert not stats["available"]
+    assert stats["fast_failures"] == 3
+
+    clock[0] += mongo.MONGO_UNAVAILABLE_COOLDOWN_SECONDS
+    assert find_one(up) == {"rank_value": 1}
+    assert mongo.query_stats.stats()["available"]
+
+
+def test_query_errors_do_not_mark_the_server_unavailable(clock):
+    failing = FakeCollection(error=OperationFailure("operation exceeded time limit"))
+    with pytest.raises(OperationFailure):
+        find(failing)
+    assert find(FakeCollection([{"rank_value": 1}])) == [{"rank_value": 1}]
+    stats = mongo.query_stats.stats()
+    assert stats["available"]
+    assert (stats["queries"]["players.find"]["count"], stats["queries"]["players.find"]["errors"]) == (2, 1)
+
+
+app_module = pytest.importorskip("app")
+
+
+def raise_unavailable(*args, **kwargs):
+    raise MongoUnavailable("no servers")
+
+
+def test_app_answers_503_while_mongo_is_unavailable(monkeypatch):
+    import user_budget
+
+    monkeypatch.setattr(http_cache, "HTTP_CACHE_ENABLED", False)
+    monkeypatch.setattr(app_module, "find_players_by_name", raise_unavailable)
+    monkeypatch.setattr(user_budget.salary_table, "all_players", raise_unavailable)
+    client = app_module.app.test_client()
+
+    response = client.get("/api/players?name=James")
+    assert response.status_code == 503
+    assert "unavailable" in response.get_json()["error"]
+
+    response = client.post("/api/team/optimize", json={"budget": 100000000})
+    assert response.status_code == 503
@@ -0,0 +1,63 @@
+import json
+import os
+
+from news_corpus import NewsCorpus
+
+
+def article(news_id, content):
+    return {"news_id": news_id, "Title": news_id, "Content": content}
+
+
+def write_corpus(path, articles):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in articles:
+            f.write(json.dumps(item) + "\n")
+
+
+def test_appended_articles_are_indexed(tmp_path):
+    corpus = NewsCorpus(str(tmp_path / "news.jsonl"))
+    corpus.append_many([article("a", "first"), article("b", "second")])
+    other = NewsCorpus(corpus.path)
+    corpus.append(article("c", "third"))
+
+    assert other.refresh()
+    assert other.get_content("a") == "first"
+    assert other.get_content("c") == "third"
+    assert not other.refresh()
+
+
+def test_rewrite_of_the_same_size_is_detected(tmp_path):
+    path = str(tmp_path / "news.jsonl")
+    write_corpus(path, [article("a", "aaaa"), article("b", "bbbb")])
+    corpus = NewsCorpus(path)
+    assert corpus.get_content("b") == "bbbb"
+
+    write_corpus(path, [article("x", "xxxx"), article("y", "yyyy")])
+    assert corpus.refresh()
+    assert corpus.get("a") is None
+    assert corpus.get_content("y") == "yyyy"
+
+
+def test_replaced_larger_file_is_read_from_a_fresh_mapping(tmp_path):
+    path = str(tmp_path / "news.jsonl")
+    write_corpus(path, [article("a", "old")])
+    corpus = NewsCorpus(path)
+    assert corpus.get_content("a") == "old"
+
+    replacement = str(tmp_path / "news.jsonl.tmp")
+    write_corpus(replacement, [article("a", "new and longer"), article("b", "more")])
+    os.replace(replacement, path)
+    assert corpus.refresh()
+    assert corpus.get_content("a") == "new and longer"
+    assert corpus.get_content("b") == "more"
+
+
+def test_stale_index_file_is_rebuilt(tmp_path):
+    path = str(tmp_path / "news.jsonl")
+    write_corpus(path, [article("a", "aaaa")])
+    NewsCorpus(path).close()
+    write_corpus(path, [article("z", "zzzz")])
+
+    corpus = NewsCorpus(path)
+    assert corpus.ids() == ["z"]
+    assert corpus.get_content("z") == "zzzz"
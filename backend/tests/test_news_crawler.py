@@ -0,0 +1,141 @@
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from news_corpus import NewsCorpus
+from web_scrape.news import Checkpoint, HostRateLimiter, NewsCrawler, make_session
+
+LISTING_ITEM = '<div class="Pos(r) D(f)"><div class="D(f) Fld(c) Fxg(1) Miw(0)"><a href="{link}">{title}</a></div></div>'
+ARTICLE = '<div class="content-timestamp"><time>October 1, 2026</time></div><div class="content-body"><p>{text}</p></div>'
+
+
+class FixtureSite:
+    """
+    Local news site: listing pages /list/<page>/ link to articles /article/<name>.
+    """
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.failing = set()
+        self.requests = []
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests.append((time.monotonic(), self.path))
+                path = self.path.split("?")[0]
+                if path.startswith("/list/"):
+                    page = int(path.strip("/").split("/")[1])
+                    body = "".join(
+                        LISTING_ITEM.format(link=site.url(f"/article/{name}"), title=name.title())
+                        for name in site.listings.get(page, [])
+                    )
+                elif path.startswith("/article/") and path not in site.failing:
+                    body = ARTICLE.format(text=f"Story of {path.rsplit('/', 1)[1]}")
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def fetched(self, prefix):
+        return [path for _, path in self.requests if path.startswith(prefix)]
+
+
+@pytest.fixture
+def site():
+    site = FixtureSite({1: ["alpha", "beta"], 2: ["beta", "gamma"]})
+    yield site
+    site.server.shutdown()
+    site.server.server_close()
+
+
+def make_crawler(site, tmp_path, rate=1000.0, max_attempts=3):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.jsonl"))
+    corpus = NewsCorpus(str(tmp_path / "news.jsonl"))
+    crawler = NewsCrawler(
+        checkpoint, corpus, base_url=site.url("/list/{page}/"), workers=4, rate=rate,
+        session=make_session(pool_size=4, retries=0), max_attempts=max_attempts,
+    )
+    return crawler, checkpoint, corpus
+
+
+def test_articles_listed_twice_are_fetched_once_under_a_uuid5_id(site, tmp_path):
+    crawler, checkpoint, corpus = make_crawler(site, tmp_path)
+    assert crawler.crawl([1, 2]) == 3
+    checkpoint.close()
+
+    assert sorted(site.fetched("/article/")) == ["/article/alpha", "/article/beta", "/article/gamma"]
+    link = site.url("/article/beta")
+    assert str(uuid.uuid5(uuid.NAMESPACE_URL, link)) in corpus
+    assert corpus.get(str(uuid.uuid5(uuid.NAMESPACE_URL, link)))["URL"] == link
+
+
+def test_resumed_crawl_skips_finished_pages_and_articles(site, tmp_path):
+    crawler, checkpoint, corpus = make_crawler(site, tmp_path)
+    site.failing.add("/article/gamma")
+    assert crawler.crawl([1, 2]) == 2
+    checkpoint.close()
+    corpus.close()
+
+    site.requests.clear()
+    site.failing.clear()
+    crawler, checkpoint, corpus = make_crawler(site, tmp_path)
+    assert crawler.crawl([1, 2]) == 3
+    checkpoint.close()
+
+    # Listing pages come from the checkpoint, only the failed article is fetched again
+    assert site.fetched("/list/") == []
+    assert site.fetched("/article/") == ["/article/gamma"]
+    assert len(corpus) == 3
+
+
+def test_articles_failing_max_attempts_times_are_skipped(site, tmp_path):
+    site.failing.add("/article/gamma")
+    for _ in range(2):
+        crawler, checkpoint, corpus = make_crawler(site, tmp_path, max_attempts=2)
+        crawler.crawl([1, 2])
+        checkpoint.close()
+        corpus.close()
+    assert site.fetched("/article/gamma") == ["/article/gamma", "/article/gamma"]
+
+    crawler, checkpoint, corpus = make_crawler(site, tmp_path, max_attempts=2)
+    assert checkpoint.failed == {site.url("/article/gamma"): 2}
+    assert crawler.crawl([1, 2]) == 2
+    checkpoint.close()
+    assert len(site.fetched("/article/gamma")) == 2
+
+
+def test_requests_to_one_host_are_rate_limited(site, tmp_path):
+    crawler, checkpoint, corpus = make_crawler(site, tmp_path, rate=20.0)
+    crawler.crawl([1, 2])
+    checkpoint.close()
+
+    times = sorted(timestamp for timestamp, _ in site.requests)
+    assert len(times) == 5
+    # 5 requests at 20 per second are spread over at least 4 intervals of 50 ms
+    assert times[-1] - times[0] >= 4 * 0.05 - 0.01
+
+
+def test_rate_limit_is_per_host():
+    limiter = HostRateLimiter(rate=10.0)
+    start = time.monotonic()
+    for host in ("a", "b", "c", "d"):
+        limiter.wait(f"http://{host}.example/")
+    assert time.monotonic() - start < 0.05
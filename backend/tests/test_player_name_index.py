@@ -0,0 +1,67 @@
+import threading
+
+from player_name_index import PlayerNameIndex
+
+PLAYERS = [
+    {"name": "Stephen Curry", "rank_value": 1},
+    {"name": "LeBron James", "rank_value": 3},
+    {"name": "Nikola Jokić", "rank_value": 4},
+    {"name": "Seth Curry", "rank_value": 300},
+    {"name": "Stephen Curry", "rank_value": 400},
+]
+
+
+def names(players):
+    return [player["name"] for player in players]
+
+
+def build(players=PLAYERS, version=1):
+    index = PlayerNameIndex()
+    index.build(players, version)
+    return index
+
+
+def test_exact_last_name_prefix_and_fuzzy_matches():
+    index = build()
+    assert names(index.search("LeBron James")) == ["LeBron James"]
+    assert names(index.search("curry")) == ["Stephen Curry", "Seth Curry"]
+    assert names(index.search("jokic")) == ["Nikola Jokić"]
+    assert names(index.search("leb")) == ["LeBron James"]
+    assert names(index.search("Lebron Jmaes")) == ["LeBron James"]
+    assert index.search("zzzz") == []
+
+
+def test_duplicate_names_keep_the_highest_ranked_player():
+    index = build()
+    assert [player["rank_value"] for player in index.search("Stephen Curry")] == [1]
+
+
+def test_searches_during_a_rebuild_see_one_version():
+    first = [{"name": f"Player {i} Alpha", "rank_value": i, "version": 1} for i in range(300)]
+    second = [{"name": f"Player {i} Beta", "rank_value": i, "version": 2} for i in range(50)]
+    index = build(first, 1)
+    stop = threading.Event()
+    errors = []
+
+    def rebuild():
+        version = 1
+        while not stop.is_set():
+            version += 1
+            index.build(second if version % 2 == 0 else first, version)
+
+    def search():
+        for _ in range(300):
+            found = index.search("player")
+            if len({player["version"] for player in found}) > 1:
+                errors.append(found)
+
+    writer = threading.Thread(target=rebuild)
+    writer.start()
+    readers = [threading.Thread(target=search) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    stop.set()
+    writer.join()
+    assert errors == []
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from rapidapi_client import RapidAPIClient, RapidAPIError
+
+
+class FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self._lock:
+            self.calls += 1
+        return FakeResponse(self.status_code, {"response": [params]})
+
+
+def make_client(tmp_path, session):
+    return RapidAPIClient(api_key="test", session=session, cache_path=str(tmp_path / "rapidapi.sqlite3"),
+                          rate=10 ** 6, burst=10 ** 6)
+
+
+def test_completed_seasons_are_cached_on_disk(tmp_path):
+    session = FakeSession()
+    make_client(tmp_path, session).player_statistics(265, 2020)
+    client = make_client(tmp_path, session)
+    client.player_statistics(265, 2020)
+    client.player_statistics(265, 2020)
+
+    assert session.calls == 1
+    stats = client.stats()
+    assert (stats["hits_disk"], stats["hits_memory"], stats["misses"]) == (1, 1, 0)
+
+
+def test_errors_are_counted_and_not_cached(tmp_path):
+    session = FakeSession(status_code=503)
+    client = make_client(tmp_path, session)
+    for _ in range(2):
+        with pytest.raises(RapidAPIError):
+            client.search_players("James")
+    assert session.calls == 2
+    assert client.stats()["errors"] == 2
+
+
+def test_counters_add_up_under_concurrent_requests(tmp_path):
+    client = make_client(tmp_path, FakeSession())
+    names = [f"player{i}" for i in range(20)]
+
+    def run():
+        for _ in range(10):
+            for name in names:
+                client.search_players(name)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = client.stats()
+    assert stats["hits_memory"] + stats["hits_disk"] + stats["misses"] == 8 * 10 * len(names)
+    assert stats["misses"] >= len(names)
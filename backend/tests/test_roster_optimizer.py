@@ -0,0 +1,146 @@
+import itertools
+import random
+
+import pytest
+
+from roster_optimizer import VALUE_FUNCTIONS, optimize_roster
+
+
+def make_players(salaries, ranks=None):
+    ranks = ranks or range(1, len(salaries) + 1)
+    return [
+        {"name": f"Player {rank}", "rank_value": rank, "salary_value": salary}
+        for rank, salary in zip(ranks, salaries)
+    ]
+
+
+def brute_force(players, roster_size, budget, locked=(), value="rank"):
+    """Best (total value, total salary) over every roster, or None if none fits."""
+    value_function = VALUE_FUNCTIONS[value]
+    max_rank = max(player["rank_value"] for player in players)
+    locked_players = [player for player in players if player["name"] in locked]
+    others = [player for player in players if player["name"] not in locked]
+    best = None
+    for combo in itertools.combinations(others, roster_size - len(locked_players)):
+        roster = locked_players + list(combo)
+        salary = sum(player["salary_value"] for player in roster)
+        if salary > budget:
+            continue
+        total = sum(value_function(player, max_rank) for player in roster)
+        if best is None or total > best[0] or (total == best[0] and salary < best[1]):
+            best = (total, salary)
+    return best
+
+
+def test_matches_brute_force_on_random_cases():
+    rng = random.Random(7)
+    for _ in range(200):
+        count = rng.randint(1, 10)
+        players = make_players([rng.randint(1, 40) * 1000000 for _ in range(count)])
+        roster_size = rng.randint(1, min(count, 5))
+        budget = rng.randint(1, 120) * 1000000
+        locked = [player["name"] for player in rng.sample(players, rng.randint(0, min(roster_size, 2)))]
+        value = rng.choice(sorted(VALUE_FUNCTIONS))
+
+        expected = brute_force(players, roster_size, budget, locked, value)
+        if expected is None:
+            with pytest.raises(ValueError):
+                optimize_roster(players, roster_size=roster_size, budget=budget, locked=locked, value=value)
+            continue
+
+        result = optimize_roster(players, roster_size=roster_size, budget=budget, locked=locked, value=value)
+        names = [player["name"] for player in result["players"]]
+        assert len(set(names)) == roster_size
+        assert set(locked) <= set(names)
+        assert (result["total_value"], result["total_salary"]) == expected
+        assert result["remaining_budget"] == budget - result["total_salary"]
+
+
+def test_budget_exactly_covering_the_roster_is_feasible():
+    players = make_players([30, 20, 10, 5])
+    result = optimize_roster(players, roster_size=2, budget=50)
+    assert [player["name"] for player in result["players"]] == ["Player 1", "Player 2"]
+    assert result["remaining_budget"] == 0
+
+    result = optimize_roster(players, roster_size=2, budget=49)
+    assert [player["name"] for player in result["players"]] == ["Player 1", "Player 3"]
+
+
+def test_ties_pick_the_cheapest_roster():
+    # Players 2 and 3 are worth as much together as players 1 and 4
+    players = make_players([40, 25, 15, 5])
+    result = optimize_roster(players, roster_size=2, budget=46)
+    assert [player["name"] for player in result["players"]] == ["Player 2", "Player 3"]
+    assert result["total_salary"] == 40
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"roster_size": 2, "budget": 14}, "fits the budget"),
+    ({"roster_size": 5, "budget": 1000}, "Not enough players"),
+    ({"roster_size": 2, "budget": 20, "locked": ["Player 1"]}, "Locked players alone"),
+    ({"roster_size": 1, "budget": 100, "locked": ["Player 1", "Player 2"]}, "exceed the roster size"),
+    ({"roster_size": 2, "budget": 100, "locked": ["Nobody"]}, "Locked player not found"),
+    ({"roster_size": 0, "budget": 100}, "at least 1"),
+    ({"roster_size": 2, "budget": 100, "value": "vibes"}, "Unknown value function"),
+])
+def test_infeasible_requests_raise(kwargs, message):
+    players = make_players([30, 20, 10, 5])
+    with pytest.raises(ValueError, match=message):
+        optimize_roster(players, **kwargs)
+
+
+def test_locked_players_are_kept_and_flagged():
+    players = make_players([30, 20, 10, 5])
+    result = optimize_roster(players, roster_size=2, budget=40, locked=["player 4"])
+    assert [(player["name"], player["locked"]) for player in result["players"]] == [
+        ("Player 1", False), ("Player 4", True)
+    ]
+
+
+app_module = pytest.importorskip("app")
+
+TABLE = make_players([salary * 1000000 for salary in (60, 45, 40, 30, 25, 20, 10, 5)])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import user_budget
+    monkeypatch.setattr(user_budget.salary_table, "all_players", lambda: TABLE)
+    return app_module.app.test_client()
+
+
+def test_endpoint_returns_the_optimal_roster(client):
+    response = client.post("/api/team/optimize", json={"budget": 100000000, "roster_size": 3})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body["players"]) == 3
+    assert (body["total_value"], body["total_salary"]) == brute_force(TABLE, 3, 100000000)
+    assert "elapsed_ms" in body
+
+
+@pytest.mark.parametrize("payload", [
+    {"budget": "lots"},
+    {"budget": None},
+    {"budget": True},
+    {"budget": 100000000.5},
+    {"budget": 1},
+    {"budget": 10 ** 12},
+    {"roster_size": "eight"},
+    {"roster_size": 0},
+    {"locked_players": "Player 1"},
+    {"locked_players": [1, 2]},
+    {"locked_players": ["Nobody"]},
+    {"value": {"name": "rank"}},
+    {"value": "vibes"},
+    {"budget": 5000000, "roster_size": 3},
+    [1, 2, 3],
+])
+def test_endpoint_rejects_invalid_input(client, payload):
+    response = client.post("/api/team/optimize", json=payload)
+    assert response.status_code == 400
+    assert response.get_json()["error"]
+
+
+def test_endpoint_rejects_a_body_that_is_not_json(client):
+    response = client.post("/api/team/optimize", data="budget=1", content_type="application/json")
+    assert response.status_code == 400
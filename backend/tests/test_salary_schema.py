@@ -0,0 +1,47 @@
+import pytest
+
+from salary_schema import TYPED_FIELDS, to_public_document, to_typed_document, upsert_players
+
+ROW = {"rank": "1.", "name": "Stephen Curry", "2024/25": "$55,761,217", "2025/26": "$59,606,817"}
+
+
+def test_typed_document_adds_typed_fields():
+    document = to_typed_document(ROW)
+    assert document["rank_value"] == 1
+    assert document["salary_value"] == 55761217
+    assert document["salaries"]["2025/26"] == 59606817
+    assert document["name_key"] == "stephen curry"
+
+
+def test_public_document_is_the_scraped_row():
+    document = to_typed_document(ROW)
+    assert to_public_document(document) == ROW
+    assert not set(TYPED_FIELDS) & set(to_public_document(document))
+
+
+class RecordingCollection:
+    """Collection stand-in that records the write calls made on it."""
+
+    def __init__(self):
+        self.calls = []
+        self.database = {"meta": self}
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args))
+
+
+def test_upsert_players_writes_rows_and_bumps_the_version():
+    collection = RecordingCollection()
+    assert upsert_players(collection, [ROW]) == 1
+    names = [name for name, _ in collection.calls]
+    assert names[:2] == ["bulk_write", "delete_many"]
+    assert collection.calls[1][1][0] == {"name_key": {"$nin": ["stephen curry"]}}
+    assert names[-1] == "update_one"
+
+
+@pytest.mark.parametrize("players", [[], [{"rank": "1.", "name": ""}]])
+def test_upsert_players_keeps_the_collection_on_an_empty_scrape(players):
+    collection = RecordingCollection()
+    with pytest.raises(ValueError):
+        upsert_players(collection, players)
+    assert collection.calls == []
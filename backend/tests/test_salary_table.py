@@ -0,0 +1,101 @@
+import random
+import threading
+
+import salary_table as salary_table_module
+from salary_table import SalaryTable, build_snapshot
+
+
+def make_players(salaries):
+    return [
+        {"name": f"Player {rank}", "rank": f"{rank}.", "rank_value": rank, "salary_value": salary}
+        for rank, salary in enumerate(salaries, start=1)
+    ]
+
+
+class FakeSalaryData:
+    """
+    Stands in for the salary collection: a data version and its players.
+    """
+
+    def __init__(self, players, version=1):
+        self.players = players
+        self.version = version
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(salary_table_module, "get_data_version", lambda collection: self.version)
+        monkeypatch.setattr(salary_table_module, "find", lambda collection, *args, **kwargs: list(self.players))
+
+
+def test_next_affordable_rank_matches_a_linear_scan(monkeypatch):
+    salaries = [random.Random(7).randrange(1, 60) * 10 ** 6 for _ in range(200)]
+    FakeSalaryData(make_players(salaries)).install(monkeypatch)
+    table = SalaryTable(get_collection=lambda: None)
+
+    for budget in (10 ** 6, 5 * 10 ** 6, 20 * 10 ** 6, 10 ** 9):
+        for start_rank in (1, 2, 50, 199, 200, 201):
+            expected = next(
+                (rank for rank, salary in enumerate(salaries, start=1) if rank >= start_rank and salary <= budget),
+                None,
+            )
+            assert table.next_affordable_rank(budget, start_rank) == expected
+
+
+def test_players_from_rank(monkeypatch):
+    FakeSalaryData(make_players([50, 40, 30, 20, 10, 5, 1])).install(monkeypatch)
+    table = SalaryTable(get_collection=lambda: None)
+    assert [player["rank_value"] for player in table.players_from_rank(2, count=3)] == [2, 3, 4]
+    assert table.players_from_rank(8) == []
+
+
+def test_reload_publishes_a_new_snapshot(monkeypatch):
+    data = FakeSalaryData(make_players([50, 40]))
+    data.install(monkeypatch)
+    table = SalaryTable(get_collection=lambda: None, refresh_interval=0)
+    table.refresh()
+    first = table.snapshot
+
+    data.players, data.version = make_players([50, 40, 30]), 2
+    assert table.refresh()
+    assert table.version == 2
+    assert len(table.snapshot.ranks) == 3
+    # The old snapshot is left untouched for readers still holding it
+    assert first.version == 1 and len(first.ranks) == len(first.players) == 2
+
+
+def test_readers_never_see_two_versions_mixed(monkeypatch):
+    small, large = make_players([30, 20, 10]), make_players([9] * 64)
+    data = FakeSalaryData(small)
+    data.install(monkeypatch)
+    table = SalaryTable(get_collection=lambda: None, refresh_interval=0)
+    table.refresh()
+    stop = threading.Event()
+    errors = []
+
+    def reload():
+        version = 1
+        while not stop.is_set():
+            version += 1
+            data.players, data.version = (large if version % 2 else small), version
+            table.refresh()
+
+    def read():
+        for _ in range(2000):
+            snapshot = table.snapshot
+            if not len(snapshot.players) == len(snapshot.ranks) == len(snapshot.suffix_min) == len(snapshot.range_min[0]):
+                errors.append(snapshot.version)
+
+    writer = threading.Thread(target=reload)
+    writer.start()
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    stop.set()
+    writer.join()
+    assert errors == []
+
+
+def test_empty_snapshot():
+    snapshot = build_snapshot([], None)
+    assert len(snapshot.ranks) == 0 and snapshot.range_min == [snapshot.salaries]
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+
+import session_store
+from session_store import InMemorySessionBackend, SessionLockTimeout, SessionStore, SQLiteSessionBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return InMemorySessionBackend(ttl=60)
+    return SQLiteSessionBackend(str(tmp_path / "sessions.sqlite3"), ttl=60, lock_ttl=60)
+
+
+def test_least_recently_used_session_is_evicted():
+    backend = InMemorySessionBackend(ttl=60, max_sessions=2)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a")
+    backend.set("c", "3")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.get("c") == "3"
+    assert backend.stats()["evictions"] == 1
+
+
+def test_sessions_over_the_byte_cap_are_evicted():
+    backend = InMemorySessionBackend(ttl=60, max_bytes=10)
+    backend.set("a", "x" * 6)
+    backend.set("b", "y" * 6)
+
+    assert backend.get("a") is None
+    assert backend.get("b") == "y" * 6
+    assert backend.stats()["bytes"] == 6
+
+
+def test_rewriting_a_session_keeps_the_byte_count():
+    backend = InMemorySessionBackend(ttl=60)
+    backend.set("a", "x" * 10)
+    backend.set("a", "x" * 4)
+    assert backend.stats() == {"sessions": 1, "bytes": 4, "evictions": 0}
+    backend.delete("a")
+    assert backend.stats()["bytes"] == 0
+
+
+def test_idle_sessions_expire(clock, backend):
+    backend.set("a", "1")
+    backend.set("b", "2")
+    clock.now += 40
+    assert backend.get("a") == "1"
+
+    # "a" was used 40 s ago and is still live, "b" was idle for the whole TTL
+    clock.now += 30
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    clock.now += 61
+    assert backend.get("a") is None
+
+
+def test_state_is_written_back_when_the_request_ends(backend):
+    store = SessionStore(backend, lock_timeout=1)
+    with store.session("client") as state:
+        state["turns"] = ["hello"]
+    with store.session("client") as state:
+        assert state == {"turns": ["hello"]}
+
+    store.clear("client")
+    with store.session("client") as state:
+        assert state == {}
+
+
+def test_requests_of_one_session_run_one_after_the_other(backend):
+    store = SessionStore(backend, lock_timeout=10)
+    errors = []
+
+    def request():
+        try:
+            with store.session("client") as state:
+                count = state.get("count", 0)
+                time.sleep(0.01)
+                state["count"] = count + 1
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with store.session("client") as state:
+        assert state["count"] == 8
+
+
+def test_a_busy_session_times_out_while_other_sessions_proceed(backend):
+    store = SessionStore(backend, lock_timeout=0.2)
+    holding = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with store.session("busy"):
+            holding.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    try:
+        assert holding.wait(5)
+        with pytest.raises(SessionLockTimeout):
+            with store.session("busy"):
+                pass
+        with store.session("other") as state:
+            state["ok"] = True
+    finally:
+        release.set()
+        thread.join()
+
+    with store.session("busy") as state:
+        assert state == {}
+
+
+def test_unused_session_locks_are_dropped():
+    backend = InMemorySessionBackend(ttl=60)
+    with SessionStore(backend, lock_timeout=1).session("client"):
+        assert "client" in backend._session_locks
+    assert backend._session_locks == {}
+
+
+def test_sqlite_lock_left_by_a_dead_worker_expires(clock, tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    backend = SQLiteSessionBackend(path, ttl=60, lock_ttl=30)
+    backend._db().execute("INSERT INTO locks (key, owner, expires_at) VALUES (?, ?, ?)", ("client", "dead", clock.now + 30))
+
+    with pytest.raises(SessionLockTimeout):
+        with backend.lock("client", timeout=0):
+            pass
+    clock.now += 31
+    with backend.lock("client", timeout=0):
+        pass
@@ -0,0 +1,163 @@
+import random
+import statistics
+
+import pytest
+
+import nba_apis
+from rapidapi_client import RapidAPIError
+from stat_aggregation import COUNTING_FIELDS, PERCENT_FIELDS, STAT_FIELDS, aggregate_games
+
+
+def parse(value, missing):
+    if value is None or str(value).replace('%', '').strip() in ('', '-'):
+        return missing
+    return float(str(value).replace('%', ''))
+
+
+def parse_minutes(value):
+    minutes, _, seconds = str(value or '').partition(':')
+    return (parse(minutes, 0.0) or 0.0) + (parse(seconds, 0.0) or 0.0) / 60
+
+
+def reference_aggregate(games):
+    """
+    The per-game loop aggregate_games replaced: missing percentages count as 0,
+    other missing values are skipped.
+    """
+    averages, medians, totals = {}, {}, {}
+    for field in STAT_FIELDS:
+        values = [parse(game.get(field), 0.0 if field in PERCENT_FIELDS else None) for game in games]
+        values = [value for value in values if value is not None]
+        if values:
+            averages[field] = round(sum(values) / len(values), 2)
+            medians[field] = round(statistics.median(values), 2)
+    for field in COUNTING_FIELDS + ['ftm']:
+        totals[field] = sum(value for value in (parse(game.get(field), None) for game in games) if value is not None)
+    for field, (made, attempted) in PERCENT_FIELDS.items():
+        totals[field] = totals[made] / totals[attempted] * 100 if totals[attempted] else 0.0
+    minutes = sum(parse_minutes(game.get('min')) for game in games)
+    per_36 = {field: round(totals[field] * 36 / minutes, 2) for field in COUNTING_FIELDS} if minutes else {}
+    return {
+        "games": len(games),
+        "minutes": round(minutes, 2),
+        "averages": averages,
+        "medians": medians,
+        "totals": {field: round(value, 2) for field, value in totals.items()},
+        "per_36": per_36,
+    }
+
+
+def random_game(rng):
+    if rng.random() < 0.15:
+        # Did not play: no minutes, no statistics
+        return {"min": rng.choice([None, "0:00", "-"]), **{field: None for field in STAT_FIELDS}}
+    game = {"min": f"{rng.randint(1, 44)}:{rng.randint(0, 59):02d}" if rng.random() < 0.7 else str(rng.randint(1, 44))}
+    for field in STAT_FIELDS + ['ftm']:
+        if field in PERCENT_FIELDS:
+            value = round(rng.uniform(0, 100), 1)
+            game[field] = rng.choice([f"{value}", f"{value}%", value, None, ""])
+        else:
+            value = rng.randint(0, 15)
+            game[field] = rng.choice([value, value, str(value), None])
+    return game
+
+
+def assert_close(actual, expected):
+    assert actual.keys() == expected.keys()
+    for field in expected:
+        assert actual[field] == pytest.approx(expected[field], abs=0.011), field
+
+
+def test_matches_the_per_game_loop_on_random_seasons():
+    rng = random.Random(13)
+    for _ in range(50):
+        games = [random_game(rng) for _ in range(rng.randint(1, 82))]
+        actual, expected = aggregate_games(games), reference_aggregate(games)
+        assert actual["games"] == expected["games"]
+        assert actual["minutes"] == pytest.approx(expected["minutes"], abs=0.011)
+        for key in ("averages", "medians", "totals", "per_36"):
+            assert_close(actual[key], expected[key])
+
+
+def test_totals_and_averages_of_a_small_season():
+    games = [
+        {"min": "30:30", "points": 20, "fgm": 8, "fga": 16, "fgp": "50.0", "ftm": 4, "fta": 4, "ftp": "100%",
+         "tpm": 0, "tpa": 2, "tpp": "0", "assists": 5},
+        {"min": "29:30", "points": "10", "fgm": 4, "fga": 4, "fgp": "100", "ftm": 2, "fta": 4, "ftp": 50.0,
+         "tpm": 2, "tpa": 2, "tpp": None, "assists": None},
+    ]
+    result = aggregate_games(games)
+    assert result["games"] == 2
+    assert result["minutes"] == 60.0
+    assert result["averages"]["points"] == 15.0
+    assert result["averages"]["fgp"] == 75.0
+    assert result["averages"]["tpp"] == 0.0
+    assert result["averages"]["assists"] == 5.0
+    assert result["totals"]["points"] == 30.0
+    assert result["totals"]["fgp"] == 60.0
+    assert result["totals"]["ftp"] == 75.0
+    assert result["totals"]["tpp"] == 50.0
+    assert result["per_36"]["points"] == 18.0
+
+
+def test_empty_and_did_not_play_seasons():
+    assert aggregate_games([]) == {
+        "games": 0, "minutes": 0.0, "averages": {}, "medians": {}, "totals": {}, "per_36": {}
+    }
+
+    result = aggregate_games([{"min": None, **{field: None for field in STAT_FIELDS}}] * 3)
+    assert result["games"] == 3
+    assert result["minutes"] == 0.0
+    assert result["per_36"] == {}
+    assert result["averages"] == {field: 0.0 for field in PERCENT_FIELDS}
+    assert result["totals"]["points"] == 0.0
+
+
+class FakeStatsClient:
+    def __init__(self, seasons):
+        self.seasons = seasons
+        self.calls = []
+
+    def player_statistics(self, id, season):
+        self.calls.append(season)
+        games = self.seasons[season]
+        if isinstance(games, Exception):
+            raise games
+        return {"response": games}
+
+
+def test_multi_season_fetch_aggregates_each_season_and_the_span(monkeypatch):
+    rng = random.Random(5)
+    seasons = {
+        "2021": [random_game(rng) for _ in range(20)],
+        "2022": [random_game(rng) for _ in range(30)],
+        "2023": [],
+        "2024": RapidAPIError(429),
+    }
+    client = FakeStatsClient(seasons)
+    monkeypatch.setattr(nba_apis, "get_rapidapi_client", lambda: client)
+
+    result = nba_apis.get_player_stats_for_seasons(265, ["2023", "2021", " 2022", "2021", "2024", ""])
+    assert list(result["seasons"]) == ["2023", "2021", "2022", "2024"]
+    assert sorted(client.calls) == ["2021", "2022", "2023", "2024"]
+    assert result["seasons"]["2021"] == aggregate_games(seasons["2021"])
+    assert result["seasons"]["2022"] == aggregate_games(seasons["2022"])
+    assert "error" in result["seasons"]["2023"]
+    assert result["seasons"]["2024"] == {"error": "API error: 429"}
+    assert result["combined"] == aggregate_games(seasons["2021"] + seasons["2022"])
+
+
+def test_multi_season_fetch_rejects_empty_and_oversized_requests(monkeypatch):
+    client = FakeStatsClient({})
+    monkeypatch.setattr(nba_apis, "get_rapidapi_client", lambda: client)
+    assert "error" in nba_apis.get_player_stats_for_seasons(265, ["", " "])
+    too_many = [str(year) for year in range(2000, 2001 + nba_apis.MAX_SEASONS_PER_CALL)]
+    assert "error" in nba_apis.get_player_stats_for_seasons(265, too_many)
+    assert client.calls == []
+
+
+def test_single_season_averages_match_the_aggregate(monkeypatch):
+    games = [random_game(random.Random(3)) for _ in range(10)]
+    monkeypatch.setattr(nba_apis, "get_rapidapi_client", lambda: FakeStatsClient({"2023": games, "2024": []}))
+    assert nba_apis.get_player_stat(265, "2023") == aggregate_games(games)["averages"]
+    assert "error" in nba_apis.get_player_stat(265, "2024")
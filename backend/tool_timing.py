@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+
+from langchain.callbacks.base import BaseCallbackHandler
+
+from tracing import current_span, record_span
+
+logger = logging.getLogger(__name__)
+
+
+class ToolTimingHandler(BaseCallbackHandler):
+    """
+    Callback handler that times every tool call of an agent run.
+
+    Each finished call is logged and recorded as a "tool" span, and
+    summary() compares the summed tool time with the wall-clock time the
+    tools actually took, which shows how much parallel tool execution saved.
+
+    It also adds up the prompt and completion tokens reported by each LLM
+    call of the run, and records each call as an "openai" span. Spans are
+    children of the span that was current when the handler was created, as
+    callbacks may run in other threads.
+
+    If `on_event` is given it is called with a "tool_start" or "tool_end"
+    event dict as each call starts and finishes, which the streaming
+    endpoint forwards to the client as progress events.
+    """
+
+    # Run synchronously in whichever thread reports the event, also under ainvoke
+    run_inline = True
+
+    def __init__(self, on_event=None):
+        self.on_event = on_event
+        self.timings = []
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._started = {}
+        self._llm_started = {}
+        self._parent = current_span()
+        self._first_start = None
+        self._last_end = None
+        self._lock = threading.Lock()
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        now = time.perf_counter()
+        with self._lock:
+            self._started[run_id] = ((serialized or {}).get("name", "tool"), now)
+            if self._first_start is None:
+                self._first_start = now
+        if self.on_event:
+            self.on_event({"event": "tool_start", "tool": (serialized or {}).get("name", "tool"), "input": input_str})
+
+    def _finish(self, run_id, status):
+        now = time.perf_counter()
+        with self._lock:
+            name, started = self._started.pop(run_id, ("tool", now))
+            elapsed_ms = round((now - started) * 1000, 1)
+            self.timings.append({"tool": name, "elapsed_ms": elapsed_ms, "status": status})
+            self._last_end = now
+        logger.debug("tool %s %s in %s ms", name, status, elapsed_ms)
+        record_span("tool", name, elapsed_ms / 1000, error=None if status == "finished" else status, parent=self._parent)
+        if self.on_event:
+            self.on_event({"event": "tool_end", "tool": name, "status": status, "elapsed_ms": elapsed_ms})
+
+    def _llm_start(self, serialized, run_id):
+        model = ((serialized or {}).get("kwargs") or {}).get("model_name") or "llm"
+        with self._lock:
+            self._llm_started[run_id] = (model, time.perf_counter())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._llm_start(serialized, run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._llm_start(serialized, run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        now = time.perf_counter()
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_tokens += usage.get("prompt_tokens", 0)
+            self.completion_tokens += usage.get("completion_tokens", 0)
+            model, started = self._llm_started.pop(run_id, ("llm", now))
+        record_span("openai", (response.llm_output or {}).get("model_name") or model, now - started,
+                    parent=self._parent, prompt_tokens=usage.get("prompt_tokens", 0),
+                    completion_tokens=usage.get("completion_tokens", 0))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        now = time.perf_counter()
+        with self._lock:
+            model, started = self._llm_started.pop(run_id, ("llm", now))
+        record_span("openai", model, now - started, error=error, parent=self._parent)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish(run_id, "finished")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "failed")
+
+    def summary(self):
+        """
+        Return the number of tool calls, their summed time and the wall-clock time they spanned.
+        """
+        with self._lock:
+            wall_ms = (self._last_end - self._first_start) * 1000 if self.timings else 0.0
+            return {
+                "calls": len(self.timings),
+                "tool_ms": round(sum(timing["elapsed_ms"] for timing in self.timings), 1),
+                "wall_ms": round(wall_ms, 1),
+                "llm_calls": self.llm_calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "timings": list(self.timings),
+            }
@@ -0,0 +1,273 @@
+"""
+Request tracing and Prometheus metrics.
+
+A span times one unit of work (a Flask route, an agent run, a tool call, a
+Mongo command, a vector search, an embedding or OpenAI call). Spans nest
+through a context variable, so every span of a request shares the trace ID
+of its route span. Finished spans feed a latency histogram and an error
+counter per span kind and name, plus token counters for LLM spans, served
+in the Prometheus text format by render_metrics().
+
+Finished spans are logged at DEBUG; spans slower than SLOW_SPAN_MS at INFO.
+"""
+
+import contextvars
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.observability_config import (
+    LOG_LEVEL,
+    LOG_FORMAT,
+    TRACING_ENABLED,
+    SLOW_SPAN_MS,
+    LATENCY_BUCKETS,
+)
+
+logger = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def configure_logging(level=LOG_LEVEL):
+    """
+    Send the backend loggers to stderr at the configured level.
+    """
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+class Span:
+    __slots__ = ("kind", "name", "trace_id", "span_id", "parent_id", "attributes", "started", "duration", "error")
+
+    def __init__(self, kind, name, parent=None, attributes=None):
+        self.kind = kind
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes or {}
+        self.started = time.perf_counter()
+        self.duration = None
+        self.error = None
+
+    def set(self, **attributes):
+        """
+        Attach attributes, e.g. prompt_tokens and completion_tokens of an LLM call.
+        """
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    Span latency histograms, error counters and LLM token counters, labelled
+    by span kind and name.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._errors = {}
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def observe(self, kind, name, seconds, error=False):
+        labels = (kind, name)
+        with self._lock:
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                histogram = self._histograms[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+            if error:
+                self._errors[labels] = self._errors.get(labels, 0) + 1
+
+    def add_tokens(self, kind, name, prompt_tokens=0, completion_tokens=0):
+        with self._lock:
+            for token_type, count in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+                if count:
+                    labels = (kind, name, token_type)
+                    self._tokens[labels] = self._tokens.get(labels, 0) + count
+
+    def render(self):
+        """
+        Return every metric in the Prometheus text exposition format.
+        """
+        lines = [
+            "# HELP nba_span_duration_seconds Duration of traced spans.",
+            "# TYPE nba_span_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (kind, name), (counts, total, count) in sorted(self._histograms.items()):
+                labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'nba_span_duration_seconds_bucket{{{labels},le="{bound}"}} {bucket_count}')
+                lines.append(f'nba_span_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f"nba_span_duration_seconds_sum{{{labels}}} {total:.6f}")
+                lines.append(f"nba_span_duration_seconds_count{{{labels}}} {count}")
+
+            lines += ["# HELP nba_span_errors_total Spans that ended with an error.",
+                      "# TYPE nba_span_errors_total counter"]
+            for (kind, name), count in sorted(self._errors.items()):
+                lines.append(f'nba_span_errors_total{{kind="{_escape(kind)}",name="{_escape(name)}"}} {count}')
+
+            lines += ["# HELP nba_llm_tokens_total Tokens used by LLM calls.",
+                      "# TYPE nba_llm_tokens_total counter"]
+            for (kind, name, token_type), count in sorted(self._tokens.items()):
+                lines.append(
+                    f'nba_llm_tokens_total{{kind="{_escape(kind)}",name="{_escape(name)}",type="{token_type}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def current_span():
+    return _current_span.get()
+
+
+def current_trace_id():
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def _finish(span):
+    metrics.observe(span.kind, span.name, span.duration, error=span.error is not None)
+    metrics.add_tokens(span.kind, span.name, span.attributes.get("prompt_tokens", 0),
+                       span.attributes.get("completion_tokens", 0))
+    elapsed_ms = span.duration * 1000
+    if SLOW_SPAN_MS and elapsed_ms >= SLOW_SPAN_MS:
+        logger.info("slow span %s %s took %.1f ms (trace %s) %s", span.kind, span.name, elapsed_ms,
+                    span.trace_id, span.attributes)
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug("span %s %s %.1f ms%s trace=%s span=%s parent=%s %s", span.kind, span.name, elapsed_ms,
+                     f" error={span.error}" if span.error else "", span.trace_id, span.span_id,
+                     span.parent_id, span.attributes)
+
+
+def start_span(kind, name, **attributes):
+    """
+    Open a span as a child of the current one and make it current.
+
+    Returns:
+        tuple: (span, token), pass both to end_span
+    """
+    if not TRACING_ENABLED:
+        return NOOP_SPAN, None
+    span = Span(kind, name, _current_span.get(), attributes)
+    return span, _current_span.set(span)
+
+
+def end_span(span, token, error=None):
+    if span is NOOP_SPAN:
+        return
+    span.duration = time.perf_counter() - span.started
+    if error is not None:
+        span.error = error if isinstance(error, str) else type(error).__name__
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # Ended in another context (e.g. after a streamed response): just restore the parent
+        _current_span.set(None)
+    _finish(span)
+
+
+@contextmanager
+def span(kind, name, **attributes):
+    """
+    Time the enclosed block as a span, e.g. `with span("vector_search", "pinecone"):`.
+    """
+    opened, token = start_span(kind, name, **attributes)
+    try:
+        yield opened
+    except BaseException as e:
+        end_span(opened, token, error=e)
+        raise
+    else:
+        end_span(opened, token)
+
+
+def traced(kind, name=None):
+    """
+    Decorator running a function in a span named after it.
+    """
+    def decorator(function):
+        span_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(kind, span_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_span(kind, name, duration, error=None, parent=None, **attributes):
+    """
+    Record a span timed elsewhere, e.g. by a LangChain callback or a Mongo
+    command listener, as a child of `parent` (the current span by default).
+    """
+    if not TRACING_ENABLED:
+        return
+    recorded = Span(kind, name, parent or _current_span.get(), attributes)
+    recorded.duration = duration
+    if error is not None:
+        recorded.error = error if isinstance(error, str) else type(error).__name__
+    _finish(recorded)
+
+
+def install_mongo_listener():
+    """
+    Record every MongoDB command as a "mongo" span. Only affects clients
+    created afterwards, so call it before the shared client is first created
+    (mongo.get_client).
+    """
+    if not TRACING_ENABLED:
+        return
+    try:
+        from pymongo import monitoring
+    except ImportError:
+        return
+
+    class MongoCommandListener(monitoring.CommandListener):
+        def started(self, event):
+            pass
+
+        def succeeded(self, event):
+            record_span("mongo", event.command_name, event.duration_micros / 1e6, database=event.database_name)
+
+        def failed(self, event):
+            record_span("mongo", event.command_name, event.duration_micros / 1e6,
+                        error=event.failure.get("codeName", "failed") if isinstance(event.failure, dict) else "failed",
+                        database=event.database_name)
+
+    monitoring.register(MongoCommandListener())
+
+
+def render_metrics():
+    return metrics.render()
@@ -1,19 +1,23 @@
-from pymongo import MongoClient
-from config.budget_config import DEFAULT_BUDGET
-# MongoDB connection
-client = MongoClient("mongodb://localhost:27017/")
-db = client["nba_salaries"]
-collection = db["players"]
+import logging
+import os
+import sys
 
-def get_top_5_players_from_rank(rank):
-    print("calling function get_top_5_players_from_rank")
-    rank_range = [f"{i}." for i in range(rank, rank + 6)]
-    players = collection.find(
-        {"rank": {"$in": rank_range}},
-        {"_id": 0, "rank": 1, "2024/25": 1, "name": 1}
-    )
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.budget_config import DEFAULT_BUDGET, MIN_BUDGET, MAX_BUDGET
+from mongo import get_collection
+from salary_table import SalaryTable
+from roster_optimizer import optimize_roster
+
+# In-process copy of the salary collection, reloaded when the salary data changes.
+# The shared MongoDB client connects on first use.
+salary_table = SalaryTable(get_collection)
 
-    return list(players)[:5]
+logger = logging.getLogger(__name__)
+
+def get_top_5_players_from_rank(rank):
+    logger.debug("calling function get_top_5_players_from_rank(%r)", rank)
+    return salary_table.players_from_rank(int(rank))
 
 def calculate_remaining_budget(current_budget, picked_budget):
     """
@@ -27,7 +31,7 @@ def calculate_remaining_budget(current_budget, picked_budget):
         int: The remaining budget after subtracting the player's salary
     """
     try:
-        print("calling function calculate_remaining_budget")
+        logger.debug("calling function calculate_remaining_budget(%r, %r)", current_budget, picked_budget)
         # Ensure values are valid numbers
         current_budget = int(current_budget)
         picked_budget = int(picked_budget)
@@ -41,7 +45,7 @@ def calculate_remaining_budget(current_budget, picked_budget):
             
         return remaining_budget
     except Exception as e:
-        print(f"Error calculating budget: {str(e)}")
+        logger.warning("Error calculating budget: %s", e)
         return current_budget  # Return original budget in case of error
 
 
@@ -54,34 +58,15 @@ def get_next_available_rank(current_budget, current_rank):
         current_rank (int): The starting rank to search from
 
     Returns:
-        int: The next rank number where at least one player's salary is within budget
+        int: The next rank number where at least one player's salary is within budget,
+             or None if no player from that rank on fits the budget
     """
     try:
-        while True:
-            print("calling function get_next_available_rank")
-            rank_str = f"{current_rank}."
-            players = collection.find(
-                {"rank": rank_str},
-                {"_id": 0, "2024/25": 1}
-            )
-
-            # Convert salaries to float and filter out missing/bad data
-            salaries = []
-            for player in players:
-                salary_str = player.get("2024/25", "").replace("$", "").replace("M", "").replace(",", "")
-                try:
-                    salary = float(salary_str)
-                    salaries.append(salary)
-                except ValueError:
-                    continue
-
-            if salaries and min(salaries) <= current_budget:
-                return current_rank
-
-            current_rank += 1
+        logger.debug("calling function get_next_available_rank(%r, %r)", current_budget, current_rank)
+        return salary_table.next_affordable_rank(current_budget, int(current_rank))
 
     except Exception as e:
-        print(f"Error finding next available rank: {str(e)}")
+        logger.warning("Error finding next available rank: %s", e)
         return 1
 
 
@@ -102,6 +87,8 @@ def get_five_players_within_budget(initial_budget=DEFAULT_BUDGET, picked_budget=
     
     # Find the next available rank where players are within budget
     next_rank = get_next_available_rank(remaining_budget, start_rank)
+    if next_rank is None:
+        return []
     
     # Get the top 5 players from that rank
     players = get_top_5_players_from_rank(next_rank)
@@ -109,4 +96,51 @@ def get_five_players_within_budget(initial_budget=DEFAULT_BUDGET, picked_budget=
     return players
 
 
+def _to_int(name, value):
+    """
+    Convert a request field to an integer, raising ValueError for anything
+    that is not a whole number.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if isinstance(value, float) and number != value:
+        raise ValueError(f"{name} must be an integer")
+    return number
+
 
+def optimize_team(budget=DEFAULT_BUDGET, roster_size=8, locked_players=(), value="rank"):
+    """
+    Build the highest-value roster that fits the budget.
+
+    Args:
+        budget (int): The total budget, between MIN_BUDGET and MAX_BUDGET
+        roster_size (int): Number of players on the roster
+        locked_players (list): Names of players that must be on the roster
+        value (str): Value score used to rank rosters, see roster_optimizer.VALUE_FUNCTIONS
+
+    Returns:
+        dict: The chosen players, total salary, total value and remaining budget
+
+    Raises:
+        ValueError: If the inputs are invalid or no roster fits the budget
+    """
+    budget = _to_int("budget", budget)
+    if budget < MIN_BUDGET or budget > MAX_BUDGET:
+        raise ValueError(f"Budget must be between ${MIN_BUDGET:,} and ${MAX_BUDGET:,}")
+    roster_size = _to_int("roster_size", roster_size)
+    if not isinstance(locked_players, (list, tuple)) or not all(isinstance(name, str) for name in locked_players):
+        raise ValueError("locked_players must be a list of player names")
+    if not isinstance(value, str):
+        raise ValueError("value must be the name of a value function")
+
+    return optimize_roster(
+        salary_table.all_players(),
+        roster_size=roster_size,
+        budget=budget,
+        locked=locked_players,
+        value=value
+    )
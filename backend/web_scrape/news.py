@@ -1,102 +1,307 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import pandas as pd
-import uuid
 from tqdm import tqdm
 
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from news_corpus import NewsCorpus
+
+BASE_URL = "https://sports.yahoo.com/nba/news/page/{page}/"
+CHECKPOINT_PATH = "news_checkpoint.jsonl"
+CORPUS_PATH = "news_data.jsonl"
+
+
+def make_session(pool_size=16, retries=3, backoff_factor=0.5):
+    """
+    Create a requests session with pooled keep-alive connections and retries.
+
+    Args:
+        pool_size: Maximum number of pooled connections per host
+        retries: Retries for connection errors, read timeouts and 429/5xx responses
+        backoff_factor: Exponential backoff factor between retries
+
+    Returns:
+        requests.Session: The configured session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "Mozilla/5.0 (compatible; nba-chatbot-news-crawler)"
+    return session
+
+
+class HostRateLimiter:
+    """
+    Limit requests to at most `rate` per second for each host.
+    """
+
+    def __init__(self, rate=4.0):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Checkpoint:
+    """
+    Append-only JSONL log of finished listing pages and failed articles.
+
+    Every finished listing page is appended and flushed immediately, so an
+    interrupted crawl resumes from the last completed page. Finished articles
+    live in the news corpus itself; failed articles are counted per URL so a
+    resumed crawl retries them a limited number of times. A partially written
+    last line is ignored on load.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        self.failed = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry["type"] == "page":
+                    self.pages[entry["page"]] = entry["items"]
+                elif entry["type"] == "failed":
+                    self.failed[entry["url"]] = self.failed.get(entry["url"], 0) + 1
+
+    def _append(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def add_page(self, page, items):
+        self.pages[page] = items
+        self._append({"type": "page", "page": page, "items": items})
+
+    def add_failed(self, url):
+        with self._lock:
+            self.failed[url] = self.failed.get(url, 0) + 1
+        self._append({"type": "failed", "url": url})
+
+    def close(self):
+        self._file.close()
+
+
+def news_id_for(link):
+    """
+    Stable news_id derived from the article URL, so resumed and repeated
+    crawls assign the same ID to the same article.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, link))
 
-def getSportsTitle(page=1):
-    base_url = f"https://sports.yahoo.com/nba/news/page/{page}/"
+
+def parse_sports_titles(html):
+    soup = BeautifulSoup(html, "html.parser")
     news_list = []
-    
-    # Construct URL with page parameter
-    url = f"{base_url}?page={page+1}" if page > 0 else base_url
-    r = requests.get(url)
-    r.raise_for_status()
-    
-    soup = BeautifulSoup(r.text, "html.parser")
     # Get the count of available news items
-    available_items = len(soup.select(".Pos\(r\).D\(f\)"))
-    news_items = soup.select(".D\(f\).Fld\(c\).Fxg\(1\).Miw\(0\) a")
+    available_items = len(soup.select(".Pos\\(r\\).D\\(f\\)"))
+    news_items = soup.select(".D\\(f\\).Fld\\(c\\).Fxg\\(1\\).Miw\\(0\\) a")
     for item in news_items:
-        news_id = str(uuid.uuid4())
         if len(news_list) >= available_items:
             return news_list
-            
+
         news_list.append({
             'title': item.text.strip(),
             'link': item.get('href'),
-            "news_id": news_id
+            "news_id": news_id_for(item.get('href'))
         })
-        
+
     return news_list
 
-def getNews(url):
-    try:
-        r = requests.get(url)
+
+def parse_news(html):
+    soup = BeautifulSoup(html, "html.parser")
+    date_element = soup.find('div', class_="content-timestamp")
+    if date_element:
+        date = date_element.find('time')
+    else:
+        date = None
+
+    content = soup.find('div', class_='content-body')
+
+    if content:
+        paragraphs = content.find_all(['p', 'a'])
+        all_text = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
+        return {
+            'content': ' '.join(all_text),
+            'date': date.get_text(strip=True) if date else None
+        }
+    return None
+
+
+class NewsCrawler:
+    """
+    Concurrent, resumable crawler for the Yahoo NBA news listing.
+
+    Listing pages and articles are fetched on a bounded thread pool through
+    one pooled session, rate limited per host, with timeouts and retries.
+    Articles are appended to the news corpus as they arrive and listing pages
+    are recorded in a Checkpoint, so an interrupted crawl resumes. Articles
+    already in the corpus are not fetched again, nor are articles that
+    already failed `max_attempts` times.
+    """
+
+    def __init__(self, checkpoint, corpus, base_url=BASE_URL, workers=8, rate=4.0, timeout=10, session=None,
+                 max_attempts=3):
+        self.checkpoint = checkpoint
+        self.corpus = corpus
+        self.base_url = base_url
+        self.workers = workers
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.session = session or make_session(pool_size=workers)
+        self.rate_limiter = HostRateLimiter(rate)
+
+    def fetch(self, url):
+        self.rate_limiter.wait(url)
+        r = self.session.get(url, timeout=self.timeout)
         r.raise_for_status()
-        
-        soup = BeautifulSoup(r.text, "html.parser")
-        date_element = soup.find('div', class_="content-timestamp")
-        if date_element:
-            date = date_element.find('time')
-        else:
-            date = None
-
-        content = soup.find('div', class_='content-body')
-        
-        if content:
-            paragraphs = content.find_all(['p', 'a'])
-            all_text = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
-            return {
-                'content': ' '.join(all_text),
-                'date': date.get_text(strip=True) if date_element else None
-            }
-        return None
-        
-    except requests.RequestException as e:
-        print(f"Error fetching news: {str(e)}")
-        return None
-
-col_name = ["Title", "Content", "URL", "Date", "news_id"]
-
-
-
-news_data = []  # List to store all news items
-
-for i in tqdm(range(50), desc="Pages"):
-    news_results = getSportsTitle(page=i + 1)
-    print(f"Found {len(news_results)} news items")
-    for item in tqdm(news_results, desc=f"News items on page {i+1}", leave=False):
-        result = getNews(item['link'])
-        if result:
-            news_data.append({
-                "Title": item['title'],
-                "Content": result['content'],
-                "URL": item['link'],
-                "Date": result['date'],
-                "news_id": item["news_id"]
-            })
-        #print(result['date'] + "saved")
-
-
-
-# Create DataFrame from collected data
-output = pd.DataFrame(news_data, columns=col_name)
-# Save to Excel with proper filename
-output.to_excel("nba_news.xlsx", index=False)
-print("Data saved to Excel file!")
+        return r.text
 
+    def page_url(self, page):
+        base_url = self.base_url.format(page=page)
+        # Construct URL with page parameter
+        return f"{base_url}?page={page+1}" if page > 0 else base_url
 
+    def get_sports_titles(self, page):
+        return parse_sports_titles(self.fetch(self.page_url(page)))
 
-import json
+    def get_news(self, url):
+        try:
+            return parse_news(self.fetch(url))
+        except requests.RequestException as e:
+            print(f"Error fetching news: {str(e)}")
+            return None
+
+    def _crawl_pages(self, pages, executor):
+        pending = [page for page in pages if page not in self.checkpoint.pages]
+        futures = {executor.submit(self.get_sports_titles, page): page for page in pending}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Pages"):
+            page = futures[future]
+            try:
+                news_results = future.result()
+            except requests.RequestException as e:
+                print(f"Error fetching page {page}: {str(e)}")
+                continue
+            print(f"Found {len(news_results)} news items on page {page}")
+            self.checkpoint.add_page(page, news_results)
+
+    def _crawl_articles(self, items, executor):
+        pending = [
+            item for item in items
+            if item['news_id'] not in self.corpus and self.checkpoint.failed.get(item['link'], 0) < self.max_attempts
+        ]
+        skipped = len(items) - len(pending) - sum(1 for item in items if item['news_id'] in self.corpus)
+        if skipped:
+            print(f"Skipping {skipped} news items that failed {self.max_attempts} times")
+        futures = {executor.submit(self.get_news, item['link']): item for item in pending}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="News items"):
+            item = futures[future]
+            result = future.result()
+            if result:
+                self.corpus.append({
+                    "Title": item['title'],
+                    "Content": result['content'],
+                    "URL": item['link'],
+                    "Date": result['date'],
+                    "news_id": item["news_id"]
+                })
+            else:
+                self.checkpoint.add_failed(item['link'])
+
+    def crawl(self, pages):
+        """
+        Crawl the given listing pages and every article they link to.
+
+        Args:
+            pages: Iterable of listing page numbers
+
+        Returns:
+            int: Number of listed articles stored in the corpus
+        """
+        pages = list(pages)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            self._crawl_pages(pages, executor)
 
-df = pd.read_excel("nba_news.xlsx")
-news_data = df.to_dict(orient="records")
-with open("news_data.json", "w", encoding="utf-8") as f:
-    json.dump(news_data, f, ensure_ascii=False, indent=2)
+            # Deduplicate articles listed on several pages
+            items = {}
+            for page in pages:
+                for item in self.checkpoint.pages.get(page, []):
+                    items.setdefault(item['link'], item)
+            self._crawl_articles(list(items.values()), executor)
 
-print("json file saved")
+        return sum(1 for item in items.values() if item['news_id'] in self.corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl Yahoo NBA news")
+    parser.add_argument("--pages", type=int, default=50, help="number of listing pages to crawl")
+    parser.add_argument("--workers", type=int, default=8, help="maximum concurrent requests")
+    parser.add_argument("--rate", type=float, default=4.0, help="maximum requests per second per host")
+    parser.add_argument("--timeout", type=float, default=10, help="request timeout in seconds")
+    parser.add_argument("--base-url", default=BASE_URL, help="listing URL template with a {page} placeholder")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH, help="checkpoint file used to resume a crawl")
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="JSONL news corpus the articles are appended to")
+    parser.add_argument("--max-attempts", type=int, default=3, help="attempts per article across resumed crawls")
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    checkpoint = Checkpoint(args.checkpoint)
+    corpus = NewsCorpus(args.corpus)
+    crawler = NewsCrawler(checkpoint, corpus, base_url=args.base_url, workers=args.workers, rate=args.rate,
+                          timeout=args.timeout, max_attempts=args.max_attempts)
+    try:
+        stored = crawler.crawl(range(1, args.pages + 1))
+    finally:
+        checkpoint.close()
+        corpus.close()
+    print(f"{stored} listed articles in corpus ({len(corpus)} total), saved to {args.corpus}")
 
+    # The crawl finished, the next run starts from scratch
+    os.remove(args.checkpoint)
 
 
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
 import requests
 from bs4 import BeautifulSoup
-from pymongo import MongoClient
 import json
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mongo import get_collection
+from salary_schema import upsert_players
 
 def getSalary():
     url = 'https://hoopshype.com/salaries/players.html'
-    r = requests.get(url)
+    r = requests.get(url, timeout=30)
     web_content = r.text
     soup = BeautifulSoup(web_content, "html.parser")
     salary_table = soup.find('table')
-        
+
     players = []
     for row in salary_table.find("tbody").find_all("tr"):
         cols = row.find_all("td")
@@ -25,17 +31,21 @@ def getSalary():
 
     return players
 
-playerSalary = getSalary()
+if __name__ == "__main__":
+    # Load from a saved salary_data.json instead of scraping with --from-file
+    if "--from-file" in sys.argv:
+        with open("salary_data.json", "r", encoding="utf-8") as f:
+            playerSalary = json.load(f)
+    else:
+        playerSalary = getSalary()
 
-# with open("salary_data.json", "w", encoding="utf-8") as f:
-#     json.dump(playerSalary, f, ensure_ascii=False, indent=2)
+    # with open("salary_data.json", "w", encoding="utf-8") as f:
+    #     json.dump(playerSalary, f, ensure_ascii=False, indent=2)
 
 
-# Connect to MongoDB
-client = MongoClient("mongodb://localhost:27017/")  # Adjust if using a cloud DB
-db = client["nba_salaries"]
-collection = db["players"]
+    # Connect to MongoDB (MONGO_URI in config/mongo_config.py)
+    collection = get_collection()
 
-# Insert data
-collection.insert_many(playerSalary)
-print("Data saved to MongoDB!")
\ No newline at end of file
+    # Upsert by player so re-running does not duplicate data
+    count = upsert_players(collection, playerSalary)
+    print(f"Data saved to MongoDB! ({count} players)")
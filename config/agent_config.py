@@ -0,0 +1,13 @@
+"""
+Agent configuration for NBA chatbot backend.
+This file serves as a single source of truth for agent model and tool execution settings.
+"""
+
+import os
+
+# Model used by the player-detail agent. It must support parallel tool calls
+# (gpt-4-turbo, gpt-4o and later; the original gpt-4 emits one call per turn).
+PLAYER_AGENT_MODEL = os.getenv("PLAYER_AGENT_MODEL", "gpt-4o")
+
+# Maximum number of tool calls from one model turn that run at the same time
+MAX_TOOL_WORKERS = int(os.getenv("MAX_TOOL_WORKERS", 4))
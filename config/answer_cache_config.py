@@ -0,0 +1,22 @@
+"""
+Semantic answer cache configuration for NBA chatbot backend.
+This file serves as a single source of truth for answer cache settings.
+"""
+
+import os
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+
+# Minimum cosine similarity between query embeddings for a cached answer to be reused
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.92))
+
+# Seconds an answer stays valid, by response option. Salary data changes rarely
+# (and reloads invalidate the cache anyway), news goes stale quickly.
+ANSWER_CACHE_TTLS = {
+    "player_details": int(os.getenv("ANSWER_CACHE_TTL_PLAYER_DETAILS", 6 * 60 * 60)),
+    "recommendation": int(os.getenv("ANSWER_CACHE_TTL_RECOMMENDATION", 60 * 60)),
+    "news": int(os.getenv("ANSWER_CACHE_TTL_NEWS", 15 * 60)),
+}
+
+# Maximum cached answers per response option, oldest evicted first
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 2000))
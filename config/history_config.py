@@ -0,0 +1,23 @@
+"""
+Conversation history budget configuration for NBA chatbot backend.
+This file serves as a single source of truth for prompt size limits.
+"""
+
+import os
+
+# Token budget of the main model history and of each agent's chat history (system prompt excluded)
+MAIN_HISTORY_MAX_TOKENS = int(os.getenv("MAIN_HISTORY_MAX_TOKENS", 3000))
+AGENT_HISTORY_MAX_TOKENS = int(os.getenv("AGENT_HISTORY_MAX_TOKENS", 2000))
+
+# Most recent messages that are never folded into the summary
+KEEP_RECENT_MESSAGES = int(os.getenv("KEEP_RECENT_MESSAGES", 4))
+
+# Earlier messages (e.g. raw first-model output) are cut to this many tokens
+MAX_MESSAGE_TOKENS = int(os.getenv("MAX_MESSAGE_TOKENS", 600))
+
+# Tool results handed to the agents are cut to this many tokens
+TOOL_OUTPUT_MAX_TOKENS = int(os.getenv("TOOL_OUTPUT_MAX_TOKENS", 1500))
+
+# Model and length of the rolling summary of older turns
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", 300))
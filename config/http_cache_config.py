@@ -0,0 +1,15 @@
+"""
+HTTP caching configuration for NBA chatbot backend.
+This file serves as a single source of truth for ETag and response cache settings.
+"""
+
+import os
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"
+
+# Seconds browsers may reuse a salary response before revalidating it with its
+# ETag. Salary data changes at most once a day, when web_scrape/salary.py runs.
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 300))
+
+# Rendered responses kept in memory, least recently used evicted first
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", 1024))
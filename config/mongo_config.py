@@ -0,0 +1,40 @@
+"""
+MongoDB configuration for NBA chatbot backend.
+This file serves as a single source of truth for connection pool and query settings.
+"""
+
+import os
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+MONGO_DATABASE = os.getenv("MONGO_DATABASE", "nba_salaries")
+MONGO_SALARY_COLLECTION = os.getenv("MONGO_SALARY_COLLECTION", "players")
+MONGO_APP_NAME = os.getenv("MONGO_APP_NAME", "nba-chatbot-backend")
+
+# Connection pool of the shared client: at most this many sockets per server,
+# requests waiting longer than the wait queue timeout for a socket fail
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000))
+
+# Fail fast when the server is down: pymongo waits 30 s to select a server by default
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 2000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 2000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 10000))
+
+# Server-side time limit (maxTimeMS) of the queries run through the query layer
+MONGO_QUERY_TIMEOUT_MS = int(os.getenv("MONGO_QUERY_TIMEOUT_MS", 3000))
+
+# After a connection failure, queries fail immediately for this many seconds
+# instead of each waiting for server selection to time out
+MONGO_UNAVAILABLE_COOLDOWN_SECONDS = float(os.getenv("MONGO_UNAVAILABLE_COOLDOWN_SECONDS", 5))
+
+# Queries slower than this are logged with their name
+MONGO_SLOW_QUERY_MS = float(os.getenv("MONGO_SLOW_QUERY_MS", 200))
+
+# Wire compression, e.g. "zstd,zlib" for a remote cluster (zstd needs the zstandard
+# package); off by default as it only costs CPU against a local server
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+
+# "primary", "primaryPreferred", "secondary", "secondaryPreferred" or "nearest"
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primaryPreferred")
@@ -0,0 +1,32 @@
+"""
+News retrieval configuration for NBA chatbot backend.
+This file serves as a single source of truth for vector store settings.
+"""
+
+import os
+
+# Append-only JSONL news corpus written by web_scrape/news.py (its offset index is "<path>.idx")
+NEWS_CORPUS_PATH = os.getenv("NEWS_CORPUS_PATH", "web_scrape/news_data.jsonl")
+
+# Legacy single-array corpus, migrated to NEWS_CORPUS_PATH on first use
+LEGACY_NEWS_JSON_PATH = "web_scrape/news_data.json"
+
+# Vector store backend used for news retrieval: "pinecone" or "local"
+VECTOR_BACKEND = os.getenv("NEWS_VECTOR_BACKEND", "pinecone")
+
+# Pinecone index holding the news chunks
+PINECONE_INDEX_NAME = "nba-news-yahoo"
+
+# Path prefix of the on-disk local index (".npz" is appended)
+LOCAL_INDEX_PATH = os.getenv("NEWS_LOCAL_INDEX_PATH", "web_scrape/news_index")
+
+# OpenAI embeddings dimension
+EMBEDDING_DIMENSION = 1536
+
+# On-disk embedding cache shared by ingest and query
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "web_scrape/embedding_cache.sqlite3")
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", 10000))
+
+# Manifest of already indexed articles, used by incremental ingest ("{backend}" is substituted)
+INGEST_MANIFEST_PATH = os.getenv("NEWS_INGEST_MANIFEST_PATH", "web_scrape/news_manifest_{backend}.json")
@@ -0,0 +1,19 @@
+"""
+Logging, tracing and metrics configuration for NBA chatbot backend.
+This file serves as a single source of truth for observability settings.
+"""
+
+import os
+
+# Level of the backend loggers: DEBUG shows every span, tool call and API payload
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+# Record spans and serve them as metrics on /metrics; when off, span() is a no-op
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+
+# Spans slower than this are logged at INFO with their trace ID, 0 to disable
+SLOW_SPAN_MS = float(os.getenv("SLOW_SPAN_MS", 5000))
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
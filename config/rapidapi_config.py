@@ -0,0 +1,27 @@
+"""
+RapidAPI (api-nba-v1) client configuration for NBA chatbot backend.
+This file serves as a single source of truth for quota and cache settings.
+"""
+
+import os
+
+RAPIDAPI_HOST = "api-nba-v1.p.rapidapi.com"
+RAPIDAPI_BASE_URL = f"https://{RAPIDAPI_HOST}"
+
+# Environment variable (or .env entry) holding the API key
+RAPIDAPI_KEY_ENV = "RAPIDAPI_KEY"
+
+# Token bucket matching the RapidAPI plan quota: sustained requests per second and burst size
+RAPIDAPI_RATE_PER_SECOND = float(os.getenv("RAPIDAPI_RATE_PER_SECOND", 2))
+RAPIDAPI_BURST = int(os.getenv("RAPIDAPI_BURST", 5))
+
+# Seconds to wait for a connection and for the response
+RAPIDAPI_TIMEOUT = float(os.getenv("RAPIDAPI_TIMEOUT", 10))
+
+# In-memory TTL cache for results that can still change
+RAPIDAPI_SEARCH_TTL = int(os.getenv("RAPIDAPI_SEARCH_TTL", 24 * 60 * 60))
+RAPIDAPI_CURRENT_SEASON_TTL = int(os.getenv("RAPIDAPI_CURRENT_SEASON_TTL", 15 * 60))
+RAPIDAPI_MEMORY_ITEMS = int(os.getenv("RAPIDAPI_MEMORY_ITEMS", 2048))
+
+# Permanent on-disk cache for statistics of completed seasons
+RAPIDAPI_CACHE_PATH = os.getenv("RAPIDAPI_CACHE_PATH", "web_scrape/rapidapi_cache.sqlite3")
@@ -0,0 +1,38 @@
+"""
+Record/replay harness configuration for NBA chatbot backend.
+This file serves as a single source of truth for offline benchmarking settings.
+"""
+
+import os
+
+# "off", "record" (call the real services and save every interaction to fixtures)
+# or "replay" (serve interactions from fixtures and local stand-ins, no keys needed)
+REPLAY_MODE = os.getenv("REPLAY_MODE", "off")
+
+# Directory holding one fixture file per service
+REPLAY_FIXTURES_DIR = os.getenv("REPLAY_FIXTURES_DIR", "benchmarks/fixtures")
+
+# In replay mode, fail on an interaction missing from the fixtures instead of
+# answering it with a local stand-in
+REPLAY_STRICT = os.getenv("REPLAY_STRICT", "0") == "1"
+
+# Injected latency in milliseconds, by service. Stand-in answers always use it;
+# replayed fixtures use the latency measured while recording unless
+# REPLAY_USE_RECORDED_LATENCY is off.
+REPLAY_LATENCY_MS = {
+    "openai": float(os.getenv("REPLAY_LATENCY_OPENAI_MS", 600)),
+    "pinecone": float(os.getenv("REPLAY_LATENCY_PINECONE_MS", 60)),
+    "rapidapi": float(os.getenv("REPLAY_LATENCY_RAPIDAPI_MS", 200)),
+    "mongo": float(os.getenv("REPLAY_LATENCY_MONGO_MS", 1)),
+}
+REPLAY_USE_RECORDED_LATENCY = os.getenv("REPLAY_USE_RECORDED_LATENCY", "1") == "1"
+
+# Multiplier applied to every injected latency, 0 replays as fast as possible
+REPLAY_LATENCY_SCALE = float(os.getenv("REPLAY_LATENCY_SCALE", 1.0))
+
+# Salary data seeding the MongoDB stand-in when no Mongo fixture was recorded
+REPLAY_SALARY_SEED_PATH = os.getenv("REPLAY_SALARY_SEED_PATH", "web_scrape/salary_data.json")
+
+# MongoDB collections snapshotted in record mode, by database
+REPLAY_MONGO_URI = os.getenv("REPLAY_MONGO_URI", "mongodb://localhost:27017/")
+REPLAY_MONGO_COLLECTIONS = {"nba_salaries": ["players", "meta"]}
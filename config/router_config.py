@@ -0,0 +1,19 @@
+"""
+Intent router configuration for NBA chatbot backend.
+This file serves as a single source of truth for fast-path routing settings.
+"""
+
+import os
+
+# Answer simple salary and rank questions from the salary table, without the LLM pipeline
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "1") == "1"
+
+# Minimum probability of the local classifier for a query without a rule match to take the fast path
+ROUTER_MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", 0.8))
+
+# Players listed at most in a templated answer
+ROUTER_MAX_PLAYERS = int(os.getenv("ROUTER_MAX_PLAYERS", 5))
+
+# Rephrase the player agent's answer with the main model. When off, the agent's
+# answer is returned as is, saving one completion per request.
+REPHRASE_AGENT_ANSWERS = os.getenv("REPHRASE_AGENT_ANSWERS", "1") == "1"
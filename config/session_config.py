@@ -0,0 +1,24 @@
+"""
+Conversation session configuration for NBA chatbot backend.
+This file serves as a single source of truth for session storage settings.
+"""
+
+import os
+
+# Session backend: "memory" (per process), "sqlite" (shared by the workers of one host) or "redis" (shared)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+
+# Sessions idle for longer than this are evicted
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 6 * 60 * 60))
+
+# Memory cap of the in-memory backend: number of sessions and total serialized size
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", 10000))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", 256 * 1024 * 1024))
+
+# Shared backends
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "sessions.sqlite3")
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+
+# Seconds to wait for another request of the same session before giving up, and
+# the lifetime of a shared lock whose holder died
+SESSION_LOCK_TIMEOUT = float(os.getenv("SESSION_LOCK_TIMEOUT", 120))
@@ -0,0 +1,13 @@
+"""
+Startup configuration for NBA chatbot backend.
+This file serves as a single source of truth for startup and warm-up settings.
+"""
+
+import os
+
+# Build the agents, API clients and news retriever in the background once the
+# server accepts connections, instead of on the first request that needs them
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+
+# Give up waiting for the server to accept connections after this many seconds
+WARMUP_WAIT_SECONDS = float(os.getenv("WARMUP_WAIT_SECONDS", 60))
@@ -1,5 +1,5 @@
 import React, { useState, useContext, useEffect } from "react";
-import { askMainModel, clearHistory, getTeamRecommendations } from "../services/api";
+import { askMainModel, askMainModelStream, clearHistory, getTeamRecommendations } from "../services/api";
 import ChatBox from "../components/Chatbox";
 import SideBar from "../components/SideBar";
 import PlayerSelection from "../components/PlayerSelection";
@@ -213,8 +213,20 @@ function Homepage() {
         // No buttons are expected now that we're using text-based recommendations
         setRecommendedPlayers([]);
       } else {
-        // Use the regular endpoint for other modes
-        const assistantReply = await askMainModel(prompt, modelOption, responseOption);
+        // Stream the answer for other modes, showing tool progress until tokens arrive
+        let assistantReply;
+        try {
+          assistantReply = await askMainModelStream(prompt, modelOption, responseOption, (event, partial) => {
+            let content = partial;
+            if (event.event === "tool_start") content = `Looking up ${event.tool.replace(/_tool$/, "").replace(/_/g, " ")}...`;
+            if (!content) return;
+            setMessages([...newMessages, { role: "assistant", content }]);
+          });
+        } catch (streamError) {
+          // Fall back to the blocking endpoint
+          console.error("Streaming error, falling back:", streamError);
+          assistantReply = await askMainModel(prompt, modelOption, responseOption);
+        }
         const assistantMessage = { role: "assistant", content: assistantReply };
         setMessages([...newMessages, assistantMessage]);
       }
@@ -9,6 +9,24 @@ const api = axios.create({
   timeout: 120000, // 2 minute timeout - adjust based on expected response time
 });
 
+// Conversation session ID, kept per browser so each user has their own chat history
+const SESSION_STORAGE_KEY = "nbaChatSessionId";
+
+export const getSessionId = () => {
+  let sessionId = localStorage.getItem(SESSION_STORAGE_KEY);
+  if (!sessionId) {
+    sessionId = crypto.randomUUID().replace(/-/g, "");
+    localStorage.setItem(SESSION_STORAGE_KEY, sessionId);
+  }
+  return sessionId;
+};
+
+// Send the session ID with every request
+api.interceptors.request.use((config) => {
+  config.headers["X-Session-ID"] = getSessionId();
+  return config;
+});
+
 // Add request retry logic
 api.interceptors.response.use(undefined, async (err) => {
   const { config, message } = err;
@@ -44,6 +62,43 @@ export const askMainModel = async (prompt, model, response_option) => {
   }
 };
 
+// Stream the answer over Server-Sent Events. onEvent receives every event
+// (status, tool_start, tool_end, token, done, error); resolves with the final message.
+export const askMainModelStream = async (prompt, model, response_option, onEvent) => {
+  const response = await fetch("/api/ask/stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json", "X-Session-ID": getSessionId() },
+    body: JSON.stringify({ prompt, model, response_option }),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Streaming request failed: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let message = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line; keep any partial event in the buffer
+    const chunks = buffer.split("\n\n");
+    buffer = chunks.pop();
+    for (const chunk of chunks) {
+      const dataLine = chunk.split("\n").find((line) => line.startsWith("data: "));
+      if (!dataLine) continue;
+      const event = JSON.parse(dataLine.slice(6));
+      if (event.event === "token") message += event.content;
+      if (event.event === "done" && event.message) message = event.message;
+      if (event.event === "error") throw new Error(event.message);
+      if (onEvent) onEvent(event, message);
+    }
+  }
+  return message;
+};
+
 export const getTeamRecommendations = async (prompt) => {
   try {
     const response = await api.post("/team/recommendations", {